@@ -0,0 +1,255 @@
+import argparse
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+
+from aiohttp import web
+
+from main import parse_geometric_description
+from metrics import METRICS
+from render_workers import RenderWorkerPool
+
+MAX_FINISHED_JOBS = 10000
+# Spans of this long-running process are appended to the trace file this often, so the buffer stays small
+METRICS_FLUSH_SECONDS = float(os.getenv("TEXT2MANIM_METRICS_FLUSH_SECONDS", "10"))
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobService:
+    """In-process job queue feeding parse coroutines and a warm render worker pool.
+
+    Submissions beyond `max_queue` waiting jobs are rejected (HTTP 429) instead of
+    piling up, and every job record carries the time spent in each stage.
+    """
+
+    def __init__(self, parse_workers=8, render_workers=None, max_queue=100, render=True,
+                 use_fast_path=True, output_dir="media/service", stream=False, structure_only=False):
+        self.parse_workers = parse_workers
+        self.render_workers = render_workers or os.cpu_count() or 1
+        self.render = render
+        self.use_fast_path = use_fast_path
+        self.stream = stream
+        self.structure_only = structure_only
+        self.output_dir = output_dir
+        self.jobs = OrderedDict()
+        self.parse_queue = asyncio.Queue(maxsize=max_queue)
+        self.render_queue = asyncio.Queue(maxsize=self.render_workers * 2)
+        self.pool = None
+        self.tasks = []
+
+    async def start(self):
+        if self.render:
+            self.pool = RenderWorkerPool(self.render_workers, self.output_dir)
+            self.tasks += [asyncio.create_task(self._render_worker()) for _ in range(self.render_workers)]
+        self.tasks += [asyncio.create_task(self._parse_worker()) for _ in range(self.parse_workers)]
+        if METRICS.enabled:
+            self.tasks.append(asyncio.create_task(self._flush_metrics()))
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        if self.pool is not None:
+            self.pool.close()
+
+    async def _flush_metrics(self):
+        while True:
+            await asyncio.sleep(METRICS_FLUSH_SECONDS)
+            try:
+                await asyncio.to_thread(METRICS.flush)
+            except OSError as e:
+                logging.error(f"Could not write metrics: {e}")
+
+    def submit(self, description, still=False, grouped=False, duration=None):
+        job = {
+            "id": uuid.uuid4().hex,
+            "description": description,
+            "options": {"still": still, "grouped": grouped, "duration": duration},
+            "status": "queued",
+            "submitted": time.time(),
+            "stages": {},
+            "_mark": time.perf_counter(),
+        }
+        try:
+            self.parse_queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFull()
+        self.jobs[job["id"]] = job
+        self._forget_old_jobs()
+        return job
+
+    def _forget_old_jobs(self):
+        while len(self.jobs) > MAX_FINISHED_JOBS:
+            oldest_id, oldest = next(iter(self.jobs.items()))
+            if oldest["status"] not in ("done", "error"):
+                break
+            del self.jobs[oldest_id]
+
+    @staticmethod
+    def _entity_counter(job):
+        """Callback that shows streamed parsing progress in the job status as entities arrive."""
+        job["entities_parsed"] = 0
+
+        def on_entity(entity):
+            job["entities_parsed"] += 1
+        return on_entity
+
+    @staticmethod
+    def _stage(job, name):
+        """Record the time since the previous stage boundary under `name`."""
+        now = time.perf_counter()
+        job["stages"][name] = round(now - job["_mark"], 4)
+        job["_mark"] = now
+
+    async def _parse_worker(self):
+        while True:
+            job = await self.parse_queue.get()
+            self._stage(job, "queue_wait")
+            job["status"] = "parsing"
+            try:
+                job["schema"] = await asyncio.to_thread(
+                    parse_geometric_description, job["description"], use_fast_path=self.use_fast_path,
+                    stream=self.stream, on_entity=self._entity_counter(job) if self.stream else None,
+                    structure_only=self.structure_only,
+                )
+            except Exception as e:
+                job.update(status="error", error=str(e))
+                continue
+            finally:
+                self._stage(job, "parse")
+            if self.render:
+                job["status"] = "render_queued"
+                await self.render_queue.put(job)
+            else:
+                job["status"] = "done"
+
+    async def _render_worker(self):
+        while True:
+            job = await self.render_queue.get()
+            self._stage(job, "render_wait")
+            job["status"] = "rendering"
+            try:
+                result = await asyncio.wrap_future(self.pool.submit(job["id"], json_schema=job["schema"], **job["options"]))
+                job.update(
+                    status="done", output=result["output"], cached=result["cached"],
+                    partial_movies=result["partial_movies"], partial_movie_hits=result["partial_movie_hits"],
+                )
+                job["stages"]["scene_build"] = result["build_seconds"]
+                job["stages"]["frame_render"] = result["render_seconds"]
+                job["stages"]["ffmpeg_concat"] = result["concat_seconds"]
+            except Exception as e:
+                job.update(status="error", error=str(e))
+            finally:
+                self._stage(job, "render")
+
+    def public(self, job):
+        return {key: value for key, value in job.items() if not key.startswith("_")}
+
+
+async def submit_job(request):
+    service = request.app["service"]
+    try:
+        body = await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(text="Body must be JSON")
+    description = body.get("description") if isinstance(body, dict) else None
+    if not isinstance(description, str) or not description.strip():
+        raise web.HTTPBadRequest(text="'description' is required")
+    duration = body.get("duration")
+    if duration is not None and (isinstance(duration, bool) or not isinstance(duration, (int, float)) or duration <= 0):
+        raise web.HTTPBadRequest(text="'duration' must be a positive number of seconds")
+    try:
+        job = service.submit(
+            description, still=bool(body.get("still")), grouped=bool(body.get("grouped")), duration=duration
+        )
+    except QueueFull:
+        return web.json_response({"error": "Job queue is full, retry later"}, status=429, headers={"Retry-After": "1"})
+    return web.json_response({"id": job["id"], "status": job["status"]}, status=202)
+
+
+def _get_job(request):
+    job = request.app["service"].jobs.get(request.match_info["job_id"])
+    if job is None:
+        raise web.HTTPNotFound(text="Unknown job")
+    return job
+
+
+async def job_status(request):
+    job = _get_job(request)
+    return web.json_response(request.app["service"].public(job))
+
+
+async def job_output(request):
+    job = _get_job(request)
+    if job["status"] == "done" and "output" not in job:
+        raise web.HTTPNotFound(text="Job was not rendered")
+    if job["status"] != "done":
+        return web.json_response({"error": "Output not ready", "status": job["status"]}, status=409)
+    return web.FileResponse(job["output"])
+
+
+async def health(request):
+    service = request.app["service"]
+    return web.json_response({
+        "parse_queue": service.parse_queue.qsize(),
+        "render_queue": service.render_queue.qsize(),
+        "jobs": len(service.jobs),
+    })
+
+
+async def metrics(request):
+    return web.Response(text=METRICS.prometheus_text(), content_type="text/plain", charset="utf-8")
+
+
+def create_app(**service_options):
+    app = web.Application()
+    app["service"] = JobService(**service_options)
+
+    async def on_startup(app):
+        await app["service"].start()
+
+    async def on_cleanup(app):
+        await app["service"].stop()
+
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    app.router.add_post("/jobs", submit_job)
+    app.router.add_get("/jobs/{job_id}", job_status)
+    app.router.add_get("/jobs/{job_id}/output", job_output)
+    app.router.add_get("/health", health)
+    app.router.add_get("/metrics", metrics)
+    return app
+
+
+if __name__ == "__main__":
+    # Point the Groq client at mock_llm.py for offline load tests:
+    #   python mock_llm.py & GROQ_BASE_URL=http://127.0.0.1:8081 GROQ_API_KEY=mock python app.py --no-fast-path
+    # or skip the network entirely with TEXT2MANIM_LLM_BACKEND=mock
+    parser = argparse.ArgumentParser(description="HTTP job service for text-to-diagram rendering.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--parse-workers", type=int, default=8, help="concurrent LLM parse requests")
+    parser.add_argument("--render-workers", type=int, default=None, help="render processes (default: CPU count)")
+    parser.add_argument("--max-queue", type=int, default=100, help="waiting jobs before submissions get 429")
+    parser.add_argument("--no-render", action="store_true", help="only parse, skip rendering")
+    parser.add_argument("--no-fast-path", action="store_true", help="send every description to the LLM")
+    parser.add_argument("--stream", action="store_true", help="stream LLM responses, stopping at the end of the JSON")
+    parser.add_argument("--structure-only", action="store_true",
+                        help="ask the LLM for entities and relationships only and compute coordinates locally")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    web.run_app(
+        create_app(
+            parse_workers=args.parse_workers, render_workers=args.render_workers, max_queue=args.max_queue,
+            render=not args.no_render, use_fast_path=not args.no_fast_path, stream=args.stream,
+            structure_only=args.structure_only,
+        ),
+        host=args.host, port=args.port,
+    )
@@ -0,0 +1,85 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+from manim import BLUE_D, NumberPlane, __version__ as MANIM_VERSION
+
+BACKGROUND_CACHE_DIR = os.getenv(
+    "TEXT2MANIM_BACKGROUND_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "text2manim", "backgrounds")
+)
+
+GRID_STYLE = {
+    "x_range": [-20, 20, 15],
+    "y_range": [-15, 15, 15],
+    "background_line_style": {
+        "stroke_color": BLUE_D,
+        "stroke_width": 0.5,
+        "stroke_opacity": 0.3
+    },
+}
+
+# Rendered grid rasters keyed by resolution, frame size, background color and style
+_RASTERS = {}
+
+
+def grid_plane(style=GRID_STYLE):
+    return NumberPlane(**style)
+
+
+def _raster_key(camera, style):
+    key = json.dumps([
+        camera.pixel_width, camera.pixel_height,
+        round(camera.frame_width, 6), round(camera.frame_height, 6),
+        str(camera.background_color), camera.background_opacity,
+        style, MANIM_VERSION,
+    ], default=str, sort_keys=True)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _render_raster(camera, style):
+    camera.reset()
+    camera.capture_mobjects([grid_plane(style)])
+    pixels = camera.pixel_array.copy()
+    camera.reset()
+    return pixels
+
+
+def grid_raster(camera, style=GRID_STYLE):
+    """Pixel array of the background color with the grid stroked on top, built once per resolution and style."""
+    key = _raster_key(camera, style)
+    pixels = _RASTERS.get(key)
+    if pixels is not None:
+        return pixels
+
+    path = os.path.join(BACKGROUND_CACHE_DIR, f"{key}.npy")
+    try:
+        pixels = np.load(path)
+    except (OSError, ValueError):
+        pixels = _render_raster(camera, style)
+        try:
+            os.makedirs(BACKGROUND_CACHE_DIR, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=BACKGROUND_CACHE_DIR, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, pixels)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+    _RASTERS[key] = pixels
+    return pixels
+
+
+def use_grid_background(scene, style=GRID_STYLE):
+    """Composite the cached grid raster under every frame instead of adding a NumberPlane mobject.
+
+    The camera resets each frame to its background array, so the grid costs a
+    memory copy rather than re-stroking every grid line. Cameras without a pixel
+    array (the OpenGL renderer) fall back to a regular NumberPlane.
+    """
+    camera = scene.camera
+    if not hasattr(camera, "set_background"):
+        scene.add(grid_plane(style))
+        return
+    camera.set_background(grid_raster(camera, style))
+    camera.reset()
@@ -0,0 +1,204 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+from fast_parser import fast_parse
+from main import parse_geometric_description
+from render import safe_job_id
+from render_workers import RenderWorkerPool
+
+
+class RateLimiter:
+    """Token bucket shared by all parse workers so the batch stays under the API rate limit."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def read_jsonl(path):
+    """Yield {"id", "description"} records from lines that are either JSON strings or objects.
+
+    A line that cannot be used yields an error record instead, so one bad line never stops the batch.
+    Each usable record also gets a "job_id": its id made path-safe and unique within the file,
+    which names its render output.
+    """
+    job_ids = set()
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = {"id": str(line_number)}
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                yield {**record, "status": "error", "stage": "input", "error": f"Invalid JSON: {e}"}
+                continue
+            if isinstance(item, dict):
+                record["id"] = str(item.get("id", line_number))
+                item = item.get("description")
+            if not isinstance(item, str) or not item.strip():
+                yield {**record, "status": "error", "stage": "input", "error": "Missing 'description'"}
+                continue
+            job_id = base = safe_job_id(record["id"])
+            suffix = 2
+            while job_id in job_ids:
+                job_id = f"{base}_{suffix}"
+                suffix += 1
+            job_ids.add(job_id)
+            yield {**record, "job_id": job_id, "description": item}
+
+
+async def parse_with_retry(description, limiter, max_retries=3, base_delay=1.0, stream=False, structure_only=False):
+    """Parse one description, retrying API failures with exponential backoff and jitter.
+
+    With stream=True the LLM response is read only until the JSON object is complete;
+    with structure_only=True the LLM names entities and relationships and the solver
+    computes the coordinates.
+    """
+    # The fast path never touches the network, so it skips the rate limiter
+    json_schema = fast_parse(description)
+    if json_schema is not None:
+        return json_schema, 0
+
+    for attempt in range(1, max_retries + 1):
+        await limiter.acquire()
+        try:
+            json_schema = await asyncio.to_thread(
+                parse_geometric_description, description, use_fast_path=False, stream=stream,
+                structure_only=structure_only,
+            )
+            return json_schema, attempt
+        except ValueError:
+            if attempt == max_retries:
+                raise
+            delay = base_delay * 2 ** (attempt - 1)
+            await asyncio.sleep(delay + random.uniform(0, delay))
+
+
+async def run_batch(input_path, output_path, concurrency=8, rate=5.0, max_retries=3,
+                    render=True, render_workers=None, output_dir="media/batch", quality="l",
+                    still=False, grouped=False, duration=None, stream=False, structure_only=False):
+    """Parse (and optionally render) every description in input_path, streaming results to output_path.
+
+    Parsing runs in `concurrency` coroutines behind a shared rate limiter, rendering
+    runs in a pool of warm manim worker processes, and bounded queues between the
+    stages keep all of them busy without loading the whole batch into memory.
+    """
+    render_workers = render_workers or os.cpu_count() or 1
+    limiter = RateLimiter(rate)
+    parse_queue = asyncio.Queue(maxsize=concurrency * 4)
+    render_queue = asyncio.Queue(maxsize=render_workers * 2)
+    result_queue = asyncio.Queue()
+    counts = {"ok": 0, "error": 0, "partial_movies": 0, "partial_movie_hits": 0}
+
+    async def produce():
+        for record in read_jsonl(input_path):
+            # Unusable input lines skip parsing and go straight to the results file
+            await (result_queue if "error" in record else parse_queue).put(record)
+        for _ in range(concurrency):
+            await parse_queue.put(None)
+
+    async def parse_worker():
+        while (record := await parse_queue.get()) is not None:
+            description = record["description"]
+            started = time.perf_counter()
+            try:
+                record["schema"], record["attempts"] = await parse_with_retry(
+                    description, limiter, max_retries, stream=stream, structure_only=structure_only
+                )
+            except Exception as e:
+                record.update(status="error", stage="parse", error=str(e))
+                await result_queue.put(record)
+                continue
+            record["parse_seconds"] = round(time.perf_counter() - started, 4)
+            if render:
+                await render_queue.put(record)
+            else:
+                record["status"] = "ok"
+                await result_queue.put(record)
+
+    async def render_worker(pool):
+        while (record := await render_queue.get()) is not None:
+            try:
+                result = await asyncio.wrap_future(pool.submit(record["job_id"], json_schema=record["schema"], duration=duration))
+                record.update(
+                    status="ok", output=result["output"], cached=result["cached"], render_seconds=result["total_seconds"],
+                    partial_movies=result["partial_movies"], partial_movie_hits=result["partial_movie_hits"],
+                )
+                counts["partial_movies"] += result["partial_movies"]
+                counts["partial_movie_hits"] += result["partial_movie_hits"]
+            except Exception as e:
+                record.update(status="error", stage="render", error=str(e))
+            await result_queue.put(record)
+
+    async def write_results():
+        with open(output_path, "w") as f:
+            while (record := await result_queue.get()) is not None:
+                counts[record["status"]] += 1
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+
+    writer = asyncio.create_task(write_results())
+    pool = RenderWorkerPool(render_workers, output_dir, quality, still, grouped) if render else None
+    try:
+        renderers = [asyncio.create_task(render_worker(pool)) for _ in range(render_workers)] if render else []
+        await asyncio.gather(produce(), *(parse_worker() for _ in range(concurrency)))
+        for _ in renderers:
+            await render_queue.put(None)
+        await asyncio.gather(*renderers)
+    finally:
+        if pool is not None:
+            pool.close()
+        await result_queue.put(None)
+        await writer
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parse and render descriptions from a JSONL file.")
+    parser.add_argument("input", help="JSONL file with one description (string or {id, description}) per line")
+    parser.add_argument("output", help="JSONL file that receives one result or error record per line")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent LLM parse requests")
+    parser.add_argument("--rate", type=float, default=5.0, help="maximum LLM requests per second")
+    parser.add_argument("--retries", type=int, default=3, help="attempts per description")
+    parser.add_argument("--render-workers", type=int, default=None, help="render processes (default: CPU count)")
+    parser.add_argument("--output-dir", default="media/batch", help="directory for rendered scenes")
+    parser.add_argument("--quality", default="l", choices=["l", "m", "h", "p", "k"], help="manim render quality")
+    parser.add_argument("--still", action="store_true", help="render only the final frame as a PNG")
+    parser.add_argument("--grouped", action="store_true", help="batch animations into a few segments per scene")
+    parser.add_argument("--duration", type=float, default=None, help="total animation time per scene for --grouped")
+    parser.add_argument("--no-render", action="store_true", help="only parse, skip rendering")
+    parser.add_argument("--stream", action="store_true", help="stream LLM responses, stopping at the end of the JSON")
+    parser.add_argument("--structure-only", action="store_true",
+                        help="ask the LLM for entities and relationships only and compute coordinates locally")
+    args = parser.parse_args()
+
+    counts = asyncio.run(run_batch(
+        args.input, args.output, concurrency=args.concurrency, rate=args.rate, max_retries=args.retries,
+        render=not args.no_render, render_workers=args.render_workers, output_dir=args.output_dir,
+        quality=args.quality, still=args.still, grouped=args.grouped, duration=args.duration,
+        stream=args.stream, structure_only=args.structure_only,
+    ))
+    print(f"Done: {counts['ok']} ok, {counts['error']} errors")
+    if counts["partial_movies"]:
+        hit_rate = counts["partial_movie_hits"] / counts["partial_movies"]
+        print(f"Partial movie cache: {counts['partial_movie_hits']}/{counts['partial_movies']} plays reused ({hit_rate:.1%})")
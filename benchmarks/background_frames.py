@@ -0,0 +1,34 @@
+import argparse
+import time
+
+from manim import Circle, Scene, tempconfig
+
+from background import grid_plane, use_grid_background
+
+
+def frame_seconds(cached_grid, frames):
+    scene = Scene()
+    if cached_grid:
+        use_grid_background(scene)
+    else:
+        scene.add(grid_plane())
+    scene.add(Circle(radius=2))
+    scene.renderer.update_frame(scene)
+    started = time.perf_counter()
+    for _ in range(frames):
+        scene.renderer.update_frame(scene)
+    return (time.perf_counter() - started) / frames
+
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m benchmarks.background_frames
+    parser = argparse.ArgumentParser(description="Compare per-frame time with a NumberPlane vs the cached grid raster.")
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--quality", default="high_quality", help="manim quality preset, e.g. high_quality for 1080p")
+    args = parser.parse_args()
+
+    with tempconfig({"quality": args.quality, "write_to_movie": False}):
+        plane = frame_seconds(False, args.frames)
+        cached = frame_seconds(True, args.frames)
+    print(f"NumberPlane mobject: {plane * 1000:.2f} ms/frame")
+    print(f"Cached grid raster:  {cached * 1000:.2f} ms/frame")
@@ -0,0 +1,31 @@
+import argparse
+import time
+
+from code_gen import generate_manim_code
+from benchmarks.synthetic import synthetic_schema
+
+SIZES = (10, 100, 1_000, 10_000, 100_000)
+
+
+def time_codegen(schema, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        generate_manim_code(schema)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m benchmarks.codegen_scaling
+    parser = argparse.ArgumentParser(description="Measure generate_manim_code scaling with schema size.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'entities':>10} {'relationships':>14} {'seconds':>10} {'us/entity':>10}")
+    for size in args.sizes:
+        schema = synthetic_schema(size)
+        seconds = time_codegen(schema, args.repeats)
+        entities = len(schema["entities"])
+        print(f"{entities:>10} {len(schema['relationships']):>14} {seconds:>10.4f} {seconds / entities * 1e6:>10.2f}")
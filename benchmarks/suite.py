@@ -0,0 +1,172 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import llm
+import main
+from benchmarks.synthetic import synthetic_schema
+from cache import PersistentCache
+from code_gen import generate_manim_code
+from scene_arrays import SceneArrays
+from svg_render import render_svg
+from validate import validate_schema
+
+DESCRIPTIONS_PATH = os.path.join(os.path.dirname(__file__), "descriptions.txt")
+DEFAULT_RESULTS = os.path.join(os.path.dirname(__file__), "results.json")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+SIZES = (10, 100, 1_000, 10_000, 100_000)
+# A benchmark counts as regressed when it is this much slower than the baseline
+REGRESSION_THRESHOLD = 1.25
+
+
+def load_descriptions(path=DESCRIPTIONS_PATH):
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def best_of(function, repeats):
+    """Fastest of `repeats` runs, in seconds; the minimum is the least noisy estimate."""
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def bench_parse(descriptions, repeats):
+    """Seconds per description through parse_geometric_description, with cold and warm caches.
+
+    The LLM is the in-process mock, so llm_cold measures our own prompt building,
+    extraction and validation overhead rather than network or model time.
+    """
+    results = {}
+
+    def cold(use_fast_path):
+        for description in descriptions:
+            main.API_CACHE.clear()
+            main.get_persistent_cache().clear()
+            main.parse_geometric_description(description, use_fast_path=use_fast_path)
+
+    def warm():
+        for description in descriptions:
+            main.parse_geometric_description(description, use_fast_path=False)
+
+    def disk():
+        main.API_CACHE.clear()
+        warm()
+
+    results["parse.fast_path"] = best_of(lambda: cold(True), repeats) / len(descriptions)
+    results["parse.llm_cold"] = best_of(lambda: cold(False), repeats) / len(descriptions)
+    warm()
+    results["parse.memory_cache"] = best_of(warm, repeats) / len(descriptions)
+    results["parse.disk_cache"] = best_of(disk, repeats) / len(descriptions)
+    return results
+
+
+def bench_schemas(sizes, repeats):
+    """Seconds for codegen, validation, SVG drawing and array packing on synthetic schemas of each size."""
+    results = {}
+    for size in sizes:
+        schema = synthetic_schema(size)
+        results[f"codegen.{size}"] = best_of(lambda: generate_manim_code(schema), repeats)
+        results[f"validate.{size}"] = best_of(lambda: validate_schema(schema), repeats)
+        results[f"svg.{size}"] = best_of(lambda: render_svg(schema), repeats)
+        results[f"arrays.{size}"] = best_of(lambda: SceneArrays(schema), repeats)
+    return results
+
+
+def bench_render(descriptions, repeats, output_dir):
+    """Seconds per still and video render in this process, without the render cache."""
+    from render_workers import _warm_up, render_in_process
+
+    _warm_up()
+    schemas = [main.parse_geometric_description(description) for description in descriptions]
+    results = {}
+    for still, name in ((True, "render.still"), (False, "render.video")):
+        def run():
+            for index, schema in enumerate(schemas):
+                render_in_process(f"bench_{index}", json_schema=schema, output_dir=output_dir, still=still,
+                                  use_cache=False)
+        results[name] = best_of(run, repeats) / len(schemas)
+    return results
+
+
+def metadata():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """Print each benchmark against the baseline and return the names that regressed."""
+    regressions = []
+    print(f"{'benchmark':<22} {'seconds':>12} {'baseline':>12} {'ratio':>8}")
+    for name, seconds in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"{name:<22} {seconds:>12.6f} {'-':>12} {'-':>8}")
+            continue
+        ratio = seconds / previous if previous else float("inf")
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"{name:<22} {seconds:>12.6f} {previous:>12.6f} {ratio:>7.2f}x{flag}")
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m benchmarks.suite [--save-baseline]
+    parser = argparse.ArgumentParser(description="Offline benchmarks for parsing, codegen, validation and rendering.")
+    parser.add_argument("--descriptions", default=DESCRIPTIONS_PATH, help="one description per line")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="synthetic schema sizes (entities)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--render", action="store_true", help="also time still and video renders (needs manim)")
+    parser.add_argument("--output", default=DEFAULT_RESULTS, help="where to write this run's results")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="results file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="slowdown ratio that fails")
+    args = parser.parse_args()
+
+    descriptions = load_descriptions(args.descriptions)
+    with tempfile.TemporaryDirectory() as scratch:
+        # Deterministic in-process LLM and a throwaway parse cache, so runs never touch the network
+        llm.set_backend(llm.MockBackend())
+        main._persistent_cache = PersistentCache(os.path.join(scratch, "parse_cache.sqlite3"))
+        results = bench_parse(descriptions, args.repeats)
+        results.update(bench_schemas(args.sizes, args.repeats))
+        if args.render:
+            results.update(bench_render(descriptions[:3], 1, os.path.join(scratch, "media")))
+        main._persistent_cache.close()
+
+    report = {"meta": metadata(), "results": results}
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.threshold)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+    elif regressions:
+        print(f"{len(regressions)} benchmark(s) slower than {args.threshold:.2f}x the baseline")
+        sys.exit(1)
@@ -0,0 +1,36 @@
+import math
+import random
+
+
+def synthetic_schema(num_entities, seed=0):
+    """Schema with roughly num_entities entities: circles, each with a tangent line pair
+    from an external point, an inscribed polygon and an inscribed circle."""
+    rng = random.Random(seed)
+    entities, relationships, positions = [], [], {}
+    index = 0
+    while len(entities) < num_entities:
+        cx, cy, r = rng.uniform(-15, 15), rng.uniform(-10, 10), rng.uniform(0.5, 3)
+        d = r * rng.uniform(1.5, 3)
+        circle, point, poly, incircle = f"C{index}", f"P{index}", f"G{index}", f"I{index}"
+        sides = rng.randint(3, 8)
+        entities.append({"type": "circle", "id": circle, "radius": r})
+        positions[circle] = {"center": [cx, cy], "radius": r}
+        entities.append({"type": "point", "id": point})
+        positions[point] = {"point": [cx + d, cy]}
+        for sign, line in ((1, f"L{index}a"), (-1, f"L{index}b")):
+            entities.append({"type": "line", "id": line})
+            length = math.sqrt(d * d - r * r)
+            positions[line] = {"start": [cx + d, cy], "end": [cx + r * r / d, cy + sign * r * length / d]}
+            relationships.append({"type": "tangent", "from": line, "to": circle, "from_point": point})
+        entities.append({"type": "polygon", "id": poly, "sides": sides})
+        positions[poly] = {"vertices": [
+            [cx + r * math.cos(2 * math.pi * k / sides), cy + r * math.sin(2 * math.pi * k / sides)]
+            for k in range(sides)
+        ]}
+        relationships.append({"type": "inscribed", "shape": poly, "in": circle})
+        apothem = r * math.cos(math.pi / sides)
+        entities.append({"type": "circle", "id": incircle, "radius": apothem})
+        positions[incircle] = {"center": [cx, cy], "radius": apothem}
+        relationships.append({"type": "inscribed", "shape": incircle, "in": poly})
+        index += 1
+    return {"entities": entities, "relationships": relationships, "positions": positions}
@@ -1,12 +1,43 @@
-def generate_manim_code(json_schema):
-    """Generate Manim code to render the geometric scene based on computed positions."""
-    positions = json_schema["positions"]
-    entities = {entity["id"]: entity for entity in json_schema["entities"]}
-    relationships = json_schema.get("relationships", [])
-    
-    code = """from manim import *
+import json
+import keyword
+import re
+from collections import defaultdict
+
 import numpy as np
 
+from metrics import traced
+
+HEADER = """from manim import *
+import numpy as np
+
+# Labels repeat across scenes, so reuse parsed glyphs instead of re-running Pango
+try:
+    from label_cache import cached_text
+except ImportError:
+    import logging
+    logging.warning("label_cache is not importable; labels are laid out by Pango on every render")
+
+    def cached_text(text, font_size=24):
+        return Text(text, font_size=font_size)
+
+# The grid is composited from a raster rendered once per resolution and style
+try:
+    from background import use_grid_background
+except ImportError:
+    import logging
+    logging.warning("background is not importable; the grid is stroked on every frame")
+
+    def use_grid_background(scene):
+        scene.add(NumberPlane(
+            x_range=[-20, 20, 15],
+            y_range=[-15, 15, 15],
+            background_line_style={
+                "stroke_color": BLUE_D,
+                "stroke_width": 0.5,
+                "stroke_opacity": 0.3
+            }
+        ))
+
 class GeometricScene(Scene):
     def construct(self):
         # Create a title for the scene
@@ -15,180 +46,356 @@ class GeometricScene(Scene):
         # self.add(title)
         
         # Create a coordinate grid for reference
-        grid = NumberPlane(
-            x_range=[-20, 20, 15],
-            y_range=[-15, 15, 15],
-            background_line_style={
-                "stroke_color": BLUE_D,
-                "stroke_width": 0.5,
-                "stroke_opacity": 0.3
-            }
-        )
-        self.add(grid)
+        use_grid_background(self)
         
         # Create objects
 """
-    # Track entities for later use in relationships
-    entity_objects = {}
-    
+
+# Color mapping based on polygon type
+POLYGON_COLORS = {
+    3: "GREEN",     # Triangle
+    4: "PURPLE",    # Square/Rectangle
+    5: "TEAL",      # Pentagon
+    6: "GOLD",      # Hexagon
+}
+
+POLYGON_NAMES = {3: "Triangle", 5: "Pentagon", 6: "Hexagon"}
+
+# Entities are animated in this order: points, polygons, circles, then lines
+ANIMATION_ORDER = (("point", "FadeIn"), ("polygon", "Create"), ("circle", "Create"), ("line", "Create"))
+
+# Grouped mode plays one LaggedStart per phase instead of one self.play per entity;
+# inscribed highlights and tangent points form a final "annotations" phase
+ANIMATION_PHASES = (("points", ("point",)), ("shapes", ("polygon", "circle")), ("lines", ("line",)))
+ANIMATIONS_BY_TYPE = dict(ANIMATION_ORDER)
+DEFAULT_GROUPED_DURATION = 4.0
+GROUP_LAG_RATIO = 0.1
+
+# Names the generated scene uses itself, which entity ids must not shadow
+RESERVED_NAMES = {
+    "self", "np", "cached_text", "use_grid_background", "Circle", "Dot", "Line", "Polygon", "DashedVMobject",
+    "LaggedStart", "Create", "FadeIn", "BLUE", "WHITE", "YELLOW", "RED", "UP", "RIGHT", *POLYGON_COLORS.values(),
+}
+
+# Coordinates are rounded to this many decimals before code is emitted or mobjects are built
+COORDINATE_DECIMALS = 4
+
+
+def polygon_name(sides, vertices):
+    """Special name for known regular polygons; four sides are told apart as Square or Rectangle."""
+    if sides != 4:
+        return POLYGON_NAMES.get(sides, f"{sides}-gon")
+    # Check if it's a square (all sides equal)
+    lengths = [
+        ((vertices[i][0] - vertices[(i + 1) % 4][0]) ** 2 + (vertices[i][1] - vertices[(i + 1) % 4][1]) ** 2) ** 0.5
+        for i in range(4)
+    ]
+    is_square = all(abs(lengths[i] - lengths[i - 1]) <= 0.001 for i in range(1, 4))
+    return "Square" if is_square else "Rectangle"
+
+
+def index_relationships(relationships):
+    """Index relationships once, by type and by the entity they start from."""
+    by_type = defaultdict(list)
+    by_source = defaultdict(list)
+    for rel in relationships:
+        by_type[rel["type"]].append(rel)
+        source = rel.get("from", rel.get("shape", rel.get("line")))
+        if source is not None:
+            by_source[source].append(rel)
+    return by_type, by_source
+
+
+DIGITS = re.compile(r"(\d+)")
+
+
+def natural_key(entity_id):
+    """Sort key that orders ids like people do: C2 before C10."""
+    return [int(part) if part.isdigit() else part for part in DIGITS.split(str(entity_id))]
+
+
+# Position keys holding coordinates; anything else (e.g. a label string) is copied unchanged
+NUMERIC_KEYS = ("center", "radius", "point", "start", "end", "vertices")
+
+
+def _round(value):
+    """Round a point; + 0.0 turns -0.0 into 0.0 so it prints the same."""
+    return [round(float(x), COORDINATE_DECIMALS) + 0.0 for x in value]
+
+
+class CanonicalSchema(dict):
+    """A schema already in canonical form, so canonical_schema returns it as is."""
+
+
+def _round_all(values):
+    """Round a list of numbers or of equal-length points in one NumPy call."""
+    if not values:
+        return []
+    try:
+        return (np.round(np.asarray(values, dtype=float), COORDINATE_DECIMALS) + 0.0).tolist()
+    except ValueError:
+        if not isinstance(values[0], list):
+            raise
+        # Points of mixed dimension
+        return [_round(point) for point in values]
+
+
+def _round_positions(positions, entity_ids):
+    """Positions in entity order with coordinates rounded in bulk, one NumPy call per key.
+
+    Only NUMERIC_KEYS are rounded; other keys are copied as they are.
+    """
+    result = {entity_id: dict(positions[entity_id]) for entity_id in entity_ids}
+    for key in NUMERIC_KEYS:
+        owners = [pos for pos in result.values() if key in pos]
+        if key == "vertices":
+            rounded = _round_all([vertex for pos in owners for vertex in pos[key]])
+            start = 0
+            for pos in owners:
+                end = start + len(pos[key])
+                pos[key] = rounded[start:end]
+                start = end
+        else:
+            for pos, value in zip(owners, _round_all([pos[key] for pos in owners])):
+                pos[key] = value
+    return result
+
+
+def canonical_schema(json_schema):
+    """Copy of the schema in a canonical form that does not depend on how the LLM ordered it.
+
+    Entities are sorted by id, relationships are sorted and deduplicated, and
+    positions follow entity order with coordinates rounded to COORDINATE_DECIMALS.
+    Equal scenes then produce identical code and mobjects, so manim's per-play
+    partial movie hashes (and the render cache) stay valid across small edits.
+    The result is a CanonicalSchema, which is returned unchanged if passed back in.
+    """
+    if isinstance(json_schema, CanonicalSchema):
+        return json_schema
+    entities = sorted(json_schema["entities"], key=lambda entity: natural_key(entity["id"]))
+    relationships = {
+        json.dumps(rel, sort_keys=True): rel for rel in json_schema.get("relationships", [])
+    }
+    positions = json_schema["positions"]
+    return CanonicalSchema(
+        json_schema,
+        entities=entities,
+        relationships=[relationships[key] for key in sorted(relationships)],
+        positions=_round_positions(positions, [entity["id"] for entity in entities if entity["id"] in positions]),
+    )
+
+
+def _xy(point):
+    """Point literal for coordinates already rounded by _round, so repr() prints the same digits every run."""
+    return f"np.array([{point[0]!r}, {point[1]!r}, 0])"
+
+
+# Helper variables the scene derives from an entity's name
+DERIVED_SUFFIXES = ("_label", "_vertices", "_tangent_point")
+DERIVED_PREFIX = "inscribed_relation_"
+
+
+def _reserved(name):
+    return (
+        not name.isidentifier() or keyword.iskeyword(name) or name in RESERVED_NAMES
+        or name.startswith(DERIVED_PREFIX)
+    )
+
+
+def _stem(name):
+    """Entity name that `name` would be a derived helper of, or None."""
+    if name.endswith(DERIVED_SUFFIXES):
+        return next(name[:-len(derived)] for derived in DERIVED_SUFFIXES if name.endswith(derived))
+    return None
+
+
+def variable_names(entity_ids):
+    """Unique Python identifiers for entity ids, assigned in canonical order.
+
+    A name is never another entity's derived helper name (e.g. `P_label` next to `P`).
+    """
+    names = {}
+    taken = set()
+    # Stems of taken names that end in a derived suffix: `P` once `P_label` is taken
+    stems = set()
+    for entity_id in entity_ids:
+        name = str(entity_id)
+        if _reserved(name):
+            name = re.sub(r"\W", "_", name)
+            if _reserved(name):
+                name = f"e_{name}"
+        candidate, suffix = name, 2
+        while candidate in taken or candidate in stems or _stem(candidate) in taken:
+            candidate = f"{name}_{suffix}"
+            suffix += 1
+        taken.add(candidate)
+        stem = _stem(candidate)
+        if stem is not None:
+            stems.add(stem)
+        names[entity_id] = candidate
+    return names
+
+
+def _show(obj, animation, still):
+    """Animate an object into the scene, or just add it when only the final frame is rendered."""
+    if still:
+        return f"        self.add({obj})\n"
+    return f"        self.play({animation}({obj}))\n"
+
+
+def _play_group(items, run_time):
+    """One self.play for a whole phase of (object, animation) pairs."""
+    animations = ", ".join(f"{animation}({obj})" for obj, animation in items)
+    return f"        self.play(LaggedStart({animations}, lag_ratio={GROUP_LAG_RATIO}), run_time={run_time})\n"
+
+
+def phase_run_time(num_phases, duration=None):
+    """Split the total duration budget evenly across the non-empty phases and the closing hold."""
+    return round((duration or DEFAULT_GROUPED_DURATION) / (num_phases + 1), 4)
+
+
+def final_wait(num_phases, duration=None):
+    """The closing hold gets whatever the phases leave, so the scene lasts exactly `duration`."""
+    return round((duration or DEFAULT_GROUPED_DURATION) - num_phases * phase_run_time(num_phases, duration), 4)
+
+
+@traced("codegen")
+def generate_manim_code(json_schema, still=False, grouped=False, duration=None):
+    """Generate Manim code to render the geometric scene based on computed positions.
+
+    Runs in time linear in the number of entities and relationships: relationships
+    are indexed once and every line is appended to a list that is joined at the end.
+    With still=True every object is added without animations, so rendering with
+    manim's -s flag only rasterizes the last frame to PNG. With grouped=True the
+    animations are batched into at most four segments (points, shapes, lines,
+    annotations) that share a total budget of `duration` seconds with the final wait.
+
+    The schema is canonicalized first and labels are added in one call after the
+    entity animations, so editing one entity only changes the plays from that
+    entity onwards and manim reuses the cached partial movies before it.
+    """
+    grouped = grouped and not still
+    json_schema = canonical_schema(json_schema)
+    positions = json_schema["positions"]
+    entities = {entity["id"]: entity for entity in json_schema["entities"]}
+    names = variable_names(positions)
+    by_type, by_source = index_relationships(json_schema["relationships"])
+
+    out = [HEADER]
+    emit = out.append
+
     # Create entities
     for entity_id, pos in positions.items():
         entity_type = entities[entity_id]["type"]
-        
+        name = names[entity_id]
+
         if entity_type == "circle":
-            center = pos["center"]
-            radius = pos["radius"]
-            code += f"        {entity_id} = Circle(radius={radius}).move_to(np.array([{center[0]}, {center[1]}, 0]))\n"
-            code += f"        {entity_id}.set_stroke(color=BLUE)\n"
-            entity_objects[entity_id] = {"type": "circle", "manim_obj": f"{entity_id}"}
-        
+            emit(f"        {name} = Circle(radius={pos['radius']!r}).move_to({_xy(pos['center'])})\n")
+            emit(f"        {name}.set_stroke(color=BLUE)\n")
+
         elif entity_type == "point":
-            point = pos["point"]
-            code += f"        {entity_id} = Dot(np.array([{point[0]}, {point[1]}, 0]), color=WHITE)\n"
-            entity_objects[entity_id] = {"type": "point", "manim_obj": f"{entity_id}"}
-        
+            emit(f"        {name} = Dot({_xy(pos['point'])}, color=WHITE)\n")
+
         elif entity_type == "line":
-            start = pos["start"]
-            end = pos["end"]
-            code += f"        {entity_id} = Line(np.array([{start[0]}, {start[1]}, 0]), np.array([{end[0]}, {end[1]}, 0]))\n"
-            code += f"        {entity_id}.set_stroke(color=YELLOW)\n"
-            entity_objects[entity_id] = {"type": "line", "manim_obj": f"{entity_id}"}
-        
+            emit(f"        {name} = Line({_xy(pos['start'])}, {_xy(pos['end'])})\n")
+            emit(f"        {name}.set_stroke(color=YELLOW)\n")
+
         elif entity_type == "polygon":
             vertices = pos["vertices"]
             sides = entities[entity_id]["sides"]
-            
-            # Convert vertices to the required format for Manim
-            vertices_str = ", ".join(f"np.array([{v[0]}, {v[1]}, 0])" for v in vertices)
-            
-            # Color mapping based on polygon type
-            colors = {
-                3: "GREEN",     # Triangle
-                4: "PURPLE",    # Square/Rectangle
-                5: "TEAL",      # Pentagon
-                6: "GOLD",      # Hexagon
-            }
-            color = colors.get(sides, "WHITE")
-            
-            # Create the polygon
-            code += f"        {entity_id}_vertices = [{vertices_str}]\n"
-            code += f"        {entity_id} = Polygon(*{entity_id}_vertices, color={color})\n"
-            
-            # Add special name if it's a known regular polygon
-            if sides == 3:
-                polygon_name = "Triangle"
-            elif sides == 4:
-                # Check if it's a square (all sides equal)
-                is_square = True
-                for i in range(sides):
-                    next_i = (i + 1) % sides
-                    current_side = [vertices[i][0] - vertices[next_i][0], vertices[i][1] - vertices[next_i][1]]
-                    current_length = (current_side[0]**2 + current_side[1]**2)**0.5
-                    
-                    if i > 0:
-                        if abs(current_length - prev_length) > 0.001:
-                            is_square = False
-                            break
-                    prev_length = current_length
-                
-                polygon_name = "Square" if is_square else "Rectangle"
-            elif sides == 5:
-                polygon_name = "Pentagon"
-            elif sides == 6:
-                polygon_name = "Hexagon"
-            else:
-                polygon_name = f"{sides}-gon"
-                
-            # Get unit if specified
+            vertices_str = ", ".join(_xy(v) for v in vertices)
+            color = POLYGON_COLORS.get(sides, "WHITE")
+            emit(f"        {name}_vertices = [{vertices_str}]\n")
+            emit(f"        {name} = Polygon(*{name}_vertices, color={color})\n")
+
+            # Add comment about the polygon type, with its unit if specified
             unit = entities[entity_id].get("unit", "")
             unit_str = f" ({unit})" if unit else ""
-            
-            # Add comment about the polygon type
-            code += f"        # This is a {polygon_name}{unit_str}\n"
-            entity_objects[entity_id] = {"type": "polygon", "manim_obj": f"{entity_id}"}
-    
-    # Define a variable to track if we've created relationship visualizations
-    has_inscribed_relations = False
-    
-    # Handle relationships (inscribed circles, etc.)
-    for rel in relationships:
-        if rel["type"] == "inscribed":
-            shape_id = rel["shape"]
-            in_shape_id = rel["in"]
-            
-            if entities[shape_id]["type"] == "circle" and entities[in_shape_id]["type"] == "polygon":
-                # Highlight the inscribed relationship
-                has_inscribed_relations = True
-                code += f"        # Highlight the inscribed relationship between {shape_id} and {in_shape_id}\n"
-                code += f"        inscribed_relation_{shape_id}_{in_shape_id} = DashedVMobject({shape_id}, num_dashes=15)\n"
-                code += f"        inscribed_relation_{shape_id}_{in_shape_id}.set_stroke(opacity=0.7, color=RED)\n"
-    
-    # Add animations for creating entities in logical order
-    point_ids = [entity["id"] for entity in json_schema["entities"] if entity["type"] == "point"]
-    polygon_ids = [entity["id"] for entity in json_schema["entities"] if entity["type"] == "polygon"]
-    circle_ids = [entity["id"] for entity in json_schema["entities"] if entity["type"] == "circle"]
-    line_ids = [entity["id"] for entity in json_schema["entities"] if entity["type"] == "line"]
-    
-    # Add points first
-    for pid in point_ids:
-        code += f"        self.play(FadeIn({pid}))\n"
-    
-    # Then add polygons
-    for poly_id in polygon_ids:
-        code += f"        self.play(Create({poly_id}))\n"
-    
-    # Then add circles
-    for cid in circle_ids:
-        code += f"        self.play(Create({cid}))\n"
-    
-    # Finally add lines (including tangent lines)
-    for lid in line_ids:
-        code += f"        self.play(Create({lid}))\n"
-    
-    # Add relationship visualizations
-    for rel in relationships:
-        if rel["type"] == "inscribed":
-            shape_id = rel["shape"]
-            in_shape_id = rel["in"]
-            if entities[shape_id]["type"] == "circle" and entities[in_shape_id]["type"] == "polygon":
-                code += f"        self.play(Create(inscribed_relation_{shape_id}_{in_shape_id}))\n"
-    
-    # Add labels to all entities
+            emit(f"        # This is a {polygon_name(sides, vertices)}{unit_str}\n")
+
+    # Highlight circles inscribed in polygons
+    inscribed = [
+        (names[rel["shape"]], names[rel["in"]], f"inscribed_relation_{names[rel['shape']]}_{names[rel['in']]}")
+        for rel in by_type["inscribed"]
+        if entities[rel["shape"]]["type"] == "circle" and entities[rel["in"]]["type"] == "polygon"
+    ]
+    for shape_name, in_shape_name, name in inscribed:
+        emit(f"        # Highlight the inscribed relationship between {shape_name} and {in_shape_name}\n")
+        emit(f"        {name} = DashedVMobject({shape_name}, num_dashes=15)\n")
+        emit(f"        {name}.set_stroke(opacity=0.7, color=RED)\n")
+
+    # Tangent lines get a red dot at their point of contact, each under its own name
+    tangent_points = []
+    for entity_id, pos in positions.items():
+        if entities[entity_id]["type"] == "line" and any(rel["type"] == "tangent" for rel in by_source[entity_id]):
+            name = f"{names[entity_id]}_tangent_point"
+            emit(f"        {name} = Dot({_xy(pos['end'])}, color=RED)\n")
+            tangent_points.append(name)
+
+    # Labels are built up front and added together, so they never sit between two plays
+    labels = []
     for entity_id, pos in positions.items():
         entity_type = entities[entity_id]["type"]
-        
+        name = names[entity_id]
+        text = f"cached_text({entity_id!r}, font_size=24)"
+
         if entity_type == "circle":
-            center = pos["center"]
-            code += f"        {entity_id}_label = Text('{entity_id}', font_size=24).next_to({entity_id}, UP)\n"
-            code += f"        self.add({entity_id}_label)\n"
-            
+            emit(f"        {name}_label = {text}.next_to({name}, UP)\n")
         elif entity_type == "point":
-            code += f"        {entity_id}_label = Text('{entity_id}', font_size=24).next_to({entity_id}, RIGHT)\n"
-            code += f"        self.add({entity_id}_label)\n"
-            
+            emit(f"        {name}_label = {text}.next_to({name}, RIGHT)\n")
         elif entity_type == "line":
-            start = pos["start"]
-            end = pos["end"]
-            mid_x = (start[0] + end[0]) / 2
-            mid_y = (start[1] + end[1]) / 2
-            code += f"        {entity_id}_label = Text('{entity_id}', font_size=24).move_to(np.array([{mid_x}, {mid_y}, 0]) + np.array([0, 0.2, 0]))\n"
-            code += f"        self.add({entity_id}_label)\n"
-            
-            # Add tangent point if it's a tangent line
-            if any(rel["type"] == "tangent" and rel["from"] == entity_id for rel in relationships):
-                code += f"        tangent_point = Dot(np.array([{end[0]}, {end[1]}, 0]), color=RED)\n"
-                code += f"        self.play(FadeIn(tangent_point))\n"
-                
+            start, end = pos["start"], pos["end"]
+            midpoint = _round([(start[0] + end[0]) / 2, (start[1] + end[1]) / 2])
+            emit(f"        {name}_label = {text}.move_to({_xy(midpoint)} + np.array([0, 0.2, 0]))\n")
         elif entity_type == "polygon":
             # Calculate center of polygon for label placement
             vertices = pos["vertices"]
-            center_x = sum(v[0] for v in vertices) / len(vertices)
-            center_y = sum(v[1] for v in vertices) / len(vertices)
-            code += f"        {entity_id}_label = Text('{entity_id}', font_size=24).move_to(np.array([{center_x}, {center_y}, 0]))\n"
-            code += f"        self.add({entity_id}_label)\n"
-    
-    code += "        self.wait(2)\n"
-    return code
+            center = _round([sum(v[0] for v in vertices) / len(vertices), sum(v[1] for v in vertices) / len(vertices)])
+            emit(f"        {name}_label = {text}.move_to({_xy(center)})\n")
+        else:
+            continue
+        labels.append(f"{name}_label")
+
+    # Add animations for creating entities in logical order
+    ids_by_type = defaultdict(list)
+    for entity_id in positions:
+        ids_by_type[entities[entity_id]["type"]].append(names[entity_id])
+    if grouped:
+        phases = [
+            [(name, ANIMATIONS_BY_TYPE[entity_type]) for entity_type in types for name in ids_by_type[entity_type]]
+            for _, types in ANIMATION_PHASES
+        ]
+        annotations = [(name, "Create") for _, _, name in inscribed]
+        annotations += [(name, "FadeIn") for name in tangent_points]
+        num_phases = sum(map(bool, phases)) + bool(annotations)
+        run_time = phase_run_time(num_phases, duration)
+        for phase in phases:
+            if phase:
+                emit(_play_group(phase, run_time))
+    else:
+        for entity_type, animation in ANIMATION_ORDER:
+            for name in ids_by_type[entity_type]:
+                emit(_show(name, animation, still))
+
+        # Add relationship visualizations
+        for _, _, name in inscribed:
+            emit(_show(name, "Create", still))
+
+    # Add labels to all entities
+    if labels:
+        emit(f"        self.add({', '.join(labels)})\n")
+
+    if grouped:
+        if annotations:
+            emit(_play_group(annotations, run_time))
+    else:
+        for name in tangent_points:
+            emit(_show(name, "FadeIn", still))
+    if grouped:
+        emit(f"        self.wait({final_wait(num_phases, duration)})\n")
+    elif not still:
+        emit("        self.wait(2)\n")
+    return "".join(out)
 
 
 # Example usage with the provided schemas
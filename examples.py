@@ -0,0 +1,378 @@
+import hashlib
+import json
+import math
+import re
+from collections import Counter
+
+PROMPT_INTRO = """You are a geometric parser with expert knowledge of geometric principles. Convert the following natural language description into a JSON schema with 'entities', 'relationships', and mathematically precise 'positions'. Provide coordinates rounded to four decimal places."""
+
+# Formula sections, each included only when one of its keywords appears in the request
+PRINCIPLES = [
+    (
+        {"tangent", "tangents"},
+        """TANGENT FROM EXTERNAL POINT:
+   - For circle C(cx,cy) radius r, point P(px,py):
+     - Distance d = sqrt((px - cx)^2 + (py - cy)^2)
+     - Tangent length L = sqrt(d^2 - r^2)
+     - For specified L, d = sqrt(r^2 + L^2)
+     - If C at (0,0), P at (d,0): T1 = (r^2/d, r*L/d), T2 = (r^2/d, -r*L/d)""",
+    ),
+    (
+        {"inscribe", "inscribed", "polygon", "triangle", "square", "pentagon", "hexagon", "octagon", "regular"},
+        """INSCRIBED REGULAR POLYGON:
+   - n sides, radius r: vertices at [r*cos(2πk/n), r*sin(2πk/n)], k=0 to n-1""",
+    ),
+    (
+        {"common", "circles"},
+        """COMMON TANGENT TO TWO CIRCLES:
+   - Centers C1(x1,y1,r1), C2(x2,y2,r2), distance d = sqrt((x2-x1)^2 + (y2-y1)^2)
+   - External tangent slope m = ±(r1 - r2)/d if y1 = y2""",
+    ),
+    (
+        {"intersection", "intersect", "intersects", "meet", "meets", "cross", "crosses"},
+        """LINE INTERSECTION:
+   - Lines y = m1x + b1 and y = m2x + b2: x = (b2 - b1)/(m1 - m2), y = m1x + b1""",
+    ),
+]
+
+EXAMPLES = [
+    {
+        "description": "Draw a circle with radius 2 centered at origin and two tangent lines of length 3 from point P.",
+        "output": """{
+  "entities": [
+    {"type": "circle", "id": "C1", "radius": 2},
+    {"type": "point", "id": "P"},
+    {"type": "line", "id": "L1"},
+    {"type": "line", "id": "L2"}
+  ],
+  "relationships": [
+    {"type": "tangent", "from": "L1", "to": "C1", "from_point": "P"},
+    {"type": "tangent", "from": "L2", "to": "C1", "from_point": "P"}
+  ],
+  "positions": {
+    "C1": {"center": [0.0000, 0.0000], "radius": 2},
+    "P": {"point": [3.6056, 0.0000]},
+    "L1": {"start": [3.6056, 0.0000], "end": [1.1094, 1.6641]},
+    "L2": {"start": [3.6056, 0.0000], "end": [1.1094, -1.6641]}
+  }
+}""",
+    },
+    {
+        "description": "Draw a circle with radius 3 and inscribe a regular pentagon.",
+        "output": """{
+  "entities": [
+    {"type": "circle", "id": "C1", "radius": 3},
+    {"type": "polygon", "id": "P1", "sides": 5}
+  ],
+  "relationships": [
+    {"type": "inscribed", "shape": "P1", "in": "C1"}
+  ],
+  "positions": {
+    "C1": {"center": [0.0000, 0.0000], "radius": 3},
+    "P1": {"vertices": [
+      [3.0000, 0.0000],
+      [0.9271, 2.8532],
+      [-2.4271, 1.7634],
+      [-2.4271, -1.7634],
+      [0.9271, -2.8532]
+    ]}
+  }
+}""",
+    },
+    {
+        "description": "Draw two circles C1 radius 4 at (0,0) and C2 radius 2 at (10,0). Draw their common external tangents.",
+        "output": """{
+  "entities": [
+    {"type": "circle", "id": "C1", "radius": 4},
+    {"type": "circle", "id": "C2", "radius": 2},
+    {"type": "line", "id": "L1"},
+    {"type": "line", "id": "L2"}
+  ],
+  "relationships": [
+    {"type": "tangent", "from": "L1", "to": "C1"},
+    {"type": "tangent", "from": "L1", "to": "C2"},
+    {"type": "tangent", "from": "L2", "to": "C1"},
+    {"type": "tangent", "from": "L2", "to": "C2"}
+  ],
+  "positions": {
+    "C1": {"center": [0.0000, 0.0000], "radius": 4},
+    "C2": {"center": [10.0000, 0.0000], "radius": 2},
+    "L1": {"start": [0.8000, 3.9192], "end": [10.4000, 1.9596]},
+    "L2": {"start": [0.8000, -3.9192], "end": [10.4000, -1.9596]}
+  }
+}""",
+    },
+    {
+        "description": "Draw a line from (0,0) to (4,4) and another from (0,4) to (4,0). Find their intersection.",
+        "output": """{
+  "entities": [
+    {"type": "line", "id": "L1"},
+    {"type": "line", "id": "L2"},
+    {"type": "point", "id": "P1"}
+  ],
+  "relationships": [
+    {"type": "intersection", "between": ["L1", "L2"], "at": "P1"}
+  ],
+  "positions": {
+    "L1": {"start": [0.0000, 0.0000], "end": [4.0000, 4.0000]},
+    "L2": {"start": [0.0000, 4.0000], "end": [4.0000, 0.0000]},
+    "P1": {"point": [2.0000, 2.0000]}
+  }
+}""",
+    },
+    {
+        "description": "Draw a circle radius 5 with a chord of length 8.",
+        "output": """{
+  "entities": [
+    {"type": "circle", "id": "C1", "radius": 5},
+    {"type": "line", "id": "L1"}
+  ],
+  "relationships": [
+    {"type": "chord", "line": "L1", "in": "C1"}
+  ],
+  "positions": {
+    "C1": {"center": [0.0000, 0.0000], "radius": 5},
+    "L1": {"start": [-4.0000, 3.0000], "end": [4.0000, 3.0000]}
+  }
+}""",
+    },
+    {
+        "description": "Draw a triangle with vertices at (0,0), (4,0), and (2,3). Inscribe a circle.",
+        "output": """{
+  "entities": [
+    {"type": "polygon", "id": "T1", "sides": 3},
+    {"type": "circle", "id": "C1"}
+  ],
+  "relationships": [
+    {"type": "inscribed", "shape": "C1", "in": "T1"}
+  ],
+  "positions": {
+    "T1": {"vertices": [[0.0000, 0.0000], [4.0000, 0.0000], [2.0000, 3.0000]]},
+    "C1": {"center": [2.0000, 1.0704], "radius": 1.0704}
+  }
+}""",
+    },
+    {
+        "description": "Draw two circles radius 3 at (0,0) and (5,0). Draw their common internal tangents.",
+        "output": """{
+  "entities": [
+    {"type": "circle", "id": "C1", "radius": 3},
+    {"type": "circle", "id": "C2", "radius": 3},
+    {"type": "line", "id": "L1"},
+    {"type": "line", "id": "L2"}
+  ],
+  "relationships": [
+    {"type": "tangent", "from": "L1", "to": "C1"},
+    {"type": "tangent", "from": "L1", "to": "C2"},
+    {"type": "tangent", "from": "L2", "to": "C1"},
+    {"type": "tangent", "from": "L2", "to": "C2"}
+  ],
+  "positions": {
+    "C1": {"center": [0.0000, 0.0000], "radius": 3},
+    "C2": {"center": [5.0000, 0.0000], "radius": 3},
+    "L1": {"start": [0.0000, 3.0000], "end": [5.0000, 3.0000]},
+    "L2": {"start": [0.0000, -3.0000], "end": [5.0000, -3.0000]}
+  }
+}""",
+    },
+    {
+        "description": "Draw a circle radius 2 at (0,0) and a line from (-3,3) to (3,-3). Find intersection points.",
+        "output": """{
+  "entities": [
+    {"type": "circle", "id": "C1", "radius": 2},
+    {"type": "line", "id": "L1"},
+    {"type": "point", "id": "P1"},
+    {"type": "point", "id": "P2"}
+  ],
+  "relationships": [
+    {"type": "intersection", "between": ["C1", "L1"], "at": ["P1", "P2"]}
+  ],
+  "positions": {
+    "C1": {"center": [0.0000, 0.0000], "radius": 2},
+    "L1": {"start": [-3.0000, 3.0000], "end": [3.0000, -3.0000]},
+    "P1": {"point": [-1.4142, 1.4142]},
+    "P2": {"point": [1.4142, -1.4142]}
+  }
+}""",
+    },
+    {
+        "description": "Draw a square with side length 4 and circumscribe a circle.",
+        "output": """{
+  "entities": [
+    {"type": "polygon", "id": "S1", "sides": 4},
+    {"type": "circle", "id": "C1"}
+  ],
+  "relationships": [
+    {"type": "circumscribed", "shape": "C1", "around": "S1"}
+  ],
+  "positions": {
+    "S1": {"vertices": [[-2.0000, -2.0000], [2.0000, -2.0000], [2.0000, 2.0000], [-2.0000, 2.0000]]},
+    "C1": {"center": [0.0000, 0.0000], "radius": 2.8284}
+  }
+}""",
+    },
+    {
+        "description": "Draw a circle radius 3 and a point P at (5,5). Draw a line from P tangent to the circle.",
+        "output": """{
+  "entities": [
+    {"type": "circle", "id": "C1", "radius": 3},
+    {"type": "point", "id": "P"},
+    {"type": "line", "id": "L1"}
+  ],
+  "relationships": [
+    {"type": "tangent", "from": "L1", "to": "C1", "from_point": "P"}
+  ],
+  "positions": {
+    "C1": {"center": [0.0000, 0.0000], "radius": 3},
+    "P": {"point": [5.0000, 5.0000]},
+    "L1": {"start": [5.0000, 5.0000], "end": [-1.0209, 2.8209]}
+  }
+}""",
+    },
+    {
+        "description": "Draw an equilateral triangle with side 6 and inscribe a circle.",
+        "output": """{
+  "entities": [
+    {"type": "polygon", "id": "T1", "sides": 3},
+    {"type": "circle", "id": "C1"}
+  ],
+  "relationships": [
+    {"type": "inscribed", "shape": "C1", "in": "T1"}
+  ],
+  "positions": {
+    "T1": {"vertices": [[0.0000, 0.0000], [6.0000, 0.0000], [3.0000, 5.1962]]},
+    "C1": {"center": [3.0000, 1.7321], "radius": 1.7321}
+  }
+}""",
+    },
+]
+
+DEFAULT_TOP_K = 3
+# Numbers and coordinates say nothing about which construction is meant, so only words are terms
+TOKEN = re.compile(r"[a-z]+")
+STOPWORDS = {"a", "an", "and", "the", "of", "with", "at", "from", "to", "in", "draw", "their", "find", "another", "each"}
+# Words mapped onto the entity and relationship types the examples are tagged with
+SYNONYMS = {
+    "triangle": "polygon", "square": "polygon", "rectangle": "polygon", "pentagon": "polygon",
+    "hexagon": "polygon", "heptagon": "polygon", "octagon": "polygon", "gon": "polygon",
+    "inscribe": "inscribed", "inside": "inscribed", "within": "inscribed",
+    "circumscribe": "circumscribed", "around": "circumscribed",
+    "cross": "intersection", "crosses": "intersection", "intersect": "intersection", "meet": "intersection",
+}
+# Words ending in "s" that are not plurals
+SINGULAR = {"radius", "is", "this", "its", "across", "has", "was"}
+
+
+def approx_tokens(text):
+    """Rough LLM token count: words, numbers and punctuation marks."""
+    return len(re.findall(r"\w+|[^\w\s]", text))
+
+
+def _normalize(word):
+    if word in SYNONYMS:
+        return SYNONYMS[word]
+    if word.endswith("s") and not word.endswith("ss") and word not in SINGULAR:
+        word = word[:-1]
+    return SYNONYMS.get(word, word)
+
+
+def _terms(text):
+    return [_normalize(term) for term in TOKEN.findall(text.lower()) if term not in STOPWORDS]
+
+
+def _example_terms(example):
+    # Entity and relationship types count as keywords alongside the description words
+    output = json.loads(example["output"])
+    types = [entity["type"] for entity in output["entities"]]
+    types += [rel["type"] for rel in output.get("relationships", [])]
+    return _terms(example["description"]) + types
+
+
+class ExampleIndex:
+    """TF-IDF index over the worked examples for picking the few most relevant ones."""
+
+    def __init__(self, examples):
+        self.examples = examples
+        documents = [Counter(_example_terms(example)) for example in examples]
+        document_frequency = Counter(term for document in documents for term in document)
+        count = len(documents)
+        self.idf = {term: math.log((1 + count) / (1 + df)) + 1 for term, df in document_frequency.items()}
+        self.vectors = [self._weigh(document) for document in documents]
+
+    def _weigh(self, counts):
+        vector = {term: tf * self.idf.get(term, 0.0) for term, tf in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        return {term: weight / norm for term, weight in vector.items() if weight}
+
+    def top_k(self, description, k=DEFAULT_TOP_K):
+        query = self._weigh(Counter(_terms(description)))
+        scores = [sum(weight * vector.get(term, 0.0) for term, weight in query.items()) for vector in self.vectors]
+        # Ties go to the earlier example; the chosen ones keep library order for a stable prompt
+        best = sorted(range(len(scores)), key=lambda index: (-scores[index], index))[:k]
+        return [self.examples[index] for index in sorted(best)]
+
+
+INDEX = ExampleIndex(EXAMPLES)
+
+# Changes whenever the prompt-building inputs change; used in parse cache keys
+PROMPT_FINGERPRINT = hashlib.sha256(
+    json.dumps([
+        PROMPT_INTRO, [[sorted(keywords), text] for keywords, text in PRINCIPLES], EXAMPLES, SYNONYMS, sorted(SINGULAR)
+    ]).encode("utf-8")
+).hexdigest()
+
+
+def build_prompt(description, k=DEFAULT_TOP_K):
+    """Parse prompt with only the relevant formula sections and the top-k examples.
+
+    k=None includes every principle and example, as the original fixed prompt did.
+    """
+    if k is None:
+        principles = [text for _, text in PRINCIPLES]
+        examples = EXAMPLES
+    else:
+        # Triggers match the words as written: singularizing "circles" would pull the
+        # two-circle section into every prompt that mentions a circle
+        words = set(TOKEN.findall(description.lower()))
+        principles = [text for keywords, text in PRINCIPLES if keywords & words]
+        examples = INDEX.top_k(description, k)
+
+    sections = [PROMPT_INTRO, ""]
+    if principles:
+        sections.append("CRITICAL GEOMETRIC PRINCIPLES AND CALCULATIONS:\n")
+        sections += [f"{i}. {text}\n" for i, text in enumerate(principles, 1)]
+    sections.append("ZERO-SHOT EXAMPLES:\n")
+    sections += [
+        f'{i}. "{example["description"]}"\nOutput: {example["output"]}\n'
+        for i, example in enumerate(examples, 1)
+    ]
+    sections.append(f'Now, parse this input: "{description}"\nOutput only the resulting JSON schema:\n')
+    return "\n".join(sections)
+
+
+def prompt_token_report(descriptions, k=DEFAULT_TOP_K):
+    """Approximate prompt tokens with every example vs. the top-k selection."""
+    full = [approx_tokens(build_prompt(description, None)) for description in descriptions]
+    selected = [approx_tokens(build_prompt(description, k)) for description in descriptions]
+    return {
+        "descriptions": len(descriptions),
+        "k": k,
+        "full_prompt_tokens": sum(full) / len(full),
+        "selected_prompt_tokens": sum(selected) / len(selected),
+        "reduction": 1 - sum(selected) / sum(full),
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Report the prompt size cut over a file of descriptions (or the example library itself)
+    if len(sys.argv) > 1:
+        with open(sys.argv[1]) as f:
+            descriptions = [line.strip() for line in f if line.strip()]
+    else:
+        descriptions = [example["description"] for example in EXAMPLES]
+    report = prompt_token_report(descriptions)
+    print(f"Average prompt tokens over {report['descriptions']} descriptions (approximate):")
+    print(f"  all examples: {report['full_prompt_tokens']:.0f}")
+    print(f"  top-{report['k']}:        {report['selected_prompt_tokens']:.0f}  ({report['reduction']:.0%} smaller)")
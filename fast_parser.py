@@ -0,0 +1,200 @@
+import re
+import sys
+
+from solver import solve_positions
+
+NUM = r"(\d+(?:\.\d+)?)"
+UNIT = r"(?:\s*(?:cm|mm|m|units?|inch(?:es)?))?"
+POLYGON = (
+    r"(equilateral triangle|triangle|square|pentagon|hexagon|heptagon|octagon|nonagon|decagon"
+    r"|\d+-gon|polygon with \d+ sides)"
+)
+
+POLYGON_SIDES = {
+    "equilateral triangle": 3,
+    "triangle": 3,
+    "square": 4,
+    "pentagon": 5,
+    "hexagon": 6,
+    "heptagon": 7,
+    "octagon": 8,
+    "nonagon": 9,
+    "decagon": 10,
+}
+POLYGON_PREFIX = {3: "T", 4: "S", 5: "P", 6: "H"}
+COUNTS = {"a": 1, "an": 1, "one": 1, "1": 1, "two": 2, "2": 2}
+
+# Clause boundaries: sentence ends, "and", commas, and "with" or a bare article when they
+# introduce a new object
+CLAUSE_SPLIT = re.compile(
+    r"\s*(?:(?:\.(?!\d)|;)\s*|,?\s+and\s+|,\s+|\s+with\s+(?=(?:a|an|one|two|\d+)\s)"
+    r"|\s+(?=(?:a|an|one|two|\d+)\s+(?:tangent|chord)))\s*"
+)
+# Coordinates are rewritten as "(x y)" so their comma does not split a clause
+COORDINATES = re.compile(r"\(\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*\)")
+FILLER = re.compile(r"^(?:please(?:\s+|$))?(?:(?:draw|construct|create|make|then|also)(?:\s+|$))*")
+
+CIRCLE_RE = re.compile(
+    rf"(?:a |the )?circle (?:of |with )?(?:a )?radius (?:of )?{NUM}{UNIT}"
+    r"(?: (?:centered |centred )?at (?:(?:the )?origin|\((-?\d+(?:\.\d+)?) (-?\d+(?:\.\d+)?)\)))?"
+)
+TANGENT_RE = re.compile(
+    r"(?:(a|an|one|two|1|2) )?tangents?(?: lines?)?"
+    rf"(?: (?:of|with) (?:a )?length (?:of )?{NUM}{UNIT})?(?: each)?"
+    r"(?: (?:drawn )?from (?:a |the )?(?:single |same )?(?:external )?point (\w+))?"
+    r"(?: (?:outside|to) the circle)?"
+)
+INSCRIBE_RE = re.compile(
+    rf"inscribe (?:a |an )?(?:regular )?{POLYGON}(?: of)?"
+    rf"(?: in (?:a |the )?circle(?: (?:of |with )?(?:a )?radius (?:of )?{NUM}{UNIT})?)?"
+)
+INSCRIBED_RE = re.compile(
+    rf"(?:a |an )?(?:regular )?{POLYGON} inscribed in (?:a |the )?circle"
+    rf"(?: (?:of |with )?(?:a )?radius (?:of )?{NUM}{UNIT})?"
+)
+CHORD_RE = re.compile(rf"(?:a |one )?chord (?:of |with )(?:a )?length (?:of )?{NUM}{UNIT}(?: in the circle)?")
+
+# Coverage counters for the fast path, reported by coverage()
+FAST_PATH_STATS = {"hits": 0, "misses": 0}
+
+
+def _polygon_sides(name):
+    if name in POLYGON_SIDES:
+        return POLYGON_SIDES[name]
+    return int(re.search(r"\d+", name).group())
+
+
+class _Builder:
+    def __init__(self):
+        self.entities = []
+        self.relationships = []
+        self.circle_id = None
+        self.external_point = None
+        self.ids = set()
+
+    def _new_id(self, prefix):
+        index = 1
+        while f"{prefix}{index}" in self.ids:
+            index += 1
+        entity_id = f"{prefix}{index}"
+        self.ids.add(entity_id)
+        return entity_id
+
+    def circle(self, radius, center=None):
+        if self.circle_id is not None:
+            # A second mention of "the circle" must agree with the first one
+            existing = next(e for e in self.entities if e["id"] == self.circle_id)
+            return existing["radius"] == radius and center is None
+        entity = {"type": "circle", "id": self._new_id("C"), "radius": radius}
+        if center is not None:
+            entity["center"] = center
+        self.entities.append(entity)
+        self.circle_id = entity["id"]
+        return True
+
+    def polygon(self, sides):
+        polygon_id = self._new_id(POLYGON_PREFIX.get(sides, "G"))
+        self.entities.append({"type": "polygon", "id": polygon_id, "sides": sides})
+        self.relationships.append({"type": "inscribed", "shape": polygon_id, "in": self.circle_id})
+
+    def tangents(self, count, length, point_name):
+        # Tangents from several external points are left to the LLM, which can say where each point is
+        if point_name in self.ids or self.external_point is not None:
+            return False
+        self.external_point = point_name
+        self.ids.add(point_name)
+        self.entities.append({"type": "point", "id": point_name})
+        for _ in range(count):
+            line_id = self._new_id("L")
+            self.entities.append({"type": "line", "id": line_id, "length": length})
+            self.relationships.append(
+                {"type": "tangent", "from": line_id, "to": self.circle_id, "from_point": point_name}
+            )
+        return True
+
+    def chord(self, length):
+        line_id = self._new_id("L")
+        self.entities.append({"type": "line", "id": line_id, "length": length})
+        self.relationships.append({"type": "chord", "line": line_id, "in": self.circle_id})
+
+
+def _number(text):
+    value = float(text)
+    return int(value) if value.is_integer() else value
+
+
+def _parse_structure(description):
+    text = re.sub(r"\s+", " ", description.lower()).strip()
+    text = COORDINATES.sub(r"(\1 \2)", text)
+    clauses = [FILLER.sub("", clause) for clause in CLAUSE_SPLIT.split(text)]
+    clauses = [clause for clause in clauses if clause]
+    if not clauses:
+        return None
+
+    builder = _Builder()
+    # Objects that need a circle are attached once the circle is known
+    deferred = []
+    for clause in clauses:
+        match = CIRCLE_RE.fullmatch(clause)
+        if match:
+            center = [_number(match.group(2)), _number(match.group(3))] if match.group(2) else None
+            if not builder.circle(_number(match.group(1)), center):
+                return None
+            continue
+
+        match = INSCRIBE_RE.fullmatch(clause) or INSCRIBED_RE.fullmatch(clause)
+        if match:
+            sides = _polygon_sides(match.group(1))
+            # "2-gon" and "polygon with 1 sides" are not polygons; let the LLM make sense of them
+            if sides < 3:
+                return None
+            if match.group(2) is not None and not builder.circle(_number(match.group(2))):
+                return None
+            deferred.append(("polygon", sides))
+            continue
+
+        match = TANGENT_RE.fullmatch(clause)
+        if match and match.group(2) is not None:
+            count = COUNTS[match.group(1)] if match.group(1) else (2 if "tangents" in clause else 1)
+            point_name = match.group(3).upper() if match.group(3) else "P"
+            deferred.append(("tangents", count, _number(match.group(2)), point_name))
+            continue
+
+        match = CHORD_RE.fullmatch(clause)
+        if match:
+            deferred.append(("chord", _number(match.group(1))))
+            continue
+
+        return None
+
+    if builder.circle_id is None:
+        return None
+    for kind, *args in deferred:
+        if getattr(builder, kind)(*args) is False:
+            return None
+    return {"entities": builder.entities, "relationships": builder.relationships}
+
+
+def fast_parse(description):
+    """Parse common phrasings without the LLM; returns None when the description is not covered."""
+    try:
+        structure = _parse_structure(description)
+        schema = solve_positions(structure) if structure is not None else None
+    except ValueError:
+        schema = None
+    FAST_PATH_STATS["hits" if schema is not None else "misses"] += 1
+    return schema
+
+
+def coverage():
+    total = FAST_PATH_STATS["hits"] + FAST_PATH_STATS["misses"]
+    return FAST_PATH_STATS["hits"] / total if total else 0.0
+
+
+if __name__ == "__main__":
+    # Report fast-path coverage over a file with one description per line
+    with open(sys.argv[1]) as f:
+        for line in f:
+            if line.strip():
+                fast_parse(line)
+    print(f"Fast path: {FAST_PATH_STATS['hits']} hits, {FAST_PATH_STATS['misses']} misses, coverage {coverage():.1%}")
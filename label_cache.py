@@ -0,0 +1,81 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+from manim import VGroup, VMobject, Text, __version__ as MANIM_VERSION
+
+LABEL_CACHE_DIR = os.getenv(
+    "TEXT2MANIM_LABEL_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "text2manim", "labels")
+)
+MAX_MEMORY_ENTRIES = 4096
+
+# Parsed label templates, keyed by (text, font, font_size); callers always get a copy
+_TEMPLATES = {}
+LABEL_CACHE_STATS = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+
+def _disk_path(key):
+    digest = hashlib.sha256(json.dumps([*key, MANIM_VERSION]).encode("utf-8")).hexdigest()
+    return os.path.join(LABEL_CACHE_DIR, f"{digest}.npz")
+
+
+def _save(path, label):
+    glyphs = label.family_members_with_points()
+    arrays = {f"glyph_{i}": glyph.points for i, glyph in enumerate(glyphs)}
+    style = {
+        "count": len(glyphs),
+        "fill_color": glyphs[0].get_fill_color().to_hex() if glyphs else "#FFFFFF",
+        "fill_opacity": float(glyphs[0].get_fill_opacity()) if glyphs else 1.0,
+    }
+    os.makedirs(LABEL_CACHE_DIR, exist_ok=True)
+    # Write to a temporary file and rename so concurrent workers never read a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=LABEL_CACHE_DIR, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        np.savez(f, style=np.array(json.dumps(style)), **arrays)
+    os.replace(tmp_path, path)
+
+
+def _load(path):
+    with np.load(path) as data:
+        style = json.loads(str(data["style"]))
+        glyphs = []
+        for i in range(style["count"]):
+            glyph = VMobject()
+            glyph.set_points(data[f"glyph_{i}"])
+            glyphs.append(glyph)
+    label = VGroup(*glyphs)
+    label.set_fill(style["fill_color"], opacity=style["fill_opacity"])
+    label.set_stroke(width=0)
+    return label
+
+
+def cached_text(text, font_size=24, font=""):
+    """A label mobject for `text`, built by Pango only the first time it is seen.
+
+    Templates are kept in memory for the life of the process and as parsed glyph
+    outlines on disk across processes; every call returns a fresh copy.
+    """
+    key = (text, font, font_size)
+    template = _TEMPLATES.get(key)
+    if template is not None:
+        LABEL_CACHE_STATS["memory_hits"] += 1
+        return template.copy()
+
+    path = _disk_path(key)
+    try:
+        template = _load(path)
+        LABEL_CACHE_STATS["disk_hits"] += 1
+    except (OSError, KeyError, ValueError):
+        template = Text(text, font_size=font_size, font=font)
+        LABEL_CACHE_STATS["misses"] += 1
+        try:
+            _save(path, template)
+        except OSError:
+            pass
+
+    if len(_TEMPLATES) >= MAX_MEMORY_ENTRIES:
+        _TEMPLATES.clear()
+    _TEMPLATES[key] = template
+    return template.copy()
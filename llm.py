@@ -0,0 +1,236 @@
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+
+import httpx
+from dotenv import load_dotenv
+
+from examples import approx_tokens
+from metrics import METRICS, count
+
+load_dotenv()
+LLM_BACKEND = os.getenv("TEXT2MANIM_LLM_BACKEND", "groq")
+LLM_BASE_URL = os.getenv("TEXT2MANIM_LLM_BASE_URL")
+LLM_TIMEOUT = float(os.getenv("TEXT2MANIM_LLM_TIMEOUT", "60"))
+LLM_MAX_CONCURRENCY = int(os.getenv("TEXT2MANIM_LLM_MAX_CONCURRENCY", "16"))
+GROQ_DEFAULT_BASE_URL = "https://api.groq.com"
+OPENAI_DEFAULT_BASE_URL = "http://127.0.0.1:8081/v1"
+
+
+class LLMBackend(ABC):
+    """Chat completion backend shared by every parse in the process.
+
+    Subclasses hold one long-lived HTTP client so connections and TLS sessions
+    are reused, and at most `max_concurrency` requests are in flight at once.
+    `identity` names the backend and server, so answers from different servers
+    never share a parse cache entry.
+    """
+
+    identity = None
+
+    def __init__(self, max_concurrency=LLM_MAX_CONCURRENCY):
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    def complete(self, prompt, model):
+        """Full completion text for a single user message."""
+        with self._slots:
+            text, usage = self._complete(prompt, model)
+        self._count_tokens(prompt, text, usage)
+        return text
+
+    def stream(self, prompt, model):
+        """Yield completion text pieces; closing the generator closes the underlying response."""
+        pieces = []
+        try:
+            with self._slots:
+                for piece in self._stream(prompt, model):
+                    pieces.append(piece)
+                    yield piece
+        finally:
+            # Streams are closed early once the JSON ends, so usage is estimated from what was read
+            self._count_tokens(prompt, "".join(pieces), None)
+
+    @staticmethod
+    def _count_tokens(prompt, text, usage):
+        if not METRICS.enabled:
+            return
+        prompt_tokens, completion_tokens = usage or (approx_tokens(prompt), approx_tokens(text))
+        count("llm_requests_total")
+        count("llm_tokens_total", prompt_tokens, kind="prompt")
+        count("llm_tokens_total", completion_tokens, kind="completion")
+
+    @abstractmethod
+    def _complete(self, prompt, model):
+        """Return (text, (prompt_tokens, completion_tokens) or None when the server reports no usage)."""
+
+    @abstractmethod
+    def _stream(self, prompt, model):
+        """Yield completion text pieces."""
+
+    def close(self):
+        pass
+
+
+def _connection_limits(max_concurrency):
+    return httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+
+
+class GroqBackend(LLMBackend):
+    """Groq API through one pooled client. `base_url` defaults to GROQ_BASE_URL or the public API."""
+
+    def __init__(self, api_key=None, base_url=None, timeout=LLM_TIMEOUT, max_concurrency=LLM_MAX_CONCURRENCY,
+                 max_retries=2):
+        super().__init__(max_concurrency)
+        from groq import Groq
+
+        self.identity = backend_identity("groq", base_url)
+        self.http_client = httpx.Client(limits=_connection_limits(max_concurrency), timeout=timeout)
+        self.client = Groq(
+            api_key=api_key or os.getenv("GROQ_API_KEY"), base_url=base_url, timeout=timeout,
+            max_retries=max_retries, http_client=self.http_client,
+        )
+
+    def _complete(self, prompt, model):
+        chat_completion = self.client.chat.completions.create(
+            messages=[{"role": "user", "content": prompt}],
+            model=model,
+            stream=False,
+        )
+        usage = chat_completion.usage
+        tokens = (usage.prompt_tokens, usage.completion_tokens) if usage else None
+        return chat_completion.choices[0].message.content, tokens
+
+    def _stream(self, prompt, model):
+        stream = self.client.chat.completions.create(
+            messages=[{"role": "user", "content": prompt}],
+            model=model,
+            stream=True,
+        )
+        try:
+            for chunk in stream:
+                if chunk.choices:
+                    yield chunk.choices[0].delta.content or ""
+        finally:
+            stream.close()
+
+    def close(self):
+        self.http_client.close()
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    """Any server exposing POST {base_url}/chat/completions, e.g. a local llama.cpp or vLLM server."""
+
+    def __init__(self, base_url=OPENAI_DEFAULT_BASE_URL, api_key=None, timeout=LLM_TIMEOUT,
+                 max_concurrency=LLM_MAX_CONCURRENCY):
+        super().__init__(max_concurrency)
+        self.identity = backend_identity("openai", base_url)
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self.client = httpx.Client(
+            base_url=base_url.rstrip("/"), headers=headers, timeout=timeout, limits=_connection_limits(max_concurrency)
+        )
+
+    def _body(self, prompt, model, stream):
+        return {"model": model, "messages": [{"role": "user", "content": prompt}], "stream": stream}
+
+    def _complete(self, prompt, model):
+        response = self.client.post("/chat/completions", json=self._body(prompt, model, False))
+        response.raise_for_status()
+        body = response.json()
+        usage = body.get("usage")
+        tokens = (usage["prompt_tokens"], usage["completion_tokens"]) if usage else None
+        return body["choices"][0]["message"]["content"], tokens
+
+    def _stream(self, prompt, model):
+        with self.client.stream("POST", "/chat/completions", json=self._body(prompt, model, True)) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices")
+                if choices:
+                    yield choices[0].get("delta", {}).get("content") or ""
+
+    def close(self):
+        self.client.close()
+
+
+class MockBackend(LLMBackend):
+    """Deterministic in-process backend for tests and benchmarks; same answers as mock_llm.py, no network."""
+
+    identity = "mock"
+
+    def __init__(self, chunk_size=16, max_concurrency=LLM_MAX_CONCURRENCY):
+        super().__init__(max_concurrency)
+        self.chunk_size = chunk_size
+
+    def _complete(self, prompt, model):
+        from mock_llm import mock_completion_text
+
+        return mock_completion_text(prompt), None
+
+    def _stream(self, prompt, model):
+        content, _ = self._complete(prompt, model)
+        for start in range(0, len(content), self.chunk_size):
+            yield content[start:start + self.chunk_size]
+
+
+BACKENDS = {
+    "groq": GroqBackend,
+    "openai": OpenAICompatibleBackend,
+    "mock": MockBackend,
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def backend_identity(name=LLM_BACKEND, base_url=None):
+    """"name@base_url" of a backend, with the same URL defaults the backends themselves use."""
+    if name == "mock":
+        return "mock"
+    base_url = base_url or LLM_BASE_URL
+    if name == "groq":
+        base_url = base_url or os.getenv("GROQ_BASE_URL") or GROQ_DEFAULT_BASE_URL
+    elif name == "openai":
+        base_url = base_url or OPENAI_DEFAULT_BASE_URL
+    return f"{name}@{base_url.rstrip('/') if base_url else ''}"
+
+
+def current_backend_identity():
+    """Identity of the process-wide backend, without creating it (a cache hit needs no API key)."""
+    backend = _backend
+    if backend is not None:
+        return backend.identity or type(backend).__name__
+    return backend_identity()
+
+
+def create_backend(name=LLM_BACKEND, **options):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend '{name}', expected one of {sorted(BACKENDS)}")
+    if LLM_BASE_URL and name != "mock":
+        options.setdefault("base_url", LLM_BASE_URL)
+    return BACKENDS[name](**options)
+
+
+def get_backend():
+    """The process-wide backend, created from TEXT2MANIM_LLM_* settings on first use."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend()
+    return _backend
+
+
+def set_backend(backend):
+    """Replace the process-wide backend, closing the previous one. Returns the new backend."""
+    global _backend
+    with _backend_lock:
+        if _backend is not None and _backend is not backend:
+            _backend.close()
+        _backend = backend
+    return backend
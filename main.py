@@ -1,298 +1,253 @@
 import json
 import re
 import os
+import subprocess
 from dotenv import load_dotenv
 import logging
-from groq import Groq
 from code_gen import generate_manim_code
+from cache import DEFAULT_CACHE_PATH, PersistentCache, make_cache_key
+from solver import solve_positions
+from validate import repair_schema
+from fast_parser import fast_parse
+from streaming import IncrementalJSONParser
+from examples import DEFAULT_TOP_K, PROMPT_FINGERPRINT, build_prompt
+from llm import current_backend_identity, get_backend
+from metrics import count, span
+from render import manim_env
 # Configure logging
 # logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
 # Load environment variables
 load_dotenv()
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+MODEL = os.getenv("TEXT2MANIM_MODEL", "meta-llama/llama-4-scout-17b-16e-instruct")
 
-# Cache for API responses
+# Cache for API responses (in-process, in front of the persistent cache)
 API_CACHE = {}
 
-def parse_geometric_description(description):
+# Persistent cache shared across runs and worker processes, created on first use
+CACHE_PATH = os.getenv("TEXT2MANIM_CACHE_PATH", DEFAULT_CACHE_PATH)
+CACHE_MAX_ENTRIES = int(os.getenv("TEXT2MANIM_CACHE_MAX_ENTRIES", "10000"))
+CACHE_TTL = float(os.getenv("TEXT2MANIM_CACHE_TTL", "0")) or None
+_persistent_cache = None
+
+
+def get_persistent_cache():
+    global _persistent_cache
+    if _persistent_cache is None:
+        _persistent_cache = PersistentCache(CACHE_PATH, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL)
+    return _persistent_cache
+
+# Few-shot examples are retrieved per request from examples.py; None includes all of them
+FEW_SHOT_K = int(os.getenv("TEXT2MANIM_FEW_SHOT_K", str(DEFAULT_TOP_K))) or None
+
+# Shorter prompt for structure-only parsing: the model names entities, their given
+# measurements and relationships, and solver.py computes every coordinate locally
+STRUCTURE_PROMPT_TEMPLATE = """You are a geometric parser. Convert the following natural language description into a JSON schema with 'entities' and 'relationships' only. Do NOT compute coordinates.
+
+Entity types and the measurements they may carry (only include values stated in the description):
+- circle: id, radius, center [x, y]
+- point: id, point [x, y]
+- line: id, length, start [x, y], end [x, y]
+- polygon: id, sides, side_length, vertices [[x, y], ...]
+
+Relationship types:
+- {{"type": "tangent", "from": LINE, "to": CIRCLE, "from_point": POINT}} (omit from_point for a common tangent; add "kind": "internal" for internal common tangents)
+- {{"type": "inscribed", "shape": SHAPE, "in": CONTAINER}}
+- {{"type": "circumscribed", "shape": SHAPE, "around": INNER}}
+- {{"type": "chord", "line": LINE, "in": CIRCLE}}
+- {{"type": "intersection", "between": [A, B], "at": POINT or [POINT, POINT]}}
+
+EXAMPLES:
+
+1. "Draw a circle with radius 2 and two tangent lines of length 3 from point P."
+Output: {{"entities": [{{"type": "circle", "id": "C1", "radius": 2}}, {{"type": "point", "id": "P"}}, {{"type": "line", "id": "L1", "length": 3}}, {{"type": "line", "id": "L2", "length": 3}}], "relationships": [{{"type": "tangent", "from": "L1", "to": "C1", "from_point": "P"}}, {{"type": "tangent", "from": "L2", "to": "C1", "from_point": "P"}}]}}
+
+2. "Draw a circle with radius 3 and inscribe a regular pentagon."
+Output: {{"entities": [{{"type": "circle", "id": "C1", "radius": 3}}, {{"type": "polygon", "id": "P1", "sides": 5}}], "relationships": [{{"type": "inscribed", "shape": "P1", "in": "C1"}}]}}
+
+3. "Draw a circle radius 5 with a chord of length 8."
+Output: {{"entities": [{{"type": "circle", "id": "C1", "radius": 5}}, {{"type": "line", "id": "L1", "length": 8}}], "relationships": [{{"type": "chord", "line": "L1", "in": "C1"}}]}}
+
+4. "Draw a square with side length 4 and circumscribe a circle."
+Output: {{"entities": [{{"type": "polygon", "id": "S1", "sides": 4, "side_length": 4}}, {{"type": "circle", "id": "C1"}}], "relationships": [{{"type": "circumscribed", "shape": "C1", "around": "S1"}}]}}
+
+5. "Draw a circle radius 2 at (0,0) and a line from (-3,3) to (3,-3). Find intersection points."
+Output: {{"entities": [{{"type": "circle", "id": "C1", "radius": 2, "center": [0, 0]}}, {{"type": "line", "id": "L1", "start": [-3, 3], "end": [3, -3]}}, {{"type": "point", "id": "P1"}}, {{"type": "point", "id": "P2"}}], "relationships": [{{"type": "intersection", "between": ["C1", "L1"], "at": ["P1", "P2"]}}]}}
+
+Now, parse this input: "{description}"
+Output only the resulting JSON schema:
+"""
+
+def _stream_json_schema(backend, prompt, on_entity=None):
+    """Stream the completion and parse it incrementally, closing the stream once the JSON object ends."""
+    parser = IncrementalJSONParser()
+    pieces = backend.stream(prompt, MODEL)
+    try:
+        for piece in pieces:
+            for entity in parser.feed(piece):
+                if on_entity is not None:
+                    on_entity(entity)
+            if parser.done:
+                break
+    finally:
+        # Stop reading so trailing chatter after the object is never generated or paid for
+        pieces.close()
+    return parser.result()
+
+
+def parse_geometric_description(description, structure_only=False, use_fast_path=True, stream=False, on_entity=None):
+    with span("parse", structure_only=structure_only, stream=stream) as parse_span:
+        json_schema, source = _parse(description, structure_only, use_fast_path, stream, on_entity)
+        parse_span.set(source=source)
+        count("parses_total", source=source)
+        return json_schema
+
+
+def _parse(description, structure_only, use_fast_path, stream, on_entity):
+    """Return (schema, source), where source says which layer answered."""
     # Sanitize input
     sanitized_description = re.sub(r'[{}]', '', description).replace('\n', ' ').strip()
+
+    # Common phrasings are parsed locally without a network round-trip
+    if use_fast_path:
+        with span("fast_parse"):
+            json_schema = fast_parse(sanitized_description)
+        if json_schema is not None:
+            return json_schema, "fast_path"
     
     # Check cache
-    cache_key = sanitized_description
-    if cache_key in API_CACHE:
-        # logging.debug(f"Using cached JSON schema for: {cache_key}")
-        return API_CACHE[cache_key]
+    with span("cache_lookup"):
+        template = STRUCTURE_PROMPT_TEMPLATE if structure_only else f"{PROMPT_FINGERPRINT}:k={FEW_SHOT_K}"
+        cache_key = make_cache_key(sanitized_description, MODEL, template, current_backend_identity())
+        if cache_key in API_CACHE:
+            logging.debug(f"Using cached JSON schema for: {cache_key}")
+            return API_CACHE[cache_key], "memory_cache"
+        json_schema = get_persistent_cache().get(cache_key)
+        if json_schema is not None:
+            API_CACHE[cache_key] = json_schema
+            return json_schema, "disk_cache"
     
-    # Enhanced prompt with more examples
-    prompt = f"""You are a geometric parser with expert knowledge of geometric principles. Convert the following natural language description into a JSON schema with 'entities', 'relationships', and mathematically precise 'positions'. Provide coordinates rounded to four decimal places.
-
-CRITICAL GEOMETRIC PRINCIPLES AND CALCULATIONS:
-
-1. TANGENT FROM EXTERNAL POINT:
-   - For circle C(cx,cy) radius r, point P(px,py):
-     - Distance d = sqrt((px - cx)^2 + (py - cy)^2)
-     - Tangent length L = sqrt(d^2 - r^2)
-     - For specified L, d = sqrt(r^2 + L^2)
-     - If C at (0,0), P at (d,0): T1 = (r^2/d, r*L/d), T2 = (r^2/d, -r*L/d)
-
-2. INSCRIBED REGULAR POLYGON:
-   - n sides, radius r: vertices at [r*cos(2πk/n), r*sin(2πk/n)], k=0 to n-1
-
-3. COMMON TANGENT TO TWO CIRCLES:
-   - Centers C1(x1,y1,r1), C2(x2,y2,r2), distance d = sqrt((x2-x1)^2 + (y2-y1)^2)
-   - External tangent slope m = ±(r1 - r2)/d if y1 = y2
-
-4. LINE INTERSECTION:
-   - Lines y = m1x + b1 and y = m2x + b2: x = (b2 - b1)/(m1 - m2), y = m1x + b1
-
-ZERO-SHOT EXAMPLES:
-
-1. "Draw a circle with radius 2 centered at origin and two tangent lines of length 3 from point P."
-Output: {{
-  "entities": [
-    {{"type": "circle", "id": "C1", "radius": 2}},
-    {{"type": "point", "id": "P"}},
-    {{"type": "line", "id": "L1"}},
-    {{"type": "line", "id": "L2"}}
-  ],
-  "relationships": [
-    {{"type": "tangent", "from": "L1", "to": "C1", "from_point": "P"}},
-    {{"type": "tangent", "from": "L2", "to": "C1", "from_point": "P"}}
-  ],
-  "positions": {{
-    "C1": {{"center": [0.0000, 0.0000], "radius": 2}},
-    "P": {{"point": [3.6056, 0.0000]}},
-    "L1": {{"start": [3.6056, 0.0000], "end": [1.1094, 1.6641]}},
-    "L2": {{"start": [3.6056, 0.0000], "end": [1.1094, -1.6641]}}
-  }}
-}}
-
-2. "Draw a circle with radius 3 and inscribe a regular pentagon."
-Output: {{
-  "entities": [
-    {{"type": "circle", "id": "C1", "radius": 3}},
-    {{"type": "polygon", "id": "P1", "sides": 5}}
-  ],
-  "relationships": [
-    {{"type": "inscribed", "shape": "P1", "in": "C1"}}
-  ],
-  "positions": {{
-    "C1": {{"center": [0.0000, 0.0000], "radius": 3}},
-    "P1": {{"vertices": [
-      [3.0000, 0.0000],
-      [0.9271, 2.8532],
-      [-2.4271, 1.7634],
-      [-2.4271, -1.7634],
-      [0.9271, -2.8532]
-    ]}}
-  }}
-}}
-
-3. "Draw two circles C1 radius 4 at (0,0) and C2 radius 2 at (10,0). Draw their common external tangents."
-Output: {{
-  "entities": [
-    {{"type": "circle", "id": "C1", "radius": 4}},
-    {{"type": "circle", "id": "C2", "radius": 2}},
-    {{"type": "line", "id": "L1"}},
-    {{"type": "line", "id": "L2"}}
-  ],
-  "relationships": [
-    {{"type": "tangent", "from": "L1", "to": "C1"}},
-    {{"type": "tangent", "from": "L1", "to": "C2"}},
-    {{"type": "tangent", "from": "L2", "to": "C1"}},
-    {{"type": "tangent", "from": "L2", "to": "C2"}}
-  ],
-  "positions": {{
-    "C1": {{"center": [0.0000, 0.0000], "radius": 4}},
-    "C2": {{"center": [10.0000, 0.0000], "radius": 2}},
-    "L1": {{"start": [-1.0000, 4.0000], "end": [11.0000, 2.0000]}},
-    "L2": {{"start": [-1.0000, -4.0000], "end": [11.0000, -2.0000]}}
-  }}
-}}
-
-4. "Draw a line from (0,0) to (4,4) and another from (0,4) to (4,0). Find their intersection."
-Output: {{
-  "entities": [
-    {{"type": "line", "id": "L1"}},
-    {{"type": "line", "id": "L2"}},
-    {{"type": "point", "id": "P1"}}
-  ],
-  "relationships": [
-    {{"type": "intersection", "between": ["L1", "L2"], "at": "P1"}}
-  ],
-  "positions": {{
-    "L1": {{"start": [0.0000, 0.0000], "end": [4.0000, 4.0000]}},
-    "L2": {{"start": [0.0000, 4.0000], "end": [4.0000, 0.0000]}},
-    "P1": {{"point": [2.0000, 2.0000]}}
-  }}
-}}
-
-5. "Draw a circle radius 5 with a chord of length 8."
-Output: {{
-  "entities": [
-    {{"type": "circle", "id": "C1", "radius": 5}},
-    {{"type": "line", "id": "L1"}}
-  ],
-  "relationships": [
-    {{"type": "chord", "line": "L1", "in": "C1"}}
-  ],
-  "positions": {{
-    "C1": {{"center": [0.0000, 0.0000], "radius": 5}},
-    "L1": {{"start": [-4.0000, 3.0000], "end": [4.0000, 3.0000]}}
-  }}
-}}
-
-6. "Draw a triangle with vertices at (0,0), (4,0), and (2,3). Inscribe a circle."
-Output: {{
-  "entities": [
-    {{"type": "polygon", "id": "T1", "sides": 3}},
-    {{"type": "circle", "id": "C1"}}
-  ],
-  "relationships": [
-    {{"type": "inscribed", "shape": "C1", "in": "T1"}}
-  ],
-  "positions": {{
-    "T1": {{"vertices": [[0.0000, 0.0000], [4.0000, 0.0000], [2.0000, 3.0000]]}},
-    "C1": {{"center": [2.0000, 1.0000], "radius": 1.0000}}
-  }}
-}}
-
-7. "Draw two circles radius 3 at (0,0) and (5,0). Draw their common internal tangents."
-Output: {{
-  "entities": [
-    {{"type": "circle", "id": "C1", "radius": 3}},
-    {{"type": "circle", "id": "C2", "radius": 3}},
-    {{"type": "line", "id": "L1"}},
-    {{"type": "line", "id": "L2"}}
-  ],
-  "relationships": [
-    {{"type": "tangent", "from": "L1", "to": "C1"}},
-    {{"type": "tangent", "from": "L1", "to": "C2"}},
-    {{"type": "tangent", "from": "L2", "to": "C1"}},
-    {{"type": "tangent", "from": "L2", "to": "C2"}}
-  ],
-  "positions": {{
-    "C1": {{"center": [0.0000, 0.0000], "radius": 3}},
-    "C2": {{"center": [5.0000, 0.0000], "radius": 3}},
-    "L1": {{"start": [0.0000, 3.0000], "end": [5.0000, 3.0000]}},
-    "L2": {{"start": [0.0000, -3.0000], "end": [5.0000, -3.0000]}}
-  }}
-}}
-
-8. "Draw a circle radius 2 at (0,0) and a line from (-3,3) to (3,-3). Find intersection points."
-Output: {{
-  "entities": [
-    {{"type": "circle", "id": "C1", "radius": 2}},
-    {{"type": "line", "id": "L1"}},
-    {{"type": "point", "id": "P1"}},
-    {{"type": "point", "id": "P2"}}
-  ],
-  "relationships": [
-    {{"type": "intersection", "between": ["C1", "L1"], "at": ["P1", "P2"]}}
-  ],
-  "positions": {{
-    "C1": {{"center": [0.0000, 0.0000], "radius": 2}},
-    "L1": {{"start": [-3.0000, 3.0000], "end": [3.0000, -3.0000]}},
-    "P1": {{"point": [-1.4142, 1.4142]}},
-    "P2": {{"point": [1.4142, -1.4142]}}
-  }}
-}}
-
-9. "Draw a square with side length 4 and circumscribe a circle."
-Output: {{
-  "entities": [
-    {{"type": "polygon", "id": "S1", "sides": 4}},
-    {{"type": "circle", "id": "C1"}}
-  ],
-  "relationships": [
-    {{"type": "circumscribed", "shape": "C1", "around": "S1"}}
-  ],
-  "positions": {{
-    "S1": {{"vertices": [[-2.0000, -2.0000], [2.0000, -2.0000], [2.0000, 2.0000], [-2.0000, 2.0000]]}},
-    "C1": {{"center": [0.0000, 0.0000], "radius": 2.8284}}
-  }}
-}}
-
-10. "Draw a circle radius 3 and a point P at (5,5). Draw a line from P tangent to the circle."
-Output: {{
-  "entities": [
-    {{"type": "circle", "id": "C1", "radius": 3}},
-    {{"type": "point", "id": "P"}},
-    {{"type": "line", "id": "L1"}}
-  ],
-  "relationships": [
-    {{"type": "tangent", "from": "L1", "to": "C1", "from_point": "P"}}
-  ],
-  "positions": {{
-    "C1": {{"center": [0.0000, 0.0000], "radius": 3}},
-    "P": {{"point": [5.0000, 5.0000]}},
-    "L1": {{"start": [5.0000, 5.0000], "end": [1.8000, 2.4000]}}
-  }}
-}}
-
-11. "Draw an equilateral triangle with side 6 and inscribe a circle."
-Output: {{
-  "entities": [
-    {{"type": "polygon", "id": "T1", "sides": 3}},
-    {{"type": "circle", "id": "C1"}}
-  ],
-  "relationships": [
-    {{"type": "inscribed", "shape": "C1", "in": "T1"}}
-  ],
-  "positions": {{
-    "T1": {{"vertices": [[0.0000, 0.0000], [6.0000, 0.0000], [3.0000, 5.1962]]}},
-    "C1": {{"center": [3.0000, 1.7321], "radius": 1.7321}}
-  }}
-}}
-
-Now, parse this input: "{sanitized_description}"
-Output only the resulting JSON schema:
-"""
+    with span("prompt_build") as prompt_span:
+        if structure_only:
+            prompt = STRUCTURE_PROMPT_TEMPLATE.format(description=sanitized_description)
+        else:
+            prompt = build_prompt(sanitized_description, FEW_SHOT_K)
+        prompt_span.set(chars=len(prompt))
 
     try:
-        client = Groq(api_key=GROQ_API_KEY)
-        chat_completion = client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            # model="gemma2-9b-it",
-            model="meta-llama/llama-4-scout-17b-16e-instruct",
-            stream=False,
-        )
-        json_output = chat_completion.choices[0].message.content
-        json_start = json_output.find('{')
-        json_end = json_output.rfind('}') + 1
-        if json_start == -1 or json_end == 0:
-            logging.error(f"No valid JSON found: {json_output}")
-            raise ValueError("No valid JSON found")
-        json_output = json_output[json_start:json_end]
-        json_schema = json.loads(json_output)
+        backend = get_backend()
+        if stream:
+            with span("llm", backend=type(backend).__name__, stream=True):
+                json_schema = _stream_json_schema(backend, prompt, on_entity)
+        else:
+            with span("llm", backend=type(backend).__name__, stream=False):
+                json_output = backend.complete(prompt, MODEL)
+            with span("json_extract"):
+                json_start = json_output.find('{')
+                json_end = json_output.rfind('}') + 1
+                if json_start == -1 or json_end == 0:
+                    logging.error(f"No valid JSON found: {json_output}")
+                    raise ValueError("No valid JSON found")
+                json_output = json_output[json_start:json_end]
+                json_schema = json.loads(json_output)
+        if structure_only:
+            with span("solve"):
+                json_schema = solve_positions(json_schema)
+        # Snap near-miss coordinates and re-solve wrong ones locally so bad geometry never reaches a render
+        with span("validate") as validate_span:
+            json_schema, report = repair_schema(json_schema)
+            validate_span.set(snapped=len(report["snapped"]), resolved=len(report.get("resolved", [])))
+        if report["snapped"] or report.get("resolved"):
+            logging.info(f"Repaired schema: snapped {report['snapped']}, re-solved {report.get('resolved', [])}")
     except Exception as e:
-        logging.error(f"Groq API error: {str(e)}")
+        logging.error(f"LLM API error: {str(e)}")
         raise ValueError(f"Failed to parse: {str(e)}")
     
     API_CACHE[cache_key] = json_schema
-    # logging.debug(f"Cached JSON schema for: {cache_key}")
-    return json_schema
+    get_persistent_cache().set(cache_key, json_schema)
+    logging.debug(f"Cached JSON schema for: {cache_key}")
+    return json_schema, "llm"
 
 if __name__ == "__main__":
+    import argparse
+    import time
+
     # description = "draw a circle of radius 2 cm and two tangent of length 3 cm from a single point P."
     # description = "Draw a regular hexagon inscribed in a circle of radius 4 cm."
 
     description = "inscribe a square of in a circle of radius 3 cm. draw two tangents of length 5 cm each from a point P outside the circle"
     # description = "draw a circle of radius 2 cm a tangent of length 3 cm from a single point P."
-    try:
-        print("Processing:")
-        json_schema = parse_geometric_description(description)
-
-        manim_code = generate_manim_code(json_schema)
-        with open("GeometricScene.py", "w") as f:
-                f.write(manim_code)
-
-        os.system("manim -pql GeometricScene.py GeoScene")
-
-
-        print(json.dumps(json_schema, indent=2))
-    except ValueError as e:
-        logging.error(f"Error: {e}")
-        print(f"Error: {e}")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Render a geometric construction from a text description.")
+    # Unquoted words form one description; several scenes are rendered with --batch
+    parser.add_argument("description", nargs="*", default=[description])
+    parser.add_argument("--still", action="store_true", help="render only the final frame as a PNG, no video")
+    parser.add_argument("--grouped", action="store_true", help="batch animations into a few segments")
+    parser.add_argument("--duration", type=float, default=None, help="total animation time for --grouped")
+    parser.add_argument("--stream", action="store_true",
+                        help="stream the LLM response and stop reading once the JSON object is complete")
+    parser.add_argument("--structure-only", action="store_true",
+                        help="ask the LLM for entities and relationships only and compute coordinates locally")
+    parser.add_argument("--batch", metavar="FILE", help="render every description in FILE (one per line)")
+    parser.add_argument("--output-dir", default="media/batch", help="where batch renders are written")
+    parser.add_argument("--parallel", type=int, metavar="N", default=0,
+                        help="split one long construction into N segments rendered by N processes")
+    parser.add_argument("--svg", metavar="FILE",
+                        help="draw the final frame to FILE (.svg, or .png with cairosvg) without manim")
+    args = parser.parse_args()
+
+    parse_options = {"stream": args.stream, "structure_only": args.structure_only}
+    descriptions = [" ".join(args.description)]
+    if args.batch:
+        with open(args.batch) as f:
+            descriptions = [line.strip() for line in f if line.strip()]
+
+    if args.batch:
+        # Batch mode: one process builds every scene in memory under its own class name and
+        # output directory, so manim and fonts load once and concurrent runs never collide
+        from render_workers import render_many
+
+        run_dir = os.path.join(args.output_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+        jobs = []
+        for index, text in enumerate(descriptions, 1):
+            try:
+                jobs.append((f"scene_{index:04d}", parse_geometric_description(text, **parse_options)))
+            except ValueError as e:
+                print(f"scene_{index:04d}: parse failed: {e}")
+        results = render_many(jobs, output_dir=run_dir, still=args.still, grouped=args.grouped, duration=args.duration)
+        for result in results:
+            print(f"{result['job_id']}: {result.get('output') or 'render failed: ' + result['error']}")
+        print(f"Rendered {sum('output' in result for result in results)} of {len(descriptions)} scenes into {run_dir}")
+    elif args.svg:
+        from svg_render import write_png, write_svg
+
+        json_schema = parse_geometric_description(descriptions[0], **parse_options)
+        (write_png if args.svg.lower().endswith(".png") else write_svg)(json_schema, args.svg)
+        print(f"Wrote {args.svg}")
+    elif args.parallel and not args.still:
+        from render_workers import RenderWorkerPool
+
+        json_schema = parse_geometric_description(descriptions[0], **parse_options)
+        with RenderWorkerPool(workers=args.parallel, output_dir=args.output_dir, grouped=args.grouped) as pool:
+            result = pool.render_parallel("scene", json_schema, duration=args.duration)
+        print(f"Rendered {result['segments']} segments into {result['output']} in {result['total_seconds']}s")
+    else:
+        try:
+            print("Processing:")
+            json_schema = parse_geometric_description(descriptions[0], **parse_options)
+
+            manim_code = generate_manim_code(json_schema, still=args.still, grouped=args.grouped, duration=args.duration)
+            with open("GeometricScene.py", "w") as f:
+                    f.write(manim_code)
+
+            with span("render", still=args.still):
+                # The scene imports label_cache and background, so the repository root goes on PYTHONPATH
+                subprocess.run(
+                    ["manim", "-pql", *(["-s"] if args.still else []), "GeometricScene.py", "GeometricScene"],
+                    env=manim_env(),
+                )
+
+
+            print(json.dumps(json_schema, indent=2))
+        except ValueError as e:
+            logging.error(f"Error: {e}")
+            print(f"Error: {e}")
@@ -0,0 +1,191 @@
+import atexit
+import contextvars
+import functools
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+TRACE_ENABLED = os.getenv("TEXT2MANIM_TRACE", "0").lower() not in ("", "0", "false", "no")
+TRACE_FILE = os.getenv("TEXT2MANIM_TRACE_FILE", "text2manim_trace.jsonl")
+METRICS_FILE = os.getenv("TEXT2MANIM_METRICS_FILE", "text2manim_metrics.prom")
+PREFIX = "text2manim_"
+
+# Innermost open span of the current thread or task; asyncio.to_thread carries it along
+_current = contextvars.ContextVar("text2manim_span", default=None)
+
+
+class _NullSpan:
+    """Stand-in returned while tracing is off, so instrumented code costs one attribute lookup."""
+
+    def set(self, **attributes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, metrics, name, attributes):
+        self.metrics = metrics
+        self.name = name
+        self.attributes = attributes
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        parent = _current.get()
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.span_id = uuid.uuid4().hex[:16]
+        self._token = _current.set(self)
+        self.start = time.time()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self._started
+        _current.reset(self._token)
+        record = {
+            "trace": self.trace_id,
+            "span": self.span_id,
+            "parent": self.parent_id,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "seconds": round(duration, 6),
+            "pid": os.getpid(),
+            "attributes": self.attributes,
+        }
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        self.metrics._finish(record, duration)
+        return False
+
+
+class Metrics:
+    """Spans and counters for the text -> schema -> code -> render pipeline.
+
+    Spans are buffered and appended to a JSON lines file; per-stage time summaries
+    and counters are written as a Prometheus text exposition file. When disabled,
+    span() hands back a shared no-op object and count() returns immediately.
+    """
+
+    def __init__(self, enabled=TRACE_ENABLED, trace_file=TRACE_FILE, metrics_file=METRICS_FILE):
+        self.enabled = enabled
+        self.trace_file = trace_file
+        self.metrics_file = metrics_file
+        self.spans = []
+        self.counters = {}
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def span(self, name, **attributes):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, attributes)
+
+    def count(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, stage, seconds):
+        """Add a stage duration measured elsewhere (e.g. reported back by a worker process)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self.stages.setdefault(stage, [0, 0.0])
+            stats[0] += 1
+            stats[1] += seconds
+
+    def reset(self):
+        with self._lock:
+            self.spans = []
+            self.counters = {}
+            self.stages = {}
+
+    def _finish(self, record, duration):
+        with self._lock:
+            self.spans.append(record)
+            stats = self.stages.setdefault(record["name"], [0, 0.0])
+            stats[0] += 1
+            stats[1] += duration
+
+    def export_jsonl(self, path=None):
+        """Append buffered spans to the trace file and clear the buffer."""
+        with self._lock:
+            spans, self.spans = self.spans, []
+        if not spans:
+            return
+        lines = "".join(json.dumps(record, default=str) + "\n" for record in spans)
+        # One append per flush keeps lines from concurrent worker processes intact
+        with open(path or self.trace_file, "a") as f:
+            f.write(lines)
+
+    def prometheus_text(self):
+        with self._lock:
+            stages = sorted(self.stages.items())
+            counters = sorted(self.counters.items())
+        lines = [
+            f"# HELP {PREFIX}stage_seconds Time spent per pipeline stage.",
+            f"# TYPE {PREFIX}stage_seconds summary",
+        ]
+        for stage, (count, total) in stages:
+            lines.append(f'{PREFIX}stage_seconds_count{{stage="{stage}"}} {count}')
+            lines.append(f'{PREFIX}stage_seconds_sum{{stage="{stage}"}} {total:.6f}')
+        declared = set()
+        for (name, labels), value in counters:
+            if name not in declared:
+                lines.append(f"# TYPE {PREFIX}{name} counter")
+                declared.add(name)
+            label_text = ",".join(f'{key}="{label}"' for key, label in labels)
+            lines.append(f"{PREFIX}{name}{{{label_text}}} {value}" if labels else f"{PREFIX}{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def export_prometheus(self, path=None):
+        path = path or self.metrics_file
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+    def flush(self, prometheus=True):
+        if not self.enabled:
+            return
+        self.export_jsonl()
+        if prometheus:
+            self.export_prometheus()
+
+
+METRICS = Metrics()
+span = METRICS.span
+count = METRICS.count
+observe = METRICS.observe
+
+
+def traced(name):
+    """Decorator form of span() for whole functions."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return function(*args, **kwargs)
+            with METRICS.span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+atexit.register(METRICS.flush)
@@ -0,0 +1,96 @@
+import argparse
+import asyncio
+import json
+import re
+import time
+import uuid
+
+from aiohttp import web
+
+from examples import approx_tokens
+from fast_parser import fast_parse
+
+# Returned for descriptions the fast path does not cover, so every request gets a valid schema
+FALLBACK_SCHEMA = {
+    "entities": [{"type": "circle", "id": "C1", "radius": 2}],
+    "relationships": [],
+    "positions": {"C1": {"center": [0.0, 0.0], "radius": 2}},
+}
+
+PROMPT_DESCRIPTION = re.compile(r'Now, parse this input: "(.*)"', re.DOTALL)
+
+
+def mock_completion_text(prompt):
+    """Deterministic completion for a parse prompt: the fast-path schema or a fixed fallback."""
+    match = PROMPT_DESCRIPTION.search(prompt)
+    schema = fast_parse(match.group(1)) if match else None
+    return json.dumps(schema or FALLBACK_SCHEMA, indent=2)
+
+
+async def chat_completions(request):
+    """Stand-in for the OpenAI-compatible chat completions endpoint that Groq serves."""
+    options = request.app["options"]
+    body = await request.json()
+    prompt = "".join(message.get("content", "") for message in body.get("messages", []))
+    content = mock_completion_text(prompt)
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+    model = body.get("model", "mock")
+    await asyncio.sleep(options.latency)
+
+    if not body.get("stream"):
+        await asyncio.sleep(len(content) / options.chars_per_second)
+        prompt_tokens, completion_tokens = approx_tokens(prompt), approx_tokens(content)
+        return web.json_response({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+    await response.prepare(request)
+    try:
+        for start in range(0, len(content), options.chunk_size):
+            piece = content[start:start + options.chunk_size]
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            await asyncio.sleep(len(piece) / options.chars_per_second)
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+    except ConnectionResetError:
+        # Streaming clients hang up as soon as the JSON object is complete; that is not an error
+        pass
+    return response
+
+
+def create_app(latency=0.2, chars_per_second=2000.0, chunk_size=16):
+    app = web.Application()
+    app["options"] = argparse.Namespace(latency=latency, chars_per_second=chars_per_second, chunk_size=chunk_size)
+    # Groq serves the OpenAI API under /openai/v1; plain OpenAI-compatible servers use /v1
+    app.router.add_post("/openai/v1/chat/completions", chat_completions)
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    return app
+
+
+if __name__ == "__main__":
+    # Use with GROQ_BASE_URL=http://127.0.0.1:8081 so the Groq client talks to this server
+    parser = argparse.ArgumentParser(description="Local mock of the Groq chat completions endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds before the first token")
+    parser.add_argument("--chars-per-second", type=float, default=2000.0, help="simulated generation speed")
+    args = parser.parse_args()
+    web.run_app(create_app(args.latency, args.chars_per_second), host=args.host, port=args.port)
@@ -0,0 +1,19 @@
+import os
+import re
+
+SCENE_NAME = "GeometricScene"
+# Generated scenes import label_cache and background from here, whatever directory manim runs in
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+QUALITIES = ("l", "m", "h", "p", "k")
+
+
+def safe_job_id(job_id):
+    """Job id reduced to word characters, so it is safe as a single path component."""
+    return re.sub(r"\W", "_", str(job_id)) or "_"
+
+
+def manim_env():
+    """Environment for a manim CLI subprocess, with the repository root on PYTHONPATH."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_ROOT, env.get("PYTHONPATH")]))
+    return env
@@ -0,0 +1,149 @@
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from code_gen import canonical_schema
+
+DEFAULT_RENDER_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "text2manim", "renders")
+
+# Bump when the look of rendered scenes changes so old outputs are not served
+# 2: coordinates rounded to 4 decimals, one tangent dot per line, labels added after the plays
+# 3: optional batched drawing of dense scenes
+STYLE_VERSION = 3
+
+
+def render_key(json_schema=None, code=None, **settings):
+    """Canonical hash of what is rendered (schema or scene code) plus render settings.
+
+    Schemas are hashed in canonical form, so equal scenes listed in a different order share a key.
+    """
+    payload = {
+        "schema": canonical_schema(json_schema) if json_schema is not None else None,
+        "code": code,
+        "settings": settings,
+        "style_version": STYLE_VERSION,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """Content-addressed store of rendered PNG/MP4 files with a total size cap.
+
+    Writes go through a temporary file and an atomic rename, and get_or_render
+    holds a per-key file lock so concurrent workers render each key only once.
+    Eviction removes the least recently used files (by mtime) once the cap is hit.
+    The total size is tracked as files are added and only rescanned when it passes
+    the cap; other processes' writes are picked up by that rescan.
+    """
+
+    def __init__(self, directory=DEFAULT_RENDER_CACHE_DIR, max_bytes=2 * 1024 ** 3):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key, extension):
+        return os.path.join(self.directory, key[:2], key + extension)
+
+    def get(self, key, extension):
+        path = self.path(key, extension)
+        try:
+            # Touch on read so eviction sees it as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key, extension, source_path):
+        path = self.path(key, extension)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copyfile(source_path, tmp_path)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp_path)
+            raise
+        if self._size is None:
+            self._size = self._scan()[1]
+        else:
+            self._size += size
+        if self._size > self.max_bytes:
+            self._evict()
+        return path
+
+    @contextlib.contextmanager
+    def lock(self, key):
+        lock_dir = os.path.join(self.directory, "locks")
+        os.makedirs(lock_dir, exist_ok=True)
+        path = os.path.join(lock_dir, key + ".lock")
+        while True:
+            f = open(path, "a")
+            fcntl.flock(f, fcntl.LOCK_EX)
+            # The previous holder deletes the file on release; if it did, lock the file at the path now
+            try:
+                if os.fstat(f.fileno()).st_ino == os.stat(path).st_ino:
+                    break
+            except FileNotFoundError:
+                pass
+            f.close()
+        try:
+            yield
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+            fcntl.flock(f, fcntl.LOCK_UN)
+            f.close()
+
+    def get_or_render(self, key, extension, render):
+        """Return (path, hit). `render()` must return the path of a freshly rendered file."""
+        path = self.get(key, extension)
+        if path is None:
+            with self.lock(key):
+                # Another worker may have finished this key while we waited for the lock
+                path = self.get(key, extension)
+                if path is None:
+                    self.misses += 1
+                    return self.put(key, extension, render()), False
+        self.hits += 1
+        return path, True
+
+    def _scan(self):
+        """(mtime, size, path) of every cached file, and their total size."""
+        files = []
+        total = 0
+        for root, _, names in os.walk(self.directory):
+            if os.path.basename(root) == "locks":
+                continue
+            for name in names:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        return files, total
+
+    def _evict(self):
+        files, total = self._scan()
+        if total > self.max_bytes:
+            for _, size, path in sorted(files):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)
+                total -= size
+                if total <= self.max_bytes:
+                    break
+        self._size = total
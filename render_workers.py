@@ -0,0 +1,470 @@
+import contextlib
+import logging
+import multiprocessing
+import os
+import shutil
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from code_gen import canonical_schema
+from metrics import METRICS, observe, span
+from render import QUALITIES, SCENE_NAME, safe_job_id
+from render_cache import DEFAULT_RENDER_CACHE_DIR, RenderCache, render_key
+from scene_arrays import is_dense
+from scene_plan import plan_segments, step_durations
+
+QUALITY_NAMES = {
+    "l": "low_quality",
+    "m": "medium_quality",
+    "h": "high_quality",
+    "p": "production_quality",
+    "k": "fourk_quality",
+}
+
+RENDER_CACHE_DIR = os.getenv("TEXT2MANIM_RENDER_CACHE_DIR", DEFAULT_RENDER_CACHE_DIR)
+RENDER_CACHE_MAX_BYTES = int(os.getenv("TEXT2MANIM_RENDER_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+# manim's per-play partial movies, shared by every worker and run so unchanged plays are reused;
+# a sibling of the render cache, which would otherwise count and evict them
+PARTIAL_MOVIE_DIR = os.getenv(
+    "TEXT2MANIM_PARTIAL_MOVIE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(RENDER_CACHE_DIR)), "partial_movies"),
+)
+# Each process writes new partial movies under <partial movie dir>/.staging/<pid> first
+PARTIAL_MOVIE_STAGING = ".staging"
+PARTIAL_MOVIES_CACHED = int(os.getenv("TEXT2MANIM_PARTIAL_MOVIES_CACHED", "1000"))
+WORKER_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+_render_cache = None
+_in_worker = False
+
+
+def _load_manim():
+    """Pay the manim/Cairo/Pango import and font setup once per process."""
+    started = time.perf_counter()
+    import manim
+    import scene_builder  # noqa: F401
+
+    manim.Text("warm up", font_size=24)
+    logging.info(f"Render process {os.getpid()} ready in {time.perf_counter() - started:.2f}s")
+
+
+def _warm_up():
+    global _in_worker
+    _in_worker = True
+    _load_manim()
+
+
+def scene_class_name(job_id):
+    """Unique, valid class name for a job's scene, e.g. Scene_batch_0003."""
+    return "Scene_" + safe_job_id(job_id)
+
+
+def _render(job_id, json_schema, code, output_dir, quality, still, grouped, timings, duration=None):
+    from manim import config, tempconfig
+
+    started = time.perf_counter()
+    with span("scene_build", job_id=job_id):
+        if code is None:
+            from scene_builder import make_scene_class
+
+            scene_class = make_scene_class(
+                json_schema, still=still, grouped=grouped, duration=duration, name=scene_class_name(job_id)
+            )
+        else:
+            namespace = {"__name__": f"scene_{job_id}"}
+            exec(compile(code, f"<scene {job_id}>", "exec"), namespace)
+            scene_class = namespace[SCENE_NAME]
+    built = time.perf_counter()
+
+    # Ids come from input files and the HTTP API, so they must never reach a path unsanitized
+    job_id = safe_job_id(job_id)
+    media_dir = os.path.abspath(os.path.join(output_dir, job_id))
+    partial_movie_dir = _partial_movie_dir(quality)
+    with tempconfig({
+        "media_dir": media_dir,
+        "partial_movie_dir": _staging_dir(partial_movie_dir),
+        "max_files_cached": PARTIAL_MOVIES_CACHED,
+        "quality": QUALITY_NAMES[quality],
+        "output_file": job_id,
+        "preview": False,
+        "write_to_movie": not still,
+        "save_last_frame": still,
+    }):
+        scene = scene_class()
+        file_writer = scene.renderer.file_writer
+        with _shared_partial_movies(file_writer, partial_movie_dir):
+            concat = _time_concat(file_writer, job_id)
+            plays = _count_cached_plays(file_writer)
+            with span("frame_render", job_id=job_id, still=still) as render_span:
+                scene.render()
+                render_span.set(**plays)
+        output_path = str(file_writer.movie_file_path if config.write_to_movie else file_writer.image_file_path)
+    METRICS.count("partial_movies_total", plays["partial_movie_hits"], cached=True)
+    METRICS.count("partial_movies_total", plays["partial_movies"] - plays["partial_movie_hits"], cached=False)
+    timings.update(plays)
+    timings["build_seconds"] = round(built - started, 4)
+    timings["concat_seconds"] = round(concat["seconds"], 4)
+    timings["render_seconds"] = round(time.perf_counter() - built - concat["seconds"], 4)
+    return output_path
+
+
+def _partial_movie_dir(quality):
+    # Files are named by play hash, so scenes with different class names can share it; movies of
+    # another resolution or frame rate cannot be joined, so each quality has its own directory
+    return os.path.abspath(os.path.join(PARTIAL_MOVIE_DIR, QUALITY_NAMES[quality]))
+
+
+def _staging_dir(partial_movie_dir):
+    return os.path.join(partial_movie_dir, PARTIAL_MOVIE_STAGING, str(os.getpid()))
+
+
+@contextlib.contextmanager
+def _shared_partial_movies(file_writer, partial_movie_dir):
+    """Reuse partial movies from the shared directory and publish new ones to it.
+
+    manim reads and writes partial movies in this process's staging directory.
+    A play already in the shared directory is hard-linked into staging before
+    manim looks for it. After a successful render, the new movies are renamed
+    into the shared directory, so other workers never see a half-written file.
+    The staging directory is removed afterwards, whether the render succeeded or not.
+    """
+    from manim import config
+
+    staging_dir = getattr(file_writer, "partial_movie_directory", None)
+    if staging_dir is None:
+        # Stills write no partial movies
+        yield
+        return
+    staging_dir = str(staging_dir)
+    extension = config["movie_file_extension"]
+    is_already_cached = file_writer.is_already_cached
+
+    def shared(hash_invocation):
+        name = hash_invocation + extension
+        shared_path = os.path.join(partial_movie_dir, name)
+        staged_path = os.path.join(staging_dir, name)
+        if not os.path.exists(staged_path):
+            try:
+                os.link(shared_path, staged_path)
+                # Marks the movie as recently used for pruning
+                os.utime(shared_path)
+            except OSError:
+                # Not published yet, pruned meanwhile, or no hard links here: manim renders the play
+                pass
+        return is_already_cached(hash_invocation)
+
+    file_writer.is_already_cached = shared
+    try:
+        yield
+        for entry in os.scandir(staging_dir):
+            if entry.name.endswith(extension):
+                os.replace(entry.path, os.path.join(partial_movie_dir, entry.name))
+        _prune_partial_movies(partial_movie_dir, extension)
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+def _prune_partial_movies(partial_movie_dir, extension):
+    """Remove the least recently used shared partial movies beyond PARTIAL_MOVIES_CACHED."""
+    movies = []
+    for entry in os.scandir(partial_movie_dir):
+        if entry.name.endswith(extension):
+            with contextlib.suppress(FileNotFoundError):
+                movies.append((entry.stat().st_mtime, entry.path))
+    for _, path in sorted(movies)[:max(len(movies) - PARTIAL_MOVIES_CACHED, 0)]:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+
+
+def _count_cached_plays(file_writer):
+    """Count plays and how many of them manim served from an existing partial movie file."""
+    plays = {"partial_movies": 0, "partial_movie_hits": 0}
+    is_already_cached = file_writer.is_already_cached
+
+    def counted(hash_invocation):
+        cached = is_already_cached(hash_invocation)
+        plays["partial_movies"] += 1
+        plays["partial_movie_hits"] += bool(cached)
+        return cached
+
+    file_writer.is_already_cached = counted
+    return plays
+
+
+def _time_concat(file_writer, job_id):
+    """Time the ffmpeg pass that joins partial movie files, which scene.render() runs at the end."""
+    timing = {"seconds": 0.0}
+    combine_to_movie = file_writer.combine_to_movie
+
+    def timed_combine():
+        started = time.perf_counter()
+        with span("ffmpeg_concat", job_id=job_id):
+            combine_to_movie()
+        timing["seconds"] = time.perf_counter() - started
+
+    file_writer.combine_to_movie = timed_combine
+    return timing
+
+
+def get_render_cache():
+    global _render_cache
+    if _render_cache is None:
+        _render_cache = RenderCache(RENDER_CACHE_DIR, max_bytes=RENDER_CACHE_MAX_BYTES)
+    return _render_cache
+
+
+def render_in_process(job_id, json_schema=None, code=None, output_dir="media/workers", quality="l", still=False,
+                      grouped=False, use_cache=True, duration=None):
+    """Build and render a scene inside the current (already warm) process.
+
+    Takes either a schema, which is turned into mobjects directly by SceneBuilder, or
+    generated code, which is compiled; returns the output path and timings.
+    With still=True only the last frame is saved as a PNG and no video is encoded;
+    grouped=True batches schema animations into a few segments sharing `duration`
+    seconds. With use_cache, a previous render of the same schema and settings is
+    returned without rendering.
+    """
+    if quality not in QUALITIES:
+        raise ValueError(f"Unknown quality: {quality}")
+    if (json_schema is None) == (code is None):
+        raise ValueError("Pass exactly one of json_schema or code")
+
+    started = time.perf_counter()
+    timings = {
+        "build_seconds": 0.0, "render_seconds": 0.0, "concat_seconds": 0.0, "partial_movies": 0, "partial_movie_hits": 0,
+    }
+
+    def render():
+        return _render(job_id, json_schema, code, output_dir, quality, still, grouped, timings, duration)
+
+    with span("render", job_id=job_id, still=still, grouped=grouped) as render_span:
+        if use_cache:
+            if json_schema is not None:
+                # Canonicalize once: render_key and the scene build both reuse this copy
+                json_schema = canonical_schema(json_schema)
+            key = render_key(
+                json_schema, code, quality=quality, still=still, grouped=grouped, duration=duration,
+                dense=json_schema is not None and is_dense(json_schema),
+            )
+            output_path, cached = get_render_cache().get_or_render(key, ".png" if still else ".mp4", render)
+            if not cached:
+                # The cache holds its own copy, so manim's media tree for the job is not kept twice
+                _remove_job_dir(output_dir, job_id)
+        else:
+            output_path, cached = render(), False
+        render_span.set(cached=cached)
+    METRICS.count("renders_total", cached=cached)
+    if _in_worker:
+        # Pool processes exit without running atexit hooks, so their spans are appended now;
+        # the parent aggregates their stage times from the returned timings
+        METRICS.flush(prometheus=False)
+
+    return {
+        "job_id": job_id,
+        "output": output_path,
+        "cached": cached,
+        "worker_pid": os.getpid(),
+        **timings,
+        "total_seconds": round(time.perf_counter() - started, 4),
+    }
+
+
+def _remove_job_dir(output_dir, job_id):
+    shutil.rmtree(os.path.join(output_dir, safe_job_id(job_id)), ignore_errors=True)
+
+
+def _place_in_job_dir(path, output_dir, job_id):
+    """Hard-link (or copy) a render cache file into the job's own output directory and return the new path."""
+    name = safe_job_id(job_id)
+    target = os.path.abspath(os.path.join(output_dir, name, name + os.path.splitext(path)[1]))
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    if os.path.exists(target):
+        os.remove(target)
+    try:
+        os.link(path, target)
+    except OSError:
+        shutil.copyfile(path, target)
+    return target
+
+
+def render_many(jobs, output_dir="media/batch", quality="l", still=False, grouped=False, use_cache=True,
+                duration=None):
+    """Render many schemas one after another in this process, importing manim and loading fonts once.
+
+    `jobs` yields (job_id, json_schema) pairs; each scene gets its own class name and
+    output directory under output_dir, and its render is linked there from the cache. A
+    failing scene is reported in its result dict under "error" and does not stop the batch.
+    """
+    _load_manim()
+    results = []
+    for job_id, json_schema in jobs:
+        try:
+            result = render_in_process(job_id, json_schema=json_schema, output_dir=output_dir, quality=quality,
+                                       still=still, grouped=grouped, use_cache=use_cache, duration=duration)
+            if use_cache:
+                # Cache files can be evicted later, so every result gets its own link in the run directory
+                result["output"] = _place_in_job_dir(result["output"], output_dir, job_id)
+        except Exception as e:
+            logging.error(f"Render failed for {job_id}: {e}")
+            result = {"job_id": job_id, "error": str(e)}
+        results.append(result)
+    return results
+
+
+def render_segment(job_id, json_schema, index, segment, output_dir="media/workers", quality="l", grouped=False,
+                   duration=None):
+    """Render steps[start:stop] of a schema's scene to its own movie file and return the path."""
+    from manim import tempconfig
+    from scene_builder import make_scene_class
+
+    job_id = safe_job_id(job_id)
+    partial_movie_dir = _partial_movie_dir(quality)
+    with tempconfig({
+        "media_dir": os.path.abspath(os.path.join(output_dir, job_id, "segments")),
+        "partial_movie_dir": _staging_dir(partial_movie_dir),
+        "max_files_cached": PARTIAL_MOVIES_CACHED,
+        "quality": QUALITY_NAMES[quality],
+        "output_file": f"segment_{index:03d}",
+        "preview": False,
+        "write_to_movie": True,
+        "save_last_frame": False,
+    }):
+        scene_class = make_scene_class(
+            json_schema, grouped=grouped, duration=duration, name=f"{scene_class_name(job_id)}_{index:03d}",
+            segment=segment,
+        )
+        with span("segment_render", job_id=job_id, segment=index, steps=segment[1] - segment[0]):
+            scene = scene_class()
+            with _shared_partial_movies(scene.renderer.file_writer, partial_movie_dir):
+                scene.render()
+        output_path = str(scene.renderer.file_writer.movie_file_path)
+    if _in_worker:
+        METRICS.flush(prometheus=False)
+    return output_path
+
+
+def concat_movies(paths, output_path):
+    """Stitch movies with identical encoding settings using ffmpeg's concat demuxer, without re-encoding."""
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise RuntimeError("ffmpeg is required to stitch rendered segments")
+    list_path = output_path + ".txt"
+    with open(list_path, "w") as f:
+        for path in paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    with span("ffmpeg_concat", segments=len(paths)):
+        result = subprocess.run(
+            [ffmpeg, "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", list_path, "-c", "copy",
+             output_path],
+            capture_output=True, text=True,
+        )
+    os.remove(list_path)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg concat failed: {result.stderr.strip()[-500:]}")
+    return output_path
+
+
+def _observe_worker_timings(future):
+    if future.cancelled() or future.exception() is not None:
+        return
+    result = future.result()
+    METRICS.count("renders_total", cached=result["cached"])
+    if not result["cached"]:
+        METRICS.count("partial_movies_total", result["partial_movie_hits"], cached=True)
+        METRICS.count("partial_movies_total", result["partial_movies"] - result["partial_movie_hits"], cached=False)
+        observe("scene_build", result["build_seconds"])
+        observe("frame_render", result["render_seconds"])
+        observe("ffmpeg_concat", result["concat_seconds"])
+    observe("render", result["total_seconds"])
+
+
+class RenderWorkerPool:
+    """Long-lived render processes that import manim once and take jobs over the pool's queue."""
+
+    def __init__(self, workers=None, output_dir="media/workers", quality="l", still=False, grouped=False,
+                 use_cache=True):
+        self.output_dir = output_dir
+        self.quality = quality
+        self.still = still
+        self.grouped = grouped
+        self.use_cache = use_cache
+        self.workers = workers or os.cpu_count() or 1
+        # Workers start lazily, when parse threads may hold httpx, sqlite or METRICS locks; a forked
+        # child would inherit them held, so workers start from a clean forkserver (or spawned) process
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context(WORKER_START_METHOD), initializer=_warm_up
+        )
+
+    def submit(self, job_id, json_schema=None, code=None, still=None, grouped=None, duration=None):
+        """Queue a render and return a concurrent.futures.Future of the result dict.
+
+        still and grouped default to the pool's settings when not given; duration
+        is the total animation time of a grouped scene.
+        """
+        future = self._executor.submit(
+            render_in_process, job_id, json_schema, code, self.output_dir, self.quality,
+            self.still if still is None else still, self.grouped if grouped is None else grouped, self.use_cache,
+            duration,
+        )
+        if METRICS.enabled:
+            future.add_done_callback(_observe_worker_timings)
+        return future
+
+    def render(self, job_id, json_schema=None, code=None, duration=None):
+        return self.submit(job_id, json_schema, code, duration=duration).result()
+
+    def render_parallel(self, job_id, json_schema, segments=None, duration=None):
+        """Render one long construction as `segments` (default: one per worker) pieces in parallel.
+
+        The scene's steps are split into runs of about equal animation time; each
+        worker starts its piece from the state left by the steps before it, and the
+        pieces are joined with ffmpeg concat into <output_dir>/<job_id>/<job_id>.mp4.
+        """
+        started = time.perf_counter()
+        if self.use_cache:
+            # Canonicalize once for the cache key, the step plan and every segment
+            json_schema = canonical_schema(json_schema)
+        plan = plan_segments(step_durations(json_schema, grouped=self.grouped, duration=duration),
+                             segments or self.workers)
+
+        def render():
+            futures = [
+                self._executor.submit(
+                    render_segment, job_id, json_schema, index, segment, self.output_dir, self.quality,
+                    self.grouped, duration,
+                )
+                for index, segment in enumerate(plan)
+            ]
+            paths = [future.result() for future in futures]
+            name = safe_job_id(job_id)
+            output_path = os.path.abspath(os.path.join(self.output_dir, name, f"{name}.mp4"))
+            return concat_movies(paths, output_path)
+
+        if self.use_cache:
+            key = render_key(
+                json_schema, quality=self.quality, still=False, grouped=self.grouped, duration=duration,
+                dense=is_dense(json_schema),
+            )
+            output_path, cached = get_render_cache().get_or_render(key, ".mp4", render)
+            if not cached:
+                # Segments and the joined movie are in the cache now
+                _remove_job_dir(self.output_dir, job_id)
+        else:
+            output_path, cached = render(), False
+        return {
+            "job_id": job_id,
+            "output": output_path,
+            "cached": cached,
+            "segments": len(plan),
+            "total_seconds": round(time.perf_counter() - started, 4),
+        }
+
+    def close(self):
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
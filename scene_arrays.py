@@ -0,0 +1,174 @@
+import math
+import os
+
+import numpy as np
+
+from code_gen import COORDINATE_DECIMALS, index_relationships, natural_key
+
+# manim's Circle is 8 cubic arcs starting at angle 0; Dot is a filled Circle of this radius
+CIRCLE_ARCS = 8
+DOT_RADIUS = 0.08
+# DashedVMobject(circle, num_dashes=15) keeps the first half of each of 15 equal pieces
+INSCRIBED_DASHES = 15
+# Opt-in: schemas with at least this many entities are drawn as batched mobjects; 0 turns it off
+DENSE_THRESHOLD = int(os.getenv("TEXT2MANIM_DENSE_THRESHOLD", "0"))
+
+
+def _arc_template(start_angles, angle):
+    """Unit-circle cubic Bezier arcs of `angle` radians starting at each angle, shape (arcs, 4, 3)."""
+    handle = 4 / 3 * math.tan(angle / 4)
+    start_angles = np.asarray(start_angles, dtype=float)[:, None]
+    end_angles = start_angles + angle
+    start = np.hstack([np.cos(start_angles), np.sin(start_angles)])
+    end = np.hstack([np.cos(end_angles), np.sin(end_angles)])
+    # Tangent handles are the radius vectors turned a quarter turn, scaled by the handle length
+    start_handle = start + handle * np.hstack([-start[:, 1:], start[:, :1]])
+    end_handle = end - handle * np.hstack([-end[:, 1:], end[:, :1]])
+    curves = np.stack([start, start_handle, end_handle, end], axis=1)
+    return np.concatenate([curves, np.zeros(curves.shape[:2] + (1,))], axis=2)
+
+
+CIRCLE_TEMPLATE = _arc_template(np.arange(CIRCLE_ARCS) * 2 * math.pi / CIRCLE_ARCS, 2 * math.pi / CIRCLE_ARCS)
+DASH_TEMPLATE = _arc_template(
+    np.arange(INSCRIBED_DASHES) * 2 * math.pi / INSCRIBED_DASHES, math.pi / INSCRIBED_DASHES
+)
+
+
+def is_dense(json_schema, threshold=DENSE_THRESHOLD):
+    """Whether SceneBuilder draws this schema as batched mobjects."""
+    return bool(threshold) and len(json_schema["positions"]) >= threshold
+
+
+def _xyz(points):
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    return np.hstack([points, np.zeros((len(points), 1))])
+
+
+def segment_points(starts, ends):
+    """Bezier points of straight segments, one cubic (4 points) per segment, as an (4 * n, 3) array."""
+    starts, ends = _xyz(starts), _xyz(ends)
+    weights = np.array([0.0, 1 / 3, 2 / 3, 1.0])[None, :, None]
+    return (starts[:, None] + weights * (ends - starts)[:, None]).reshape(-1, 3)
+
+
+def circle_points(centers, radii, template=CIRCLE_TEMPLATE):
+    """Bezier points of circles (or of the template's arcs on each circle) as one (4 * arcs * n, 3) array."""
+    centers = _xyz(centers)
+    radii = np.broadcast_to(np.asarray(radii, dtype=float), (len(centers),))
+    return (centers[:, None, None] + radii[:, None, None, None] * template[None]).reshape(-1, 3)
+
+
+class SceneArrays:
+    """Positions of a schema packed into NumPy arrays, one set per entity type, in canonical order.
+
+    Points are an (n, 2) array, lines two (m, 2) arrays of endpoints, circles
+    (k, 2) centers and (k,) radii, and polygons one (V, 2) vertex array with
+    offsets[i]:offsets[i + 1] holding polygon i. Dense scenes are built from
+    these arrays as a few batched mobjects instead of one mobject per entity.
+    """
+
+    def __init__(self, json_schema):
+        positions = json_schema["positions"]
+        entities = {entity["id"]: entity for entity in json_schema["entities"]}
+        by_type, by_source = index_relationships(json_schema.get("relationships", []))
+
+        # Same entity order as canonical_schema; coordinates are rounded below, array-wide
+        ids = {"point": [], "line": [], "circle": [], "polygon": []}
+        for entity_id in sorted(positions, key=natural_key):
+            entity_type = entities[entity_id]["type"]
+            if entity_type in ids:
+                ids[entity_type].append(entity_id)
+        self.point_ids, self.line_ids = ids["point"], ids["line"]
+        self.circle_ids, self.polygon_ids = ids["circle"], ids["polygon"]
+
+        self.points = np.array([positions[i]["point"] for i in self.point_ids], dtype=float).reshape(-1, 2)
+        self.line_starts = np.array([positions[i]["start"] for i in self.line_ids], dtype=float).reshape(-1, 2)
+        self.line_ends = np.array([positions[i]["end"] for i in self.line_ids], dtype=float).reshape(-1, 2)
+        self.tangent = np.array(
+            [any(rel["type"] == "tangent" for rel in by_source[i]) for i in self.line_ids], dtype=bool
+        )
+        self.circle_centers = np.array(
+            [positions[i]["center"] for i in self.circle_ids], dtype=float
+        ).reshape(-1, 2)
+        self.circle_radii = np.array([positions[i]["radius"] for i in self.circle_ids], dtype=float)
+
+        vertices = [positions[i]["vertices"] for i in self.polygon_ids]
+        self.polygon_sides = np.array([entities[i]["sides"] for i in self.polygon_ids], dtype=int)
+        self.polygon_offsets = np.concatenate([[0], np.cumsum([len(v) for v in vertices], dtype=int)])
+        self.polygon_vertices = np.array([xy for v in vertices for xy in v], dtype=float).reshape(-1, 2)
+
+        for name in ("points", "line_starts", "line_ends", "circle_centers", "circle_radii", "polygon_vertices"):
+            # + 0.0 turns -0.0 into 0.0, as in canonical_schema
+            setattr(self, name, np.round(getattr(self, name), COORDINATE_DECIMALS) + 0.0)
+
+        circle_index = {entity_id: index for index, entity_id in enumerate(self.circle_ids)}
+        # Circles inscribed in polygons, which the scene highlights with red dashes
+        self.inscribed = np.array([
+            circle_index[rel["shape"]] for rel in by_type["inscribed"]
+            if entities[rel["shape"]]["type"] == "circle" and entities[rel["in"]]["type"] == "polygon"
+        ], dtype=int)
+
+    def __len__(self):
+        return len(self.point_ids) + len(self.line_ids) + len(self.circle_ids) + len(self.polygon_ids)
+
+    @property
+    def nbytes(self):
+        return sum(
+            array.nbytes for array in (
+                self.points, self.line_starts, self.line_ends, self.tangent, self.circle_centers,
+                self.circle_radii, self.polygon_sides, self.polygon_offsets, self.polygon_vertices, self.inscribed,
+            )
+        )
+
+    def polygon_edges(self, mask=None):
+        """(starts, ends) of every polygon side, for the polygons selected by the boolean `mask`."""
+        offsets = self.polygon_offsets
+        counts = np.diff(offsets)
+        if mask is None:
+            mask = np.ones(len(counts), dtype=bool)
+        # Each vertex joins the next one, and the last vertex of a polygon joins its first
+        following = np.arange(1, len(self.polygon_vertices) + 1)
+        following[offsets[1:] - 1] = offsets[:-1]
+        selected = np.repeat(mask, counts)
+        return self.polygon_vertices[selected], self.polygon_vertices[following[selected]]
+
+    def label_anchors(self):
+        """Entity ids and the point each label is placed against, grouped by entity type."""
+        counts = np.diff(self.polygon_offsets)
+        centroids = (
+            np.add.reduceat(self.polygon_vertices, self.polygon_offsets[:-1], axis=0) / counts[:, None]
+            if len(counts) else np.zeros((0, 2))
+        )
+        return {
+            # Circles are labelled above their top, points to the right of the dot
+            "circle": (self.circle_ids, self.circle_centers + np.column_stack([
+                np.zeros(len(self.circle_radii)), self.circle_radii,
+            ])),
+            "point": (self.point_ids, self.points + [DOT_RADIUS, 0.0]),
+            "line": (self.line_ids, (self.line_starts + self.line_ends) / 2 + [0.0, 0.2]),
+            "polygon": (self.polygon_ids, centroids),
+        }
+
+
+if __name__ == "__main__":
+    import time
+
+    from benchmarks.synthetic import synthetic_schema
+
+    for size in (1_000, 10_000, 100_000):
+        schema = synthetic_schema(size)
+        started = time.perf_counter()
+        arrays = SceneArrays(schema)
+        packed = time.perf_counter()
+        buffers = [
+            segment_points(arrays.line_starts, arrays.line_ends),
+            segment_points(*arrays.polygon_edges()),
+            circle_points(arrays.circle_centers, arrays.circle_radii),
+            circle_points(arrays.circle_centers[arrays.inscribed], arrays.circle_radii[arrays.inscribed],
+                          DASH_TEMPLATE),
+            circle_points(arrays.points, DOT_RADIUS),
+        ]
+        done = time.perf_counter()
+        print(f"{len(arrays)} entities: {arrays.nbytes / 1e6:.2f} MB of positions, "
+              f"{sum(b.nbytes for b in buffers) / 1e6:.2f} MB of Bezier points, "
+              f"packed in {packed - started:.3f}s, points in {done - packed:.3f}s")
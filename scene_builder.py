@@ -0,0 +1,278 @@
+import numpy as np
+import manim
+from manim import (
+    BLUE, DEFAULT_MOBJECT_TO_MOBJECT_BUFFER, RED, RIGHT, UP, WHITE, YELLOW,
+    Circle, Create, DashedVMobject, Dot, FadeIn, LaggedStart, Line, Polygon, Scene, VMobject,
+)
+
+from background import use_grid_background
+
+from code_gen import (
+    ANIMATION_ORDER, ANIMATION_PHASES, ANIMATIONS_BY_TYPE, GROUP_LAG_RATIO, POLYGON_COLORS,
+    canonical_schema, final_wait, index_relationships, phase_run_time,
+)
+from label_cache import cached_text
+from scene_arrays import DASH_TEMPLATE, DOT_RADIUS, SceneArrays, circle_points, is_dense, segment_points
+
+ANIMATIONS = {"FadeIn": FadeIn, "Create": Create}
+
+
+def _point(xy):
+    return np.array([xy[0], xy[1], 0])
+
+
+def batched_mobject(points, color, fill=False):
+    """One VMobject whose disjoint subpaths draw many same-style primitives in a single path."""
+    # Dots are filled discs here rather than a PMobject: the Cairo renderer draws point
+    # clouds as unblended square pixels, which FadeIn cannot fade, and DotCloud is OpenGL-only
+    if fill:
+        mobject = VMobject(fill_color=color, fill_opacity=1, stroke_width=0)
+    else:
+        mobject = VMobject(stroke_color=color)
+    mobject.set_points(points)
+    return mobject
+
+
+def batched_labels(arrays):
+    """Every label glyph of a dense scene in one filled VMobject, placed as the per-entity labels are."""
+    glyph_points = []
+    for entity_type, (entity_ids, anchors) in arrays.label_anchors().items():
+        for entity_id, anchor in zip(entity_ids, anchors):
+            label = cached_text(entity_id, font_size=24)
+            if entity_type == "circle":
+                anchor = anchor + [0, DEFAULT_MOBJECT_TO_MOBJECT_BUFFER + label.height / 2]
+            elif entity_type == "point":
+                anchor = anchor + [DEFAULT_MOBJECT_TO_MOBJECT_BUFFER + label.width / 2, 0]
+            offset = np.append(anchor, 0) - label.get_center()
+            glyph_points += [glyph.points + offset for glyph in label.family_members_with_points()]
+    return batched_mobject(np.concatenate(glyph_points), WHITE, fill=True)
+
+
+class SceneBuilder:
+    """Build manim mobjects straight from a schema, mirroring what generate_manim_code emits.
+
+    The same per-type rules apply (blue circles, white points, yellow lines,
+    per-side-count polygon colors, dashed red inscribed circles, red tangent
+    points, labels), but no Python source is generated, written or compiled.
+    """
+
+    def __init__(self, json_schema, still=False, grouped=False, duration=None, dense=None):
+        self.dense = is_dense(json_schema) if dense is None else dense
+        # Same canonical order and rounding as the generated code, so both produce identical plays;
+        # dense scenes get both from SceneArrays, array-wide
+        if not self.dense:
+            json_schema = canonical_schema(json_schema)
+        self.schema = json_schema
+        self.still = still
+        self.grouped = grouped and not still
+        self.duration = duration
+        self.positions = json_schema["positions"]
+        self.entities = {entity["id"]: entity for entity in json_schema["entities"]}
+        self.by_type, self.by_source = index_relationships(json_schema.get("relationships", []))
+        self.mobjects = {}
+
+    def build_entity(self, entity_id):
+        pos = self.positions[entity_id]
+        entity_type = self.entities[entity_id]["type"]
+        if entity_type == "circle":
+            mobject = Circle(radius=pos["radius"]).move_to(_point(pos["center"]))
+            mobject.set_stroke(color=BLUE)
+        elif entity_type == "point":
+            mobject = Dot(_point(pos["point"]), color=WHITE)
+        elif entity_type == "line":
+            mobject = Line(_point(pos["start"]), _point(pos["end"]))
+            mobject.set_stroke(color=YELLOW)
+        elif entity_type == "polygon":
+            color = getattr(manim, POLYGON_COLORS.get(self.entities[entity_id]["sides"], "WHITE"))
+            mobject = Polygon(*(_point(v) for v in pos["vertices"]), color=color)
+        else:
+            return None
+        self.mobjects[entity_id] = mobject
+        return mobject
+
+    def build_label(self, entity_id):
+        pos = self.positions[entity_id]
+        entity_type = self.entities[entity_id]["type"]
+        label = cached_text(entity_id, font_size=24)
+        if entity_type == "circle":
+            return label.next_to(self.mobjects[entity_id], UP)
+        if entity_type == "point":
+            return label.next_to(self.mobjects[entity_id], RIGHT)
+        if entity_type == "line":
+            midpoint = (_point(pos["start"]) + _point(pos["end"])) / 2
+            return label.move_to(midpoint + np.array([0, 0.2, 0]))
+        if entity_type == "polygon":
+            return label.move_to(np.append(np.mean(pos["vertices"], axis=0), 0))
+        return None
+
+    def inscribed_highlights(self):
+        highlights = []
+        for rel in self.by_type["inscribed"]:
+            shape_id, in_shape_id = rel["shape"], rel["in"]
+            if self.entities[shape_id]["type"] == "circle" and self.entities[in_shape_id]["type"] == "polygon":
+                highlight = DashedVMobject(self.mobjects[shape_id], num_dashes=15)
+                highlight.set_stroke(opacity=0.7, color=RED)
+                highlights.append(highlight)
+        return highlights
+
+    def show(self, scene, mobject, animation):
+        if self.still:
+            scene.add(mobject)
+        else:
+            scene.play(ANIMATIONS[animation](mobject))
+
+    def play_group(self, scene, items, run_time):
+        animations = [ANIMATIONS[animation](mobject) for mobject, animation in items]
+        scene.play(LaggedStart(*animations, lag_ratio=GROUP_LAG_RATIO), run_time=run_time)
+
+    def _show_step(self, mobject, animation):
+        return ("add", [mobject]) if self.still else ("play", [(mobject, animation)], None)
+
+    def build_all(self):
+        """One mobject per entity: (mobjects by entity type, highlights, tangent dots, labels)."""
+        by_type = {}
+        for entity_id in self.positions:
+            mobject = self.build_entity(entity_id)
+            if mobject is not None:
+                by_type.setdefault(self.entities[entity_id]["type"], []).append(mobject)
+        highlights = self.inscribed_highlights()
+        tangent_dots = [
+            Dot(_point(self.positions[entity_id]["end"]), color=RED) for entity_id in self.positions
+            if self.entities[entity_id]["type"] == "line"
+            and any(rel["type"] == "tangent" for rel in self.by_source[entity_id])
+        ]
+        labels = [label for label in map(self.build_label, self.positions) if label is not None]
+        return by_type, highlights, tangent_dots, labels
+
+    def build_batched(self):
+        """Same final frame as build_all, but one mobject per entity type and style, built from SceneArrays.
+
+        Memory and per-frame draw calls then grow with the number of styles, not of
+        entities. Animation timing changes too: each batched mobject is one play, so
+        N one-second entity plays become a few, the video no longer matches the
+        generated code, and render_parallel can only cut between those few steps.
+        """
+        arrays = SceneArrays(self.schema)
+        by_type = {}
+        if len(arrays.points):
+            by_type["point"] = [batched_mobject(circle_points(arrays.points, DOT_RADIUS), WHITE, fill=True)]
+        colors = np.array([POLYGON_COLORS.get(sides, "WHITE") for sides in arrays.polygon_sides])
+        for color in sorted(set(colors)):
+            by_type.setdefault("polygon", []).append(
+                batched_mobject(segment_points(*arrays.polygon_edges(colors == color)), getattr(manim, color))
+            )
+        if len(arrays.circle_radii):
+            by_type["circle"] = [batched_mobject(circle_points(arrays.circle_centers, arrays.circle_radii), BLUE)]
+        if len(arrays.line_starts):
+            by_type["line"] = [batched_mobject(segment_points(arrays.line_starts, arrays.line_ends), YELLOW)]
+
+        highlights, tangent_dots, labels = [], [], []
+        if len(arrays.inscribed):
+            centers, radii = arrays.circle_centers[arrays.inscribed], arrays.circle_radii[arrays.inscribed]
+            highlight = batched_mobject(circle_points(centers, radii, DASH_TEMPLATE), RED)
+            highlights.append(highlight.set_stroke(opacity=0.7))
+        if arrays.tangent.any():
+            tangent_points = circle_points(arrays.line_ends[arrays.tangent], DOT_RADIUS)
+            tangent_dots.append(batched_mobject(tangent_points, RED, fill=True))
+        if len(arrays):
+            labels.append(batched_labels(arrays))
+        return by_type, highlights, tangent_dots, labels
+
+    def steps(self):
+        """The scene as a list of steps: ("play", [(mobject, animation)], run_time or None),
+        ("add", [mobjects]) and ("wait", seconds)."""
+        by_type, highlights, tangent_dots, labels = self.build_batched() if self.dense else self.build_all()
+
+        # Animate entities in logical order: points, polygons, circles, lines
+        steps = []
+        if self.grouped:
+            phases = [
+                [
+                    (mobject, ANIMATIONS_BY_TYPE[entity_type])
+                    for entity_type in types for mobject in by_type.get(entity_type, [])
+                ]
+                for _, types in ANIMATION_PHASES
+            ]
+            phases = [phase for phase in phases if phase]
+            annotations = [(highlight, "Create") for highlight in highlights]
+            annotations += [(dot, "FadeIn") for dot in tangent_dots]
+            num_phases = len(phases) + bool(annotations)
+            run_time = phase_run_time(num_phases, self.duration)
+            steps += [("play", phase, run_time) for phase in phases]
+        else:
+            for entity_type, animation in ANIMATION_ORDER:
+                steps += [self._show_step(mobject, animation) for mobject in by_type.get(entity_type, [])]
+            steps += [self._show_step(highlight, "Create") for highlight in highlights]
+
+        if labels:
+            steps.append(("add", labels))
+
+        if self.grouped:
+            if annotations:
+                steps.append(("play", annotations, run_time))
+        else:
+            steps += [self._show_step(dot, "FadeIn") for dot in tangent_dots]
+        if self.grouped:
+            steps.append(("wait", final_wait(num_phases, self.duration)))
+        elif not self.still:
+            steps.append(("wait", 2))
+        return steps
+
+    def run_step(self, scene, step):
+        kind, *args = step
+        if kind == "add":
+            scene.add(*args[0])
+        elif kind == "wait":
+            scene.wait(args[0])
+        else:
+            items, run_time = args
+            if run_time is None:
+                (mobject, animation), = items
+                self.show(scene, mobject, animation)
+            else:
+                self.play_group(scene, items, run_time)
+
+    def construct(self, scene, segment=None):
+        """Build and play the scene, or only steps[start:stop] when segment=(start, stop) is given."""
+        use_grid_background(scene)
+        steps = self.steps()
+        start, stop = segment or (0, len(steps))
+        # Every earlier step has finished by the segment's first frame, so its mobjects are simply on screen
+        for kind, *args in steps[:start]:
+            if kind == "add":
+                scene.add(*args[0])
+            elif kind == "play":
+                scene.add(*(mobject for mobject, _ in args[0]))
+        for step in steps[start:stop]:
+            self.run_step(scene, step)
+
+
+def step_seconds(step):
+    """Animation time of one step; plays without an explicit run_time take manim's default second.
+
+    scene_plan.step_durations gives the same numbers for a whole scene without building it.
+    """
+    kind, *args = step
+    if kind == "wait":
+        return args[0]
+    if kind == "play":
+        return 1.0 if args[1] is None else args[1]
+    return 0.0
+
+
+def make_scene_class(json_schema, still=False, grouped=False, duration=None, name="GeometricScene", segment=None,
+                     dense=None):
+    """Scene class whose construct() builds the schema directly via SceneBuilder.
+
+    With segment=(start, stop) the scene starts from the state after step `start`
+    and plays only up to `stop`, for rendering long constructions in parallel.
+    dense=None batches the scene's mobjects once it has TEXT2MANIM_DENSE_THRESHOLD
+    entities (off by default); see SceneBuilder.build_batched for how that changes timing.
+    """
+
+    def construct(self):
+        SceneBuilder(json_schema, still=still, grouped=grouped, duration=duration, dense=dense).construct(
+            self, segment
+        )
+
+    return type(name, (Scene,), {"construct": construct})
@@ -0,0 +1,75 @@
+from collections import Counter
+
+from code_gen import ANIMATION_ORDER, ANIMATION_PHASES, POLYGON_COLORS, final_wait, index_relationships, phase_run_time
+from scene_arrays import is_dense
+
+
+def _mobject_counts(json_schema, dense):
+    """How many mobjects SceneBuilder makes of each kind, counted from the schema alone.
+
+    Returns (mobjects by entity type, inscribed highlights, tangent dots, whether there are labels).
+    """
+    positions = json_schema["positions"]
+    entities = {entity["id"]: entity for entity in json_schema["entities"]}
+    by_type, by_source = index_relationships(json_schema.get("relationships", []))
+    types = {entity_type for entity_type, _ in ANIMATION_ORDER}
+
+    ids = [entity_id for entity_id in positions if entities[entity_id]["type"] in types]
+    counts = Counter(entities[entity_id]["type"] for entity_id in ids)
+    highlights = sum(
+        entities[rel["shape"]]["type"] == "circle" and entities[rel["in"]]["type"] == "polygon"
+        for rel in by_type["inscribed"]
+    )
+    tangent_dots = sum(
+        entities[entity_id]["type"] == "line" and any(rel["type"] == "tangent" for rel in by_source[entity_id])
+        for entity_id in positions
+    )
+    if dense:
+        # build_batched makes one mobject per entity type, except polygons, which get one per color
+        colors = {POLYGON_COLORS.get(entities[entity_id]["sides"], "WHITE")
+                  for entity_id in ids if entities[entity_id]["type"] == "polygon"}
+        counts = Counter({entity_type: 1 for entity_type in counts})
+        counts["polygon"] = len(colors)
+        highlights, tangent_dots = min(highlights, 1), min(tangent_dots, 1)
+    return counts, highlights, tangent_dots, bool(ids)
+
+
+def step_durations(json_schema, still=False, grouped=False, duration=None, dense=None):
+    """Animation seconds of each step SceneBuilder(...).steps() returns for this schema.
+
+    Only the schema is read, so planning a parallel render does not build any
+    mobject or label text in the parent process.
+    """
+    dense = is_dense(json_schema) if dense is None else dense
+    counts, highlights, tangent_dots, labels = _mobject_counts(json_schema, dense)
+    label_steps = [0.0] if labels else []
+
+    if grouped and not still:
+        phases = sum(any(counts[entity_type] for entity_type in types) for _, types in ANIMATION_PHASES)
+        annotations = bool(highlights or tangent_dots)
+        num_phases = phases + annotations
+        run_time = phase_run_time(num_phases, duration)
+        return [run_time] * phases + label_steps + [run_time] * annotations + [final_wait(num_phases, duration)]
+
+    # Plays without an explicit run_time take manim's default second; still scenes only add
+    show = 0.0 if still else 1.0
+    steps = [show] * (sum(counts.values()) + highlights) + label_steps + [show] * tangent_dots
+    return steps if still else steps + [2]
+
+
+def plan_segments(durations, count):
+    """Split steps into at most `count` contiguous (start, stop) ranges of about equal animation time.
+
+    Cuts only fall before steps that take time, so every segment renders at least one frame.
+    """
+    if not durations:
+        return []
+    total = sum(durations)
+    bounds = [0]
+    elapsed = 0.0
+    for index, seconds in enumerate(durations):
+        if seconds and index > bounds[-1] and len(bounds) < count and elapsed >= total * len(bounds) / count:
+            bounds.append(index)
+        elapsed += seconds
+    bounds.append(len(durations))
+    return list(zip(bounds, bounds[1:]))
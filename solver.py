@@ -0,0 +1,409 @@
+import math
+
+import numpy as np
+
+# Geometry keys an entity (or a partial "positions" entry) may carry directly
+POSITION_KEYS = {
+    "circle": ("center", "radius"),
+    "point": ("point",),
+    "line": ("start", "end"),
+    "polygon": ("vertices",),
+}
+
+DEFAULT_RADIUS = 2.0
+DEFAULT_LINE_LENGTH = 4.0
+
+
+def tangent_points(center, radius, point):
+    """Points of contact of the two tangents from an external point to a circle."""
+    offset = point - center
+    d = math.hypot(offset[0], offset[1])
+    if d <= radius:
+        raise ValueError("Point lies inside the circle; no tangent exists")
+    u = offset / d
+    u_perp = np.array([-u[1], u[0]])
+    along = radius * radius / d
+    across = radius * math.sqrt(d * d - radius * radius) / d
+    return center + along * u + across * u_perp, center + along * u - across * u_perp
+
+
+def regular_polygon(sides, center, circumradius, start_angle=0.0):
+    angles = start_angle + 2 * np.pi * np.arange(sides) / sides
+    return center + circumradius * np.column_stack((np.cos(angles), np.sin(angles)))
+
+
+def flat_regular_polygon(sides, side_length, center=(0.0, 0.0)):
+    """Regular polygon with a horizontal bottom edge, e.g. a square as (+-s/2, +-s/2)."""
+    circumradius = side_length / (2 * math.sin(math.pi / sides))
+    return regular_polygon(sides, np.asarray(center, dtype=float), circumradius, -np.pi / 2 - np.pi / sides)
+
+
+def incircle(vertices):
+    if len(vertices) == 3:
+        a = np.linalg.norm(vertices[1] - vertices[2])
+        b = np.linalg.norm(vertices[2] - vertices[0])
+        c = np.linalg.norm(vertices[0] - vertices[1])
+        perimeter = a + b + c
+        center = (a * vertices[0] + b * vertices[1] + c * vertices[2]) / perimeter
+        s = perimeter / 2
+        area = math.sqrt(max(s * (s - a) * (s - b) * (s - c), 0.0))
+        return center, area / s
+    # Tangential (e.g. regular) polygons: centroid and distance to the nearest edge
+    center = vertices.mean(axis=0)
+    edges = np.roll(vertices, -1, axis=0) - vertices
+    rel = center - vertices
+    distances = np.abs(edges[:, 0] * rel[:, 1] - edges[:, 1] * rel[:, 0]) / np.linalg.norm(edges, axis=1)
+    return center, float(distances.min())
+
+
+def circumcircle(vertices):
+    if len(vertices) == 3:
+        (ax, ay), (bx, by), (cx, cy) = vertices
+        d = 2 * (ax * (by - cy) + bx * (cy - ay) + cx * (ay - by))
+        if abs(d) < 1e-12:
+            raise ValueError("Degenerate triangle has no circumcircle")
+        ux = ((ax * ax + ay * ay) * (by - cy) + (bx * bx + by * by) * (cy - ay) + (cx * cx + cy * cy) * (ay - by)) / d
+        uy = ((ax * ax + ay * ay) * (cx - bx) + (bx * bx + by * by) * (ax - cx) + (cx * cx + cy * cy) * (bx - ax)) / d
+        center = np.array([ux, uy])
+        return center, float(np.linalg.norm(vertices[0] - center))
+    # Cyclic (e.g. regular, rectangular) polygons: centroid and farthest vertex
+    center = vertices.mean(axis=0)
+    return center, float(np.linalg.norm(vertices - center, axis=1).max())
+
+
+def common_tangent(c1, r1, c2, r2, internal=False, sign=1):
+    """Endpoints (points of contact) of one common tangent of two circles."""
+    offset = c2 - c1
+    d = math.hypot(offset[0], offset[1])
+    r2_signed = -r2 if internal else r2
+    cos_theta = (r1 - r2_signed) / d if d else 2.0
+    if abs(cos_theta) > 1:
+        kind = "internal" if internal else "external"
+        raise ValueError(f"Circles have no common {kind} tangent")
+    w = offset / d
+    w_perp = np.array([-w[1], w[0]])
+    normal = cos_theta * w + sign * math.sqrt(1 - cos_theta * cos_theta) * w_perp
+    return c1 + r1 * normal, c2 + r2_signed * normal
+
+
+def horizontal_chord(center, radius, length):
+    if length > 2 * radius:
+        raise ValueError("Chord is longer than the diameter")
+    half = length / 2
+    height = math.sqrt(radius * radius - half * half)
+    return center + np.array([-half, height]), center + np.array([half, height])
+
+
+def line_line_intersection(p1, p2, q1, q2):
+    r = p2 - p1
+    s = q2 - q1
+    denom = r[0] * s[1] - r[1] * s[0]
+    if abs(denom) < 1e-12:
+        raise ValueError("Lines are parallel")
+    t = ((q1[0] - p1[0]) * s[1] - (q1[1] - p1[1]) * s[0]) / denom
+    return [p1 + t * r]
+
+
+def line_circle_intersection(p1, p2, center, radius):
+    direction = p2 - p1
+    f = p1 - center
+    a = direction @ direction
+    b = 2 * (f @ direction)
+    c = f @ f - radius * radius
+    disc = b * b - 4 * a * c
+    if disc < 0:
+        return []
+    root = math.sqrt(disc)
+    return [p1 + t * direction for t in sorted({(-b - root) / (2 * a), (-b + root) / (2 * a)})]
+
+
+def circle_circle_intersection(c1, r1, c2, r2):
+    offset = c2 - c1
+    d = math.hypot(offset[0], offset[1])
+    if d == 0 or d > r1 + r2 or d < abs(r1 - r2):
+        return []
+    a = (r1 * r1 - r2 * r2 + d * d) / (2 * d)
+    h = math.sqrt(max(r1 * r1 - a * a, 0.0))
+    base = c1 + a * offset / d
+    perp = np.array([-offset[1], offset[0]]) / d
+    return [base + h * perp, base - h * perp] if h else [base]
+
+
+class _Solver:
+    def __init__(self, schema):
+        self.entities = {entity["id"]: entity for entity in schema["entities"]}
+        self.relationships = list(schema.get("relationships", []))
+        self.known = {}
+        # How many tangents have already been drawn from a point / between two circles
+        self.tangent_counts = {}
+        # External points each circle's tangents are drawn from, so each new point gets its own direction
+        self.external_points = {}
+        for rel in self.relationships:
+            if rel.get("type") == "tangent" and rel.get("from_point") is not None:
+                points = self.external_points.setdefault(rel["to"], [])
+                if rel["from_point"] not in points:
+                    points.append(rel["from_point"])
+
+        # Entities some relationship refers to; the rest are free and only get default placements
+        self.constrained = {
+            value for rel in self.relationships for key, value in rel.items() if key != "type" and isinstance(value, str)
+        }
+
+        given = schema.get("positions", {})
+        for entity_id, entity in self.entities.items():
+            keys = POSITION_KEYS.get(entity["type"])
+            if keys is None:
+                continue
+            source = dict(entity)
+            source.update(given.get(entity_id, {}))
+            if all(key in source for key in keys):
+                self.known[entity_id] = {key: self._array(source[key]) for key in keys}
+
+    @staticmethod
+    def _array(value):
+        return np.asarray(value, dtype=float) if isinstance(value, (list, tuple)) else float(value)
+
+    def _next_sign(self, key):
+        count = self.tangent_counts.get(key, 0)
+        self.tangent_counts[key] = count + 1
+        return 1 if count % 2 == 0 else -1
+
+    def _polygon_size(self, entity_id):
+        """Side length of a polygon if the description fixed its size."""
+        entity = self.entities[entity_id]
+        return entity.get("side_length", entity.get("length"))
+
+    # Relationship handlers return True once they have placed everything they determine
+
+    def _tangent(self, rel):
+        line_id, circle_id = rel["from"], rel["to"]
+        if line_id in self.known:
+            return True
+        if circle_id not in self.known:
+            return False
+        circle = self.known[circle_id]
+        point_id = rel.get("from_point")
+        if point_id is not None:
+            length = self.entities[line_id].get("length")
+            if point_id not in self.known:
+                if length is None:
+                    return False
+                # The k-th of n external points sits at angle 2 * pi * k / n around the circle
+                points = self.external_points[circle_id]
+                angle = 2 * math.pi * points.index(point_id) / len(points)
+                d = math.hypot(circle["radius"], float(length))
+                self.known[point_id] = {"point": circle["center"] + d * np.array([math.cos(angle), math.sin(angle)])}
+            point = self.known[point_id]["point"]
+            if length is not None:
+                distance = float(np.linalg.norm(point - circle["center"]))
+                actual = math.sqrt(max(distance * distance - circle["radius"] ** 2, 0.0))
+                if abs(actual - float(length)) > 1e-3 * max(1.0, float(length)):
+                    raise ValueError(
+                        f"Tangent {line_id} from {point_id} has length {length}, but {point_id} is placed "
+                        f"{actual:.4g} along the tangent from {circle_id}"
+                    )
+            contacts = tangent_points(circle["center"], circle["radius"], point)
+            sign = self._next_sign((point_id, circle_id))
+            self.known[line_id] = {"start": point, "end": contacts[0] if sign > 0 else contacts[1]}
+            return True
+
+        # A line tangent to two circles is a common tangent
+        others = [
+            r["to"] for r in self.relationships
+            if r.get("type") == "tangent" and r.get("from") == line_id and r.get("to") != circle_id
+        ]
+        if others:
+            other_id = others[0]
+            if other_id not in self.known:
+                return False
+            first, second = sorted([circle_id, other_id])
+            internal = rel.get("kind") == "internal"
+            sign = self._next_sign((first, second, internal))
+            a, b = self.known[first], self.known[second]
+            start, end = common_tangent(a["center"], a["radius"], b["center"], b["radius"], internal, sign)
+            self.known[line_id] = {"start": start, "end": end}
+            return True
+
+        # A lone tangent: touch the top of the circle, drawn horizontally
+        length = float(self.entities[line_id].get("length", 2 * circle["radius"]))
+        contact = circle["center"] + np.array([0.0, circle["radius"]])
+        self.known[line_id] = {
+            "start": contact - np.array([length / 2, 0.0]),
+            "end": contact + np.array([length / 2, 0.0]),
+        }
+        return True
+
+    def _inscribed(self, rel):
+        shape_id, container_id = rel["shape"], rel["in"]
+        shape_type = self.entities[shape_id]["type"]
+        container_type = self.entities[container_id]["type"]
+        if shape_id in self.known and container_id in self.known:
+            return True
+
+        if shape_type == "polygon" and container_type == "circle":
+            if container_id in self.known:
+                circle = self.known[container_id]
+                sides = int(self.entities[shape_id]["sides"])
+                start_angle = math.radians(float(self.entities[shape_id].get("rotation", 0.0)))
+                vertices = regular_polygon(sides, circle["center"], circle["radius"], start_angle)
+                self.known[shape_id] = {"vertices": vertices}
+                return True
+            if shape_id in self.known:
+                center, radius = circumcircle(self.known[shape_id]["vertices"])
+                self.known[container_id] = {"center": center, "radius": radius}
+                return True
+            return False
+
+        if shape_type == "circle" and container_type == "polygon":
+            if container_id in self.known:
+                center, radius = incircle(self.known[container_id]["vertices"])
+                self.known[shape_id] = {"center": center, "radius": radius}
+                return True
+            if shape_id in self.known:
+                # Regular polygon whose apothem is the circle's radius
+                circle = self.known[shape_id]
+                sides = int(self.entities[container_id]["sides"])
+                circumradius = circle["radius"] / math.cos(math.pi / sides)
+                vertices = regular_polygon(sides, circle["center"], circumradius, -np.pi / 2 - np.pi / sides)
+                self.known[container_id] = {"vertices": vertices}
+                return True
+            return False
+
+        raise ValueError(f"Unsupported inscribed relationship: {shape_type} in {container_type}")
+
+    def _circumscribed(self, rel):
+        # "shape" is drawn around "around", i.e. "around" is inscribed in "shape"
+        return self._inscribed({"shape": rel["around"], "in": rel["shape"]})
+
+    def _chord(self, rel):
+        line_id, circle_id = rel["line"], rel["in"]
+        if line_id in self.known:
+            return True
+        if circle_id not in self.known:
+            return False
+        circle = self.known[circle_id]
+        length = float(self.entities[line_id].get("length", rel.get("length", circle["radius"] * math.sqrt(3))))
+        start, end = horizontal_chord(circle["center"], circle["radius"], length)
+        self.known[line_id] = {"start": start, "end": end}
+        return True
+
+    def _intersection(self, rel):
+        first_id, second_id = rel["between"]
+        at = rel["at"] if isinstance(rel["at"], list) else [rel["at"]]
+        if all(point_id in self.known for point_id in at):
+            return True
+        if first_id not in self.known or second_id not in self.known:
+            return False
+        first, second = self.known[first_id], self.known[second_id]
+        if "center" in first and "start" in second:
+            first, second = second, first
+        if "start" in first and "start" in second:
+            points = line_line_intersection(first["start"], first["end"], second["start"], second["end"])
+        elif "start" in first and "center" in second:
+            points = line_circle_intersection(first["start"], first["end"], second["center"], second["radius"])
+        elif "center" in first and "center" in second:
+            points = circle_circle_intersection(first["center"], first["radius"], second["center"], second["radius"])
+        else:
+            raise ValueError(f"Unsupported intersection between {first_id} and {second_id}")
+        if len(points) < len(at):
+            raise ValueError(f"{first_id} and {second_id} meet in {len(points)} point(s), expected {len(at)}")
+        for point_id, point in zip(at, points):
+            self.known[point_id] = {"point": point}
+        return True
+
+    HANDLERS = {
+        "tangent": _tangent,
+        "inscribed": _inscribed,
+        "circumscribed": _circumscribed,
+        "chord": _chord,
+        "intersection": _intersection,
+    }
+
+    def _place_default(self):
+        """Anchor one free entity so the remaining relationships can make progress."""
+        unknown = [entity_id for entity_id in self.entities if entity_id not in self.known]
+        # Circles with a radius go first: they anchor most constructions at the origin
+        for entity_id in unknown:
+            entity = self.entities[entity_id]
+            if entity["type"] == "circle" and "radius" in entity:
+                center = self._array(entity.get("center", [0.0, 0.0]))
+                self.known[entity_id] = {"center": center, "radius": float(entity["radius"])}
+                return True
+        for entity_id in unknown:
+            entity = self.entities[entity_id]
+            if entity["type"] == "polygon" and self._polygon_size(entity_id) is not None:
+                vertices = flat_regular_polygon(int(entity["sides"]), float(self._polygon_size(entity_id)))
+                self.known[entity_id] = {"vertices": vertices}
+                return True
+        for entity_id in unknown:
+            entity = self.entities[entity_id]
+            if entity["type"] == "circle":
+                center = self._array(entity.get("center", [0.0, 0.0]))
+                self.known[entity_id] = {"center": center, "radius": DEFAULT_RADIUS}
+                return True
+        for entity_id in unknown:
+            entity = self.entities[entity_id]
+            if entity["type"] == "polygon":
+                vertices = regular_polygon(int(entity["sides"]), np.zeros(2), DEFAULT_RADIUS)
+                self.known[entity_id] = {"vertices": vertices}
+                return True
+        # Free points sit at the origin and free lines run along the x axis
+        for entity_id in unknown:
+            entity = self.entities[entity_id]
+            if entity_id in self.constrained:
+                continue
+            if entity["type"] == "point":
+                self.known[entity_id] = {"point": self._array(entity.get("point", [0.0, 0.0]))}
+                return True
+            if entity["type"] == "line":
+                start = self._array(entity.get("start", [0.0, 0.0]))
+                length = float(entity.get("length", DEFAULT_LINE_LENGTH))
+                self.known[entity_id] = {"start": start, "end": start + np.array([length, 0.0])}
+                return True
+        return False
+
+    def solve(self):
+        pending = [rel for rel in self.relationships if rel.get("type") in self.HANDLERS]
+        while True:
+            progress = True
+            while progress and pending:
+                progress = False
+                remaining = []
+                for rel in pending:
+                    if self.HANDLERS[rel["type"]](self, rel):
+                        progress = True
+                    else:
+                        remaining.append(rel)
+                pending = remaining
+            if not pending or not self._place_default():
+                break
+        while self._place_default():
+            pass
+
+        if pending:
+            raise ValueError(f"Could not resolve relationships: {pending}")
+        missing = [entity_id for entity_id in self.entities if entity_id not in self.known]
+        if missing:
+            raise ValueError(f"Could not place entities: {missing}")
+        return {entity_id: self._export(self.known[entity_id]) for entity_id in self.entities}
+
+    @staticmethod
+    def _export(geometry):
+        exported = {}
+        for key, value in geometry.items():
+            if isinstance(value, np.ndarray):
+                exported[key] = (np.round(value, 4) + 0.0).tolist()
+            else:
+                exported[key] = round(float(value), 4) + 0.0
+        return exported
+
+
+def solve_positions(json_schema):
+    """Compute 'positions' for a schema that only describes entities and relationships.
+
+    Coordinates already present on entities or in a partial 'positions' block are
+    kept; everything else is derived from the relationship graph.
+    """
+    solved = dict(json_schema)
+    solved["positions"] = _Solver(json_schema).solve()
+    return solved
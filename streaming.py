@@ -0,0 +1,90 @@
+import json
+
+ENTITY_TYPES = {"circle", "point", "line", "polygon"}
+
+
+def validate_entity(entity):
+    """Reject malformed entities as soon as they arrive instead of after the full response."""
+    if not isinstance(entity, dict) or not isinstance(entity.get("id"), str):
+        raise ValueError(f"Entity without an id: {entity}")
+    if entity.get("type") not in ENTITY_TYPES:
+        raise ValueError(f"Unsupported entity type in {entity}")
+    if entity["type"] == "polygon" and not isinstance(entity.get("sides"), int):
+        raise ValueError(f"Polygon without an integer side count: {entity}")
+    return entity
+
+
+class IncrementalJSONParser:
+    """Scan streamed text for the first top-level JSON object, one chunk at a time.
+
+    Each completed element of the top-level "entities" array is validated and
+    returned from feed() as soon as its closing brace arrives. `done` becomes True
+    once the top-level object closes, so the caller can stop reading the stream.
+    Text before the opening brace (and anything after the close) is ignored.
+    """
+
+    def __init__(self, validate=validate_entity):
+        self.validate = validate
+        self.buffer = []
+        self.length = 0
+        self.stack = []
+        self.in_string = False
+        self.escaped = False
+        self.string_start = None
+        self.last_key = None
+        self.array_key = None
+        self.element_start = None
+        self.done = False
+
+    def feed(self, chunk):
+        completed = []
+        for char in chunk:
+            if self.done:
+                break
+            if not self.stack:
+                if char != "{":
+                    continue
+            self.buffer.append(char)
+            self.length += 1
+            position = self.length - 1
+
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                    if len(self.stack) == 1:
+                        self.last_key = "".join(self.buffer[self.string_start + 1:position])
+                continue
+
+            if char == '"':
+                self.in_string = True
+                self.string_start = position
+            elif char in "{[":
+                if char == "[" and len(self.stack) == 1:
+                    self.array_key = self.last_key
+                elif (char == "{" and len(self.stack) == 2 and self.stack[-1] == "["
+                      and self.array_key == "entities"):
+                    self.element_start = position
+                self.stack.append(char)
+            elif char in "}]":
+                if not self.stack or "{[".index(self.stack[-1]) != "}]".index(char):
+                    raise ValueError("Mismatched brackets in streamed JSON")
+                self.stack.pop()
+                if char == "}" and len(self.stack) == 2 and self.element_start is not None:
+                    element = json.loads("".join(self.buffer[self.element_start:position + 1]))
+                    completed.append(self.validate(element))
+                    self.element_start = None
+                elif char == "]" and len(self.stack) == 1:
+                    # The top-level array closed; later objects at this depth belong to other keys
+                    self.array_key = None
+                elif not self.stack:
+                    self.done = True
+        return completed
+
+    def result(self):
+        if not self.done:
+            raise ValueError("Stream ended before the JSON object was complete")
+        return json.loads("".join(self.buffer))
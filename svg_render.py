@@ -0,0 +1,179 @@
+import math
+from html import escape
+
+from code_gen import POLYGON_COLORS, canonical_schema, index_relationships
+from metrics import traced
+
+# Hex values of the manim color constants the generated scenes use
+COLORS = {
+    "WHITE": "#FFFFFF",
+    "BLUE": "#58C4DD",
+    "YELLOW": "#FFFF00",
+    "RED": "#FC6255",
+    "GREEN": "#83C167",
+    "PURPLE": "#9A72AC",
+    "TEAL": "#5CD0B3",
+    "GOLD": "#F0AC5F",
+}
+BACKGROUND = "#000000"
+
+# manim's default frame is 8 units tall at 16:9; -ql renders it at 854x480
+FRAME_HEIGHT = 8.0
+FRAME_WIDTH = FRAME_HEIGHT * 16 / 9
+PIXEL_WIDTH = 854
+PIXEL_HEIGHT = 480
+
+# Drawing sizes in scene units, matching manim's defaults (stroke width 4 is 0.04 units under Cairo)
+STROKE_WIDTH = 0.04
+AXIS_STROKE_WIDTH = 0.02
+DOT_RADIUS = 0.08
+LABEL_BUFF = 0.25
+LABEL_FONT_SIZE = 24
+# Font size 48 is about two thirds of a unit per em in manim
+UNITS_PER_FONT_POINT = 1 / 72
+INSCRIBED_DASHES = 15
+
+
+def _f(value):
+    text = f"{value:.4f}".rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+
+def _xy(point):
+    # SVG's y axis points down, manim's points up
+    return f"{_f(point[0])},{_f(-point[1])}"
+
+
+def _center(point):
+    return f'cx="{_f(point[0])}" cy="{_f(-point[1])}"'
+
+
+def _label(text, x, y, anchor="middle", baseline="central"):
+    font_size = _f(LABEL_FONT_SIZE * UNITS_PER_FONT_POINT)
+    return (
+        f'<text x="{_f(x)}" y="{_f(-y)}" font-size="{font_size}" text-anchor="{anchor}" '
+        f'dominant-baseline="{baseline}" fill="{COLORS["WHITE"]}">{escape(str(text))}</text>'
+    )
+
+
+@traced("svg_render")
+def render_svg(json_schema, width=PIXEL_WIDTH, height=PIXEL_HEIGHT, grid=True):
+    """SVG of the final frame of the scene generate_manim_code would render, without manim.
+
+    The same rules apply (blue circles, white points, yellow lines, per-side-count
+    polygon colors, dashed red inscribed circles, red tangent points, labels) and
+    objects are stacked in the same order, but everything is drawn straight from
+    `positions` in scene units inside manim's frame.
+    """
+    json_schema = canonical_schema(json_schema)
+    positions = json_schema["positions"]
+    entities = {entity["id"]: entity for entity in json_schema["entities"]}
+    by_type, by_source = index_relationships(json_schema["relationships"])
+
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="{_f(-FRAME_WIDTH / 2)} {_f(-FRAME_HEIGHT / 2)} {_f(FRAME_WIDTH)} {_f(FRAME_HEIGHT)}" '
+        f'font-family="sans-serif">',
+        f'<rect x="{_f(-FRAME_WIDTH / 2)}" y="{_f(-FRAME_HEIGHT / 2)}" width="{_f(FRAME_WIDTH)}" '
+        f'height="{_f(FRAME_HEIGHT)}" fill="{BACKGROUND}"/>',
+    ]
+    emit = out.append
+    if grid:
+        # The scene's NumberPlane has lines 15 units apart, so only its axes fall inside the frame
+        emit(
+            f'<path d="M{_f(-FRAME_WIDTH / 2)},0H{_f(FRAME_WIDTH / 2)}M0,{_f(-FRAME_HEIGHT / 2)}V{_f(FRAME_HEIGHT / 2)}" '
+            f'stroke="{COLORS["WHITE"]}" stroke-width="{_f(AXIS_STROKE_WIDTH)}"/>'
+        )
+
+    ids_by_type = {}
+    for entity_id in positions:
+        ids_by_type.setdefault(entities[entity_id]["type"], []).append(entity_id)
+    stroke = f'fill="none" stroke-width="{_f(STROKE_WIDTH)}" stroke-linejoin="round" stroke-linecap="round"'
+
+    # Same stacking as the scene: points, polygons, circles, lines, highlights, labels, tangent points
+    for entity_id in ids_by_type.get("point", []):
+        emit(f'<circle {_center(positions[entity_id]["point"])} '
+             f'r="{_f(DOT_RADIUS)}" fill="{COLORS["WHITE"]}"/>')
+    for entity_id in ids_by_type.get("polygon", []):
+        color = COLORS[POLYGON_COLORS.get(entities[entity_id]["sides"], "WHITE")]
+        points = " ".join(_xy(v) for v in positions[entity_id]["vertices"])
+        emit(f'<polygon points="{points}" stroke="{color}" {stroke}/>')
+    for entity_id in ids_by_type.get("circle", []):
+        pos = positions[entity_id]
+        emit(f'<circle {_center(pos["center"])} r="{_f(pos["radius"])}" '
+             f'stroke="{COLORS["BLUE"]}" {stroke}/>')
+    for entity_id in ids_by_type.get("line", []):
+        pos = positions[entity_id]
+        emit(f'<path d="M{_xy(pos["start"])}L{_xy(pos["end"])}" stroke="{COLORS["YELLOW"]}" {stroke}/>')
+
+    for rel in by_type["inscribed"]:
+        if entities[rel["shape"]]["type"] == "circle" and entities[rel["in"]]["type"] == "polygon":
+            pos = positions[rel["shape"]]
+            # DashedVMobject splits the circle into equal dashes and gaps
+            dash = math.pi * pos["radius"] / INSCRIBED_DASHES
+            emit(f'<circle {_center(pos["center"])} r="{_f(pos["radius"])}" '
+                 f'stroke="{COLORS["RED"]}" stroke-opacity="0.7" stroke-dasharray="{_f(dash)}" {stroke}/>')
+
+    for entity_id, pos in positions.items():
+        entity_type = entities[entity_id]["type"]
+        if entity_type == "circle":
+            center = pos["center"]
+            emit(_label(entity_id, center[0], center[1] + pos["radius"] + LABEL_BUFF, baseline="text-after-edge"))
+        elif entity_type == "point":
+            point = pos["point"]
+            emit(_label(entity_id, point[0] + DOT_RADIUS + LABEL_BUFF, point[1], anchor="start"))
+        elif entity_type == "line":
+            start, end = pos["start"], pos["end"]
+            emit(_label(entity_id, (start[0] + end[0]) / 2, (start[1] + end[1]) / 2 + 0.2))
+        elif entity_type == "polygon":
+            vertices = pos["vertices"]
+            emit(_label(entity_id, sum(v[0] for v in vertices) / len(vertices),
+                        sum(v[1] for v in vertices) / len(vertices)))
+
+    for entity_id in ids_by_type.get("line", []):
+        if any(rel["type"] == "tangent" for rel in by_source[entity_id]):
+            emit(f'<circle {_center(positions[entity_id]["end"])} '
+                 f'r="{_f(DOT_RADIUS)}" fill="{COLORS["RED"]}"/>')
+
+    emit("</svg>\n")
+    return "\n".join(out)
+
+
+def write_svg(json_schema, path, **options):
+    with open(path, "w") as f:
+        f.write(render_svg(json_schema, **options))
+    return path
+
+
+def write_png(json_schema, path, **options):
+    """Rasterize the SVG to PNG. Needs the optional cairosvg package."""
+    try:
+        import cairosvg
+    except ImportError:
+        raise RuntimeError("PNG output needs cairosvg (pip install cairosvg); use write_svg instead")
+    cairosvg.svg2png(bytestring=render_svg(json_schema, **options).encode("utf-8"), write_to=path)
+    return path
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+    import time
+
+    schema = {
+        "entities": [
+            {"type": "polygon", "id": "T1", "sides": 3},
+            {"type": "circle", "id": "C1"},
+        ],
+        "relationships": [{"type": "inscribed", "shape": "C1", "in": "T1"}],
+        "positions": {
+            "T1": {"vertices": [[-3.0, -1.7321], [3.0, -1.7321], [0.0, 3.4641]]},
+            "C1": {"center": [0.0, 0.0], "radius": 1.7321},
+        },
+    }
+    if len(sys.argv) > 1:
+        with open(sys.argv[1]) as f:
+            schema = json.load(f)
+    started = time.perf_counter()
+    write_svg(schema, "GeometricScene.svg")
+    print(f"Wrote GeometricScene.svg in {(time.perf_counter() - started) * 1000:.2f} ms")
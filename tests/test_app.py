@@ -0,0 +1,26 @@
+import asyncio
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from app import create_app
+
+
+def post_jobs(bodies, **service_options):
+    """Status codes of POST /jobs for each body, against a service whose queue is never drained."""
+    async def run():
+        app = create_app(parse_workers=0, render=False, **service_options)
+        async with TestClient(TestServer(app)) as client:
+            responses = [await client.post("/jobs", json=body) for body in bodies]
+            return [(response.status, response.headers.get("Retry-After")) for response in responses]
+
+    return asyncio.run(run())
+
+
+def test_full_queue_returns_429():
+    body = {"description": "draw a circle of radius 2"}
+    assert post_jobs([body, body, body], max_queue=2) == [(202, None), (202, None), (429, "1")]
+
+
+def test_bad_requests_are_rejected():
+    bodies = [{}, {"description": " "}, {"description": "draw a circle", "duration": -1}]
+    assert [status for status, _ in post_jobs(bodies)] == [400, 400, 400]
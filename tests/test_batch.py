@@ -0,0 +1,26 @@
+import json
+
+from batch import read_jsonl
+
+
+def test_bad_lines_become_error_records(tmp_path):
+    path = tmp_path / "input.jsonl"
+    path.write_text("\n".join([
+        json.dumps("draw a circle of radius 2"),
+        json.dumps({"id": "x"}),
+        "{not json",
+        json.dumps({"id": "c", "description": "draw a circle of radius 3"}),
+    ]) + "\n")
+    records = list(read_jsonl(path))
+    assert [record["id"] for record in records] == ["1", "x", "3", "c"]
+    assert [record.get("status") for record in records] == [None, "error", "error", None]
+    assert records[3]["description"] == "draw a circle of radius 3"
+
+
+def test_job_ids_are_path_safe_and_unique(tmp_path):
+    path = tmp_path / "input.jsonl"
+    lines = [{"id": "../../x", "description": "a"}, {"id": "a", "description": "b"}, {"id": "a", "description": "c"}]
+    path.write_text("\n".join(json.dumps(line) for line in lines) + "\n")
+    records = list(read_jsonl(path))
+    assert [record["id"] for record in records] == ["../../x", "a", "a"]
+    assert [record["job_id"] for record in records] == ["______x", "a", "a_2"]
@@ -0,0 +1,59 @@
+import cache
+from cache import PersistentCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_cache(monkeypatch, tmp_path, **options):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "time", clock)
+    return PersistentCache(str(tmp_path / "cache.sqlite3"), **options), clock
+
+
+def test_least_recently_used_entry_is_evicted(monkeypatch, tmp_path):
+    store, clock = make_cache(monkeypatch, tmp_path, max_entries=2)
+    store.set("a", {"n": 1})
+    clock.now += 1
+    store.set("b", {"n": 2})
+    clock.now += 1
+    assert store.get("a") == {"n": 1}
+    clock.now += 1
+    store.set("c", {"n": 3})
+    assert store.get("b") is None
+    assert store.get("a") == {"n": 1} and store.get("c") == {"n": 3}
+    assert store.stats()["entries"] == 2
+
+
+def test_expired_entries_are_misses(monkeypatch, tmp_path):
+    store, clock = make_cache(monkeypatch, tmp_path, ttl=60)
+    store.set("a", [1, 2])
+    clock.now += 59
+    assert store.get("a") == [1, 2]
+    clock.now += 2
+    assert store.get("a") is None
+    assert (store.hits, store.misses) == (1, 1)
+    assert store.stats()["entries"] == 0
+
+
+def test_entries_survive_reopening(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    PersistentCache(path).set("a", "value")
+    assert PersistentCache(path).get("a") == "value"
+
+
+def test_backends_do_not_share_keys(monkeypatch):
+    import llm
+
+    monkeypatch.delenv("GROQ_BASE_URL", raising=False)
+    groq = llm.backend_identity("groq")
+    monkeypatch.setenv("GROQ_BASE_URL", "http://127.0.0.1:8081")
+    mocked = llm.backend_identity("groq")
+    assert len({groq, mocked, llm.backend_identity("mock")}) == 3
+    keys = {cache.make_cache_key("draw a circle", "model", "template", backend) for backend in (groq, mocked, "mock")}
+    assert len(keys) == 3
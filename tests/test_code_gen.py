@@ -0,0 +1,52 @@
+import json
+import re
+
+import pytest
+
+from code_gen import canonical_schema, generate_manim_code, variable_names
+from examples import EXAMPLES
+
+
+def test_entity_ids_never_shadow_derived_helper_names():
+    names = variable_names(["P", "P_label", "S1", "S1_vertices", "L1_tangent_point", "L1"])
+    assert len(set(names.values())) == len(names)
+    derived = {name + suffix for name in names.values() for suffix in ("_label", "_vertices", "_tangent_point")}
+    assert not derived & set(names.values())
+
+
+def test_point_named_like_a_label_keeps_its_own_variable():
+    schema = {
+        "entities": [{"type": "point", "id": "P"}, {"type": "point", "id": "P_label"}],
+        "relationships": [],
+        "positions": {"P": {"point": [0, 0]}, "P_label": {"point": [1, 1]}},
+    }
+    code = generate_manim_code(schema)
+    assert "P_label = cached_text('P'" in code
+    assert "P_label_2 = Dot(" in code
+    assert "self.play(FadeIn(P_label_2))" in code
+
+
+def test_canonical_schema_rounds_only_coordinates():
+    schema = {
+        "entities": [{"type": "point", "id": "P2"}, {"type": "point", "id": "P10"}, {"type": "polygon", "id": "T", "sides": 3}],
+        "relationships": [],
+        "positions": {
+            "P10": {"point": [1.234567, -0.00001], "label": "origin"},
+            "P2": {"point": [0, 0]},
+            "T": {"vertices": [[0, 0], [1.00004, 0], [0.5, 0.86602541]]},
+        },
+    }
+    canonical = canonical_schema(schema)
+    assert list(canonical["positions"]) == ["P2", "P10", "T"]
+    assert canonical["positions"]["P10"] == {"point": [1.2346, 0.0], "label": "origin"}
+    assert canonical["positions"]["T"]["vertices"] == [[0.0, 0.0], [1.0, 0.0], [0.5, 0.866]]
+    assert canonical_schema(canonical) is canonical
+    assert "P10 = Dot(np.array([1.2346, 0.0, 0]), color=WHITE)" in generate_manim_code(schema)
+
+
+@pytest.mark.parametrize("duration", [None, 3.0, 7.0, 10.0])
+@pytest.mark.parametrize("example", EXAMPLES, ids=lambda example: example["description"][:40])
+def test_grouped_scene_lasts_exactly_the_duration(example, duration):
+    code = generate_manim_code(json.loads(example["output"]), grouped=True, duration=duration)
+    seconds = re.findall(r"run_time=([\d.]+)\)", code) + re.findall(r"self\.wait\(([\d.]+)\)", code)
+    assert sum(map(float, seconds)) == pytest.approx(duration or 4.0)
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from examples import EXAMPLES, INDEX, _terms, build_prompt
+from validate import validate_schema
+
+
+def top_descriptions(description, k=3):
+    return [example["description"] for example in INDEX.top_k(description, k)]
+
+
+def test_numbers_are_not_terms():
+    assert _terms("Draw a circle of radius 4 at (0, 2)") == ["circle", "radius"]
+
+
+@pytest.mark.parametrize("description, expected", [
+    ("Draw a hexagon inside a circle of radius 4", "inscribe a regular pentagon"),
+    ("Two lines cross at a point", "Find their intersection"),
+    ("Draw two tangents from a point P to a circle of radius 2", "tangent lines of length 3 from point P"),
+    ("Draw a circle radius 5 with a chord of length 6", "chord of length 8"),
+    ("Draw a square and circumscribe a circle", "circumscribe a circle"),
+])
+def test_relevant_example_is_retrieved(description, expected):
+    assert any(expected in found for found in top_descriptions(description))
+
+
+def test_top_1_for_inscribed_polygon():
+    assert top_descriptions("Draw a hexagon inside a circle of radius 4", 1) == [EXAMPLES[1]["description"]]
+
+
+def test_single_circle_prompt_leaves_out_common_tangent():
+    prompt = build_prompt("Draw a circle with radius 3 and inscribe a regular pentagon.")
+    assert "COMMON TANGENT TO TWO CIRCLES" not in prompt
+    assert "INSCRIBED REGULAR POLYGON" in prompt
+
+
+def test_two_circles_prompt_keeps_common_tangent():
+    assert "COMMON TANGENT TO TWO CIRCLES" in build_prompt("Draw the common tangent of two circles")
+
+
+@pytest.mark.parametrize("example", EXAMPLES, ids=lambda example: example["description"][:40])
+def test_example_geometry_is_exact(example):
+    _, report = validate_schema(json.loads(example["output"]))
+    assert report["invalid"] == [] and report["snapped"] == []
@@ -0,0 +1,28 @@
+import pytest
+
+from fast_parser import fast_parse
+
+
+def test_tangents_from_one_point():
+    schema = fast_parse("draw a circle of radius 2 cm and two tangents of length 3 cm from a single point P.")
+    assert schema is not None
+    assert {entity["id"] for entity in schema["entities"]} == {"C1", "P", "L1", "L2"}
+
+
+def test_tangents_from_two_points_go_to_the_llm():
+    description = (
+        "draw a circle of radius 2 cm, two tangents of length 3 from point A "
+        "and two tangents of length 3 from point B"
+    )
+    assert fast_parse(description) is None
+
+
+def test_numbered_polygon_inscribed_in_circle():
+    schema = fast_parse("draw a circle of radius 3 and inscribe a 7-gon")
+    assert schema is not None
+    assert {"type": "polygon", "id": "G1", "sides": 7} in schema["entities"]
+
+
+@pytest.mark.parametrize("polygon", ["a 2-gon", "a 1-gon", "a 0-gon", "a polygon with 2 sides"])
+def test_polygons_need_three_sides(polygon):
+    assert fast_parse(f"draw a circle of radius 3 and inscribe {polygon}") is None
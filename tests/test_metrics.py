@@ -0,0 +1,45 @@
+import json
+
+from metrics import Metrics
+
+
+def test_prometheus_text():
+    metrics = Metrics(enabled=True)
+    metrics.observe("parse", 0.25)
+    metrics.observe("parse", 0.5)
+    metrics.count("renders_total", cached=True)
+    metrics.count("renders_total", 2, cached=True)
+    metrics.count("jobs_total")
+    assert metrics.prometheus_text() == (
+        "# HELP text2manim_stage_seconds Time spent per pipeline stage.\n"
+        "# TYPE text2manim_stage_seconds summary\n"
+        'text2manim_stage_seconds_count{stage="parse"} 2\n'
+        'text2manim_stage_seconds_sum{stage="parse"} 0.750000\n'
+        "# TYPE text2manim_jobs_total counter\n"
+        "text2manim_jobs_total 1\n"
+        "# TYPE text2manim_renders_total counter\n"
+        'text2manim_renders_total{cached="True"} 3\n'
+    )
+
+
+def test_disabled_metrics_record_nothing():
+    metrics = Metrics(enabled=False)
+    with metrics.span("parse"):
+        metrics.count("jobs_total")
+    assert (metrics.spans, metrics.counters, metrics.stages) == ([], {}, {})
+
+
+def test_nested_spans_are_exported_with_their_parent(tmp_path):
+    trace_file = tmp_path / "trace.jsonl"
+    metrics_file = tmp_path / "metrics.prom"
+    metrics = Metrics(enabled=True, trace_file=str(trace_file), metrics_file=str(metrics_file))
+    with metrics.span("render", job_id="a"):
+        with metrics.span("frame_render") as inner:
+            inner.set(partial_movies=3)
+    metrics.flush()
+    child, parent = [json.loads(line) for line in trace_file.read_text().splitlines()]
+    assert (child["name"], parent["name"]) == ("frame_render", "render")
+    assert child["parent"] == parent["span"] and child["trace"] == parent["trace"]
+    assert child["attributes"] == {"partial_movies": 3}
+    assert 'text2manim_stage_seconds_count{stage="render"} 1' in metrics_file.read_text()
+    assert metrics.spans == []
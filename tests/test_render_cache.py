@@ -0,0 +1,59 @@
+import os
+import threading
+import time
+
+from render_cache import RenderCache, render_key
+
+
+def test_lock_file_is_removed_on_release(tmp_path):
+    store = RenderCache(str(tmp_path))
+    lock_path = tmp_path / "locks" / "k.lock"
+    with store.lock("k"):
+        assert lock_path.exists()
+    assert not lock_path.exists()
+    # The key can be locked again after release
+    with store.lock("k"):
+        pass
+    assert os.listdir(tmp_path / "locks") == []
+
+
+def test_concurrent_misses_render_once(tmp_path):
+    store = RenderCache(str(tmp_path / "cache"))
+    renders = []
+
+    def render():
+        renders.append(1)
+        time.sleep(0.1)
+        path = tmp_path / f"out{len(renders)}.mp4"
+        path.write_bytes(b"movie")
+        return str(path)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(store.get_or_render("k", ".mp4", render)))
+               for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(renders) == 1
+    assert sorted(hit for _, hit in results) == [False, True, True]
+    assert len({path for path, _ in results}) == 1
+
+
+def test_oldest_files_are_evicted_past_the_size_cap(tmp_path):
+    store = RenderCache(str(tmp_path / "cache"), max_bytes=10)
+    source = tmp_path / "frame.png"
+    source.write_bytes(b"123456")
+    old = store.put("a" * 64, ".png", str(source))
+    os.utime(old, (1, 1))
+    store.put("b" * 64, ".png", str(source))
+    assert store.get("a" * 64, ".png") is None
+    assert store.get("b" * 64, ".png") is not None
+
+
+def test_schema_key_ignores_entity_order():
+    entities = [{"type": "point", "id": "A"}, {"type": "point", "id": "B"}]
+    positions = {"A": {"point": [0, 0]}, "B": {"point": [1, 1]}}
+    first = render_key({"entities": entities, "positions": positions}, quality="l")
+    second = render_key({"entities": entities[::-1], "positions": positions}, quality="l")
+    assert first == second != render_key({"entities": entities, "positions": positions}, quality="h")
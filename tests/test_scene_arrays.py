@@ -0,0 +1,76 @@
+import numpy as np
+
+from scene_arrays import CIRCLE_ARCS, DASH_TEMPLATE, DOT_RADIUS, INSCRIBED_DASHES, SceneArrays, circle_points
+
+SCHEMA = {
+    "entities": [
+        {"type": "polygon", "id": "T1", "sides": 3},
+        {"type": "polygon", "id": "S1", "sides": 4},
+        {"type": "circle", "id": "C1"},
+        {"type": "point", "id": "P"},
+        {"type": "line", "id": "L1"},
+    ],
+    "relationships": [],
+    "positions": {
+        "T1": {"vertices": [[0, 0], [3, 0], [0, 3]]},
+        "S1": {"vertices": [[-1, -1], [1, -1], [1, 1], [-1, 1]]},
+        "C1": {"center": [2, 1], "radius": 1.5},
+        "P": {"point": [0.5, -0.5]},
+        "L1": {"start": [0, 0], "end": [4, 2]},
+    },
+}
+
+
+def test_polygon_edges_close_every_polygon():
+    arrays = SceneArrays(SCHEMA)
+    assert arrays.polygon_ids == ["S1", "T1"]
+    starts, ends = arrays.polygon_edges()
+    assert starts.shape == ends.shape == (7, 2)
+    assert starts.tolist() == [[-1, -1], [1, -1], [1, 1], [-1, 1], [0, 0], [3, 0], [0, 3]]
+    assert ends.tolist() == [[1, -1], [1, 1], [-1, 1], [-1, -1], [3, 0], [0, 3], [0, 0]]
+
+
+def test_polygon_edges_of_masked_polygons():
+    starts, ends = SceneArrays(SCHEMA).polygon_edges(np.array([False, True]))
+    assert starts.tolist() == [[0, 0], [3, 0], [0, 3]]
+    assert ends.tolist() == [[3, 0], [0, 3], [0, 0]]
+
+
+def test_label_anchors_per_entity_type():
+    anchors = SceneArrays(SCHEMA).label_anchors()
+    assert {entity_type: ids for entity_type, (ids, _) in anchors.items()} == {
+        "circle": ["C1"], "point": ["P"], "line": ["L1"], "polygon": ["S1", "T1"],
+    }
+    assert all(points.shape == (len(ids), 2) for ids, points in anchors.values())
+    assert anchors["circle"][1].tolist() == [[2, 2.5]]
+    assert anchors["point"][1].tolist() == [[0.5 + DOT_RADIUS, -0.5]]
+    assert anchors["line"][1].tolist() == [[2, 1.2]]
+    assert anchors["polygon"][1].tolist() == [[0, 0], [1, 1]]
+
+
+def test_label_anchors_without_entities():
+    anchors = SceneArrays({"entities": [], "relationships": [], "positions": {}}).label_anchors()
+    assert all(ids == [] and points.shape == (0, 2) for ids, points in anchors.values())
+
+
+def test_circle_points_lie_on_each_circle():
+    centers, radii = np.array([[0, 0], [2, 1]]), np.array([1.0, 1.5])
+    points = circle_points(centers, radii)
+    assert points.shape == (2 * CIRCLE_ARCS * 4, 3)
+    assert not points[:, 2].any()
+    # Every cubic starts and ends on its circle, and the arcs of one circle join up
+    curves = points.reshape(2, CIRCLE_ARCS, 4, 3)
+    anchors = curves[:, :, [0, 3], :2]
+    distances = np.linalg.norm(anchors - centers[:, None, None], axis=-1)
+    assert np.allclose(distances, radii[:, None, None])
+    assert np.allclose(curves[:, 1:, 0], curves[:, :-1, 3])
+    assert np.allclose(curves[:, 0, 0], curves[:, -1, 3])
+    assert np.allclose(curves[1, 0, 0, :2], [3.5, 1])
+
+
+def test_circle_points_with_one_radius_and_dashes():
+    centers = np.array([[1, 1], [-1, 0]])
+    points = circle_points(centers, DOT_RADIUS, DASH_TEMPLATE)
+    assert points.shape == (2 * INSCRIBED_DASHES * 4, 3)
+    anchors = points.reshape(2, INSCRIBED_DASHES, 4, 3)[:, :, [0, 3], :2]
+    assert np.allclose(np.linalg.norm(anchors - centers[:, None, None], axis=-1), DOT_RADIUS)
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from examples import EXAMPLES
+from scene_plan import plan_segments, step_durations
+
+TANGENTS = json.loads(EXAMPLES[0]["output"])
+
+
+def test_plan_segments_without_steps():
+    assert plan_segments([], 4) == []
+
+
+def test_plan_segments_with_one_segment():
+    assert plan_segments([1.0, 0.0, 2.0, 2], 1) == [(0, 4)]
+
+
+def test_plan_segments_never_cut_before_instant_steps():
+    assert plan_segments([1.0, 0.0, 0.0, 1.0, 0.0, 1.0], 3) == [(0, 3), (3, 5), (5, 6)]
+    assert plan_segments([0.0, 0.0, 0.0], 3) == [(0, 3)]
+
+
+def test_plan_segments_caps_at_the_number_of_timed_steps():
+    assert plan_segments([1.0, 1.0], 8) == [(0, 1), (1, 2)]
+
+
+def test_step_durations_one_play_per_entity():
+    # Point, circle and two lines, the labels, two tangent points and the closing wait
+    assert step_durations(TANGENTS) == [1.0] * 4 + [0.0] + [1.0] * 2 + [2]
+    assert step_durations(TANGENTS, still=True) == [0.0] * 7
+
+
+def test_step_durations_grouped_fill_the_duration():
+    durations = step_durations(TANGENTS, grouped=True, duration=7.0)
+    assert durations == [1.4] * 3 + [0.0] + [1.4] * 2
+    assert sum(durations) == pytest.approx(7.0)
+
+
+def test_step_durations_dense_batches_polygons_by_color():
+    schema = {
+        "entities": [{"type": "polygon", "id": f"T{i}", "sides": 3} for i in range(3)]
+        + [{"type": "polygon", "id": "S1", "sides": 4}, {"type": "point", "id": "P"}],
+        "relationships": [],
+        "positions": {
+            **{f"T{i}": {"vertices": [[i, 0], [i + 1, 0], [i, 1]]} for i in range(3)},
+            "S1": {"vertices": [[0, 0], [1, 0], [1, 1], [0, 1]]},
+            "P": {"point": [0, 0]},
+        },
+    }
+    assert step_durations(schema, dense=True) == [1.0] * 3 + [0.0, 2]
+
+
+@pytest.mark.parametrize("options", [{}, {"still": True}, {"grouped": True, "duration": 5.0}, {"dense": True}])
+@pytest.mark.parametrize("example", EXAMPLES, ids=lambda example: example["description"][:40])
+def test_step_durations_match_scene_builder(example, options):
+    pytest.importorskip("manim")
+    from scene_builder import SceneBuilder, step_seconds
+
+    schema = json.loads(example["output"])
+    steps = SceneBuilder(schema, **options).steps()
+    assert step_durations(schema, **options) == [step_seconds(step) for step in steps]
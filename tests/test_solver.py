@@ -0,0 +1,53 @@
+import math
+
+import pytest
+
+from solver import solve_positions
+
+
+def two_points_schema(length_a=3, length_b=3):
+    entities = [{"type": "circle", "id": "C1", "radius": 2}, {"type": "point", "id": "A"}, {"type": "point", "id": "B"}]
+    relationships = []
+    for line_id, point_id, length in (("L1", "A", length_a), ("L2", "A", length_a),
+                                      ("L3", "B", length_b), ("L4", "B", length_b)):
+        entities.append({"type": "line", "id": line_id, "length": length})
+        relationships.append({"type": "tangent", "from": line_id, "to": "C1", "from_point": point_id})
+    return {"entities": entities, "relationships": relationships}
+
+
+def tangent_length(positions, line_id):
+    start, end = positions[line_id]["start"], positions[line_id]["end"]
+    return math.dist(start, end)
+
+
+def test_external_points_with_equal_lengths_are_placed_apart():
+    positions = solve_positions(two_points_schema())["positions"]
+    assert math.dist(positions["A"]["point"], positions["B"]["point"]) > 1
+    ends = [tuple(positions[line_id]["end"]) for line_id in ("L1", "L2", "L3", "L4")]
+    assert len(set(ends)) == 4
+    for line_id in ("L1", "L2", "L3", "L4"):
+        assert tangent_length(positions, line_id) == pytest.approx(3, abs=1e-3)
+
+
+def test_different_lengths_from_each_point():
+    positions = solve_positions(two_points_schema(3, 5))["positions"]
+    assert tangent_length(positions, "L1") == pytest.approx(3, abs=1e-3)
+    assert tangent_length(positions, "L3") == pytest.approx(5, abs=1e-3)
+
+
+def test_conflicting_lengths_from_one_point_raise():
+    schema = two_points_schema()
+    schema["entities"][4]["length"] = 4  # L2 from A, while L1 from A has length 3
+    with pytest.raises(ValueError):
+        solve_positions(schema)
+
+
+def test_free_point_and_line_get_default_positions():
+    schema = {
+        "entities": [{"type": "point", "id": "P"}, {"type": "line", "id": "L1", "length": 3}, {"type": "line", "id": "L2"}],
+        "relationships": [],
+    }
+    positions = solve_positions(schema)["positions"]
+    assert positions["P"] == {"point": [0.0, 0.0]}
+    assert positions["L1"] == {"start": [0.0, 0.0], "end": [3.0, 0.0]}
+    assert tangent_length(positions, "L2") > 0
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from streaming import IncrementalJSONParser
+
+SCHEMA = {
+    "entities": [{"type": "circle", "id": "C1", "radius": 2}, {"type": "point", "id": "P"}],
+    "positions": {"C1": {"center": [0, 0], "radius": 2}, "P": {"point": [4, 0]}},
+    "relationships": [],
+}
+
+
+def feed_all(text, chunk_size=7):
+    parser = IncrementalJSONParser()
+    entities = []
+    for start in range(0, len(text), chunk_size):
+        entities += parser.feed(text[start:start + chunk_size])
+    return parser, entities
+
+
+@pytest.mark.parametrize("order", [
+    ("entities", "relationships", "positions"),
+    ("entities", "positions", "relationships"),
+    ("positions", "entities", "relationships"),
+])
+def test_only_entities_are_reported_whatever_the_key_order(order):
+    text = "Here is the schema: " + json.dumps({key: SCHEMA[key] for key in order}) + " trailing"
+    parser, entities = feed_all(text)
+    assert entities == SCHEMA["entities"]
+    assert parser.done
+    assert parser.result() == SCHEMA
+
+
+def test_malformed_entity_is_rejected():
+    with pytest.raises(ValueError):
+        feed_all(json.dumps({"entities": [{"type": "circle"}]}))
+
+
+def test_streamed_parse_reports_entities_as_they_arrive(monkeypatch):
+    import llm
+    import main
+    from cache import PersistentCache
+
+    monkeypatch.setattr(main, "_persistent_cache", PersistentCache(":memory:"))
+    monkeypatch.setattr(main, "API_CACHE", {})
+    monkeypatch.setattr(llm, "_backend", llm.MockBackend(chunk_size=8))
+    seen = []
+    schema = main.parse_geometric_description(
+        "draw a circle of radius 2 cm and two tangents of length 3 cm from a single point P.",
+        use_fast_path=False, stream=True, on_entity=seen.append,
+    )
+    assert [entity["id"] for entity in seen] == [entity["id"] for entity in schema["entities"]]
+    assert {"C1", "P"} <= {entity["id"] for entity in seen}
@@ -0,0 +1,37 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from code_gen import POLYGON_COLORS
+from svg_render import COLORS, render_svg
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+def test_every_scene_color_has_a_hex_value():
+    assert set(POLYGON_COLORS.values()) | {"WHITE", "BLUE", "YELLOW", "RED"} <= COLORS.keys()
+
+
+def test_colors_match_installed_manim():
+    color = pytest.importorskip("manim.utils.color")
+    assert {name: getattr(color, name).to_hex().upper() for name in COLORS} == COLORS
+
+
+def test_inscribed_circle_in_triangle():
+    schema = {
+        "entities": [{"type": "polygon", "id": "T1", "sides": 3}, {"type": "circle", "id": "C1"}],
+        "relationships": [{"type": "inscribed", "shape": "C1", "in": "T1"}],
+        "positions": {
+            "T1": {"vertices": [[-3.0, -1.7321], [3.0, -1.7321], [0.0, 3.4641]]},
+            "C1": {"center": [0.0, 0.0], "radius": 1.7321},
+        },
+    }
+    root = ET.fromstring(render_svg(schema))
+    polygon, = root.iter(SVG + "polygon")
+    assert polygon.get("stroke") == COLORS["GREEN"]
+    # SVG's y axis points down
+    assert polygon.get("points") == "-3,1.7321 3,1.7321 0,-3.4641"
+    circle, highlight = root.iter(SVG + "circle")
+    assert (circle.get("r"), circle.get("stroke")) == ("1.7321", COLORS["BLUE"])
+    assert highlight.get("stroke") == COLORS["RED"] and highlight.get("stroke-dasharray")
+    assert sorted(text.text for text in root.iter(SVG + "text")) == ["C1", "T1"]
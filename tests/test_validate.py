@@ -0,0 +1,57 @@
+import math
+
+import pytest
+
+from validate import check_schema, repair_schema
+
+
+def tangent_schema(end):
+    # Tangents from (4, 0) to the circle of radius 2 at the origin touch it at (1, +-sqrt(3))
+    return {
+        "entities": [
+            {"type": "circle", "id": "C1", "radius": 2},
+            {"type": "point", "id": "P"},
+            {"type": "line", "id": "L1"},
+        ],
+        "relationships": [{"type": "tangent", "from": "L1", "to": "C1", "from_point": "P"}],
+        "positions": {
+            "C1": {"center": [0, 0], "radius": 2},
+            "P": {"point": [4, 0]},
+            "L1": {"start": [4, 0], "end": end},
+        },
+    }
+
+
+def test_exact_schema_is_left_alone():
+    schema = tangent_schema([1, 1.7321])
+    repaired, report = repair_schema(schema)
+    assert repaired is schema
+    assert report["snapped"] == [] and report["invalid"] == []
+
+
+def test_near_miss_tangent_is_snapped_to_the_contact_point():
+    repaired, report = repair_schema(tangent_schema([1.02, 1.75]))
+    assert [entry["type"] for entry in report["snapped"]] == ["tangent"]
+    assert repaired["positions"]["L1"] == {"start": [4.0, 0.0], "end": [1.0, 1.7321]}
+    assert check_schema(repaired).max() <= 1e-3
+
+
+def test_near_miss_chord_ends_are_snapped_onto_the_circle():
+    schema = {
+        "entities": [{"type": "circle", "id": "C1", "radius": 5}, {"type": "line", "id": "L1"}],
+        "relationships": [{"type": "chord", "line": "L1", "in": "C1"}],
+        "positions": {"C1": {"center": [0, 0], "radius": 5}, "L1": {"start": [-4, 3.02], "end": [4, 2.98]}},
+    }
+    repaired, report = repair_schema(schema)
+    assert len(report["snapped"]) == 1
+    for key in ("start", "end"):
+        assert math.hypot(*repaired["positions"]["L1"][key]) == pytest.approx(5, abs=1e-4)
+    # The input schema is not modified
+    assert schema["positions"]["L1"]["start"] == [-4, 3.02]
+
+
+def test_far_off_tangent_is_re_solved():
+    repaired, report = repair_schema(tangent_schema([3, 3]))
+    assert report["resolved"] == ["L1"]
+    end = repaired["positions"]["L1"]["end"]
+    assert math.hypot(*end) == pytest.approx(2, abs=1e-3)
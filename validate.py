@@ -0,0 +1,369 @@
+import copy
+
+import numpy as np
+
+from solver import (
+    circle_circle_intersection,
+    circumcircle,
+    common_tangent,
+    incircle,
+    line_circle_intersection,
+    line_line_intersection,
+    solve_positions,
+    tangent_points,
+)
+
+GEOMETRY_KEYS = ("center", "radius", "point", "start", "end", "vertices")
+
+# Residuals are distances in scene units. Positions are stored with 4 decimals, so
+# anything under TOLERANCE is exact; up to SNAP_TOLERANCE is a near-miss that gets snapped.
+TOLERANCE = 1e-3
+SNAP_TOLERANCE = 0.1
+
+
+def _geometry(json_schema):
+    """Coordinates per entity id, from the entity itself overridden by 'positions'."""
+    positions = json_schema.get("positions", {})
+    geometry = {}
+    for entity in json_schema.get("entities", []):
+        merged = {key: entity[key] for key in GEOMETRY_KEYS if key in entity}
+        merged.update(positions.get(entity["id"], {}))
+        geometry[entity["id"]] = {
+            key: np.asarray(value, dtype=float) if isinstance(value, list) else float(value)
+            for key, value in merged.items()
+        }
+    return geometry
+
+
+def _is_circle(shape):
+    return "center" in shape and "radius" in shape
+
+
+def _is_line(shape):
+    return "start" in shape and "end" in shape
+
+
+class _Probes:
+    """Residual checks collected across all relationships and evaluated in three batched NumPy passes.
+
+    on_circle: |distance(point, center) - radius|
+    tangent:   |distance(center, line) - radius|
+    on_line:   distance(point, line)
+    """
+
+    def __init__(self):
+        self.on_circle = ([], [], [], [])
+        self.tangent = ([], [], [], [], [])
+        self.on_line = ([], [], [], [])
+
+    def point_on_circle(self, index, point, circle):
+        for column, value in zip(self.on_circle, (index, point, circle["center"], circle["radius"])):
+            column.append(value)
+
+    def line_tangent(self, index, start, end, circle):
+        for column, value in zip(self.tangent, (index, start, end, circle["center"], circle["radius"])):
+            column.append(value)
+
+    def point_on_line(self, index, point, line):
+        for column, value in zip(self.on_line, (index, point, line["start"], line["end"])):
+            column.append(value)
+
+    @staticmethod
+    def _line_distance(points, starts, ends):
+        direction = ends - starts
+        rel = points - starts
+        cross = direction[:, 0] * rel[:, 1] - direction[:, 1] * rel[:, 0]
+        return np.abs(cross) / np.maximum(np.linalg.norm(direction, axis=1), 1e-12)
+
+    def residuals(self, count):
+        """Largest residual per relationship index; NaN where nothing was checked."""
+        result = np.full(count, -np.inf)
+        batches = []
+        if self.on_circle[0]:
+            indices, points, centers, radii = (np.asarray(column, dtype=float) for column in self.on_circle)
+            batches.append((indices, np.abs(np.linalg.norm(points - centers, axis=1) - radii)))
+        if self.tangent[0]:
+            indices, starts, ends, centers, radii = (np.asarray(column, dtype=float) for column in self.tangent)
+            batches.append((indices, np.abs(self._line_distance(centers, starts, ends) - radii)))
+        if self.on_line[0]:
+            indices, points, starts, ends = (np.asarray(column, dtype=float) for column in self.on_line)
+            batches.append((indices, self._line_distance(points, starts, ends)))
+        for indices, values in batches:
+            np.maximum.at(result, indices.astype(int), values)
+        result[np.isneginf(result)] = np.nan
+        return result
+
+
+def _add_probes(probes, index, rel, geometry):
+    """Register the checks for one relationship. Returns False if it cannot be checked."""
+    kind = rel.get("type")
+    get = geometry.get
+    if kind == "circumscribed":
+        rel = {"type": "inscribed", "shape": rel.get("around"), "in": rel.get("shape")}
+        kind = "inscribed"
+
+    if kind == "tangent":
+        line, circle = get(rel.get("from"), {}), get(rel.get("to"), {})
+        if not (_is_line(line) and _is_circle(circle)):
+            return False
+        probes.line_tangent(index, line["start"], line["end"], circle)
+        point = get(rel.get("from_point"), {})
+        if "point" in point:
+            probes.point_on_line(index, point["point"], line)
+        return True
+
+    if kind == "inscribed":
+        shape, container = get(rel.get("shape"), {}), get(rel.get("in"), {})
+        if "vertices" in shape and _is_circle(container):
+            for vertex in shape["vertices"]:
+                probes.point_on_circle(index, vertex, container)
+            return True
+        if _is_circle(shape) and "vertices" in container:
+            vertices = container["vertices"]
+            for start, end in zip(vertices, np.roll(vertices, -1, axis=0)):
+                probes.line_tangent(index, start, end, shape)
+            return True
+        return False
+
+    if kind == "chord":
+        line, circle = get(rel.get("line"), {}), get(rel.get("in"), {})
+        if not (_is_line(line) and _is_circle(circle)):
+            return False
+        probes.point_on_circle(index, line["start"], circle)
+        probes.point_on_circle(index, line["end"], circle)
+        return True
+
+    if kind == "intersection":
+        between = [get(entity_id, {}) for entity_id in rel.get("between", [])]
+        at = rel.get("at", [])
+        points = [get(point_id, {}) for point_id in (at if isinstance(at, list) else [at])]
+        if not points or not all("point" in point for point in points):
+            return False
+        if not between or not all(_is_circle(shape) or _is_line(shape) for shape in between):
+            return False
+        for point in points:
+            for shape in between:
+                if _is_circle(shape):
+                    probes.point_on_circle(index, point["point"], shape)
+                else:
+                    probes.point_on_line(index, point["point"], shape)
+        return True
+
+    return False
+
+
+def _derived_ids(rel):
+    """Entities whose coordinates a relationship determines, i.e. the ones to move when it fails."""
+    kind = rel.get("type")
+    if kind == "tangent":
+        return [rel["from"]]
+    if kind == "inscribed":
+        return [rel["shape"]]
+    if kind == "circumscribed":
+        return [rel["shape"]]
+    if kind == "chord":
+        return [rel["line"]]
+    if kind == "intersection":
+        return list(rel["at"]) if isinstance(rel["at"], list) else [rel["at"]]
+    return []
+
+
+def _project_to_circle(points, circle):
+    offsets = points - circle["center"]
+    lengths = np.linalg.norm(offsets, axis=-1, keepdims=True)
+    return circle["center"] + circle["radius"] * offsets / np.maximum(lengths, 1e-12)
+
+
+def _nearest(candidates, target):
+    return min(candidates, key=lambda candidate: np.linalg.norm(candidate - target))
+
+
+def _common_tangent_partner(rel, relationships):
+    """The other circle of a line tangent to two circles, if any."""
+    for other in relationships:
+        if other.get("type") == "tangent" and other.get("from") == rel["from"] and other.get("to") != rel["to"]:
+            return other["to"]
+    return None
+
+
+def _snap(rel, geometry, relationships):
+    """Move the derived entity of a near-miss relationship onto the exact construction."""
+    kind = rel.get("type")
+    if kind == "tangent":
+        line, circle = geometry[rel["from"]], geometry[rel["to"]]
+        point = geometry.get(rel.get("from_point"), {}).get("point")
+        partner = _common_tangent_partner(rel, relationships)
+        if point is not None:
+            # Keep the end at the external point and move the other end to the true contact point
+            at_start = np.linalg.norm(line["start"] - point) <= np.linalg.norm(line["end"] - point)
+            contact_key = "end" if at_start else "start"
+            contact = _nearest(tangent_points(circle["center"], circle["radius"], point), line[contact_key])
+            line.update({"start": point, "end": contact} if at_start else {"start": contact, "end": point})
+        elif partner is not None:
+            # Closest of the four common tangents, matched to the segment in either direction
+            other = geometry[partner]
+            candidates = []
+            for internal in (False, True):
+                for sign in (1, -1):
+                    try:
+                        a, b = common_tangent(circle["center"], circle["radius"], other["center"], other["radius"],
+                                              internal, sign)
+                    except ValueError:
+                        continue
+                    candidates += [(a, b), (b, a)]
+            start, end = min(
+                candidates,
+                key=lambda ends: np.linalg.norm(ends[0] - line["start"]) + np.linalg.norm(ends[1] - line["end"]),
+            )
+            line.update(start=start, end=end)
+        else:
+            # Slide the segment along the normal so it touches the circle, keeping direction and length
+            direction = line["end"] - line["start"]
+            t = (circle["center"] - line["start"]) @ direction / (direction @ direction)
+            foot = line["start"] + t * direction
+            shift = _project_to_circle(foot, circle) - foot
+            line.update(start=line["start"] + shift, end=line["end"] + shift)
+    elif kind == "inscribed":
+        shape, container = geometry[rel["shape"]], geometry[rel["in"]]
+        if "vertices" in shape:
+            shape["vertices"] = _project_to_circle(shape["vertices"], container)
+        else:
+            shape["center"], shape["radius"] = incircle(container["vertices"])
+    elif kind == "circumscribed":
+        outer, inner = geometry[rel["shape"]], geometry[rel["around"]]
+        if "vertices" in inner:
+            # Polygons from the model are rarely exactly cyclic, so pull the vertices onto the circle too
+            outer["center"], outer["radius"] = circumcircle(inner["vertices"])
+            inner["vertices"] = _project_to_circle(inner["vertices"], outer)
+        else:
+            # Scale the polygon about the circle's center until its incircle is that circle
+            center, radius = incircle(outer["vertices"])
+            outer["vertices"] = inner["center"] + (outer["vertices"] - center) * inner["radius"] / radius
+    elif kind == "chord":
+        line, circle = geometry[rel["line"]], geometry[rel["in"]]
+        line.update(start=_project_to_circle(line["start"], circle), end=_project_to_circle(line["end"], circle))
+    elif kind == "intersection":
+        first, second = (geometry[entity_id] for entity_id in rel["between"])
+        if _is_circle(first) and _is_line(second):
+            first, second = second, first
+        if _is_line(first) and _is_line(second):
+            candidates = line_line_intersection(first["start"], first["end"], second["start"], second["end"])
+        elif _is_line(first):
+            candidates = line_circle_intersection(first["start"], first["end"], second["center"], second["radius"])
+        else:
+            candidates = circle_circle_intersection(first["center"], first["radius"], second["center"], second["radius"])
+        if not candidates:
+            raise ValueError("Entities do not intersect")
+        for point_id in _derived_ids(rel):
+            point = geometry[point_id]
+            point["point"] = _nearest(candidates, point["point"])
+
+
+def _export(geometry):
+    exported = {}
+    for key, value in geometry.items():
+        if isinstance(value, np.ndarray):
+            exported[key] = (np.round(value, 4) + 0.0).tolist()
+        else:
+            exported[key] = round(float(value), 4) + 0.0
+    return exported
+
+
+def check_schema(json_schema):
+    """Largest geometric residual per relationship (NaN for relationships that cannot be checked)."""
+    geometry = _geometry(json_schema)
+    relationships = json_schema.get("relationships", [])
+    probes = _Probes()
+    for index, rel in enumerate(relationships):
+        _add_probes(probes, index, rel, geometry)
+    return probes.residuals(len(relationships))
+
+
+def validate_schema(json_schema, tolerance=TOLERANCE, snap_tolerance=SNAP_TOLERANCE):
+    """Check every relationship against 'positions' and snap near-misses to exact values.
+
+    Returns (schema, report). The schema is a copy with snapped coordinates written
+    to 'positions'; the report lists snapped and invalid relationships with their
+    residuals, where invalid ones are still off by more than `tolerance`.
+    """
+    relationships = json_schema.get("relationships", [])
+    residuals = check_schema(json_schema)
+    near_misses = np.flatnonzero((residuals > tolerance) & (residuals <= snap_tolerance))
+
+    schema = json_schema
+    snapped = []
+    if len(near_misses):
+        schema = copy.deepcopy(json_schema)
+        geometry = _geometry(schema)
+        positions = schema.setdefault("positions", {})
+        for index in near_misses:
+            rel = relationships[index]
+            try:
+                _snap(rel, geometry, relationships)
+            except (KeyError, ValueError):
+                continue
+            moved = _derived_ids(rel) + ([rel["around"]] if rel.get("type") == "circumscribed" else [])
+            for entity_id in moved:
+                positions[entity_id] = _export(geometry[entity_id])
+            snapped.append({"index": int(index), "type": rel.get("type"), "residual": float(residuals[index])})
+        # Snapping one relationship can disturb another that shares an entity, so check again
+        residuals_after = check_schema(schema)
+    else:
+        residuals_after = residuals
+
+    invalid = [
+        {"index": int(index), "type": relationships[index].get("type"), "residual": float(residuals_after[index])}
+        for index in np.flatnonzero(residuals_after > tolerance)
+    ]
+    snapped = [entry for entry in snapped if not residuals_after[entry["index"]] > tolerance]
+    checked = ~np.isnan(residuals_after)
+    report = {
+        "checked": int(checked.sum()),
+        "unchecked": int((~checked).sum()),
+        "snapped": snapped,
+        "invalid": invalid,
+        "max_residual": float(residuals[checked].max()) if checked.any() else 0.0,
+    }
+    return schema, report
+
+
+def repair_schema(json_schema, tolerance=TOLERANCE, snap_tolerance=SNAP_TOLERANCE):
+    """Validate, and re-solve the entities of invalid relationships locally instead of rendering them wrong.
+
+    Raises ValueError if the schema is still geometrically wrong after re-solving.
+    """
+    schema, report = validate_schema(json_schema, tolerance, snap_tolerance)
+    if not report["invalid"]:
+        return schema, report
+
+    relationships = schema.get("relationships", [])
+    stale = {entity_id for entry in report["invalid"] for entity_id in _derived_ids(relationships[entry["index"]])}
+    unsolved = copy.deepcopy(schema)
+    unsolved["positions"] = {
+        entity_id: position for entity_id, position in schema.get("positions", {}).items() if entity_id not in stale
+    }
+    for entity in unsolved["entities"]:
+        if entity["id"] in stale:
+            for key in GEOMETRY_KEYS:
+                if key != "radius" or entity["type"] != "circle":
+                    entity.pop(key, None)
+    resolved = solve_positions(unsolved)
+    resolved["entities"] = schema["entities"]
+
+    schema, second = validate_schema(resolved, tolerance, snap_tolerance)
+    if second["invalid"]:
+        raise ValueError(f"Schema fails geometric validation: {second['invalid']}")
+    report["resolved"] = sorted(stale)
+    report["invalid"] = []
+    return schema, report
+
+
+if __name__ == "__main__":
+    import json
+
+    from examples import EXAMPLES
+
+    for example in EXAMPLES:
+        _, report = validate_schema(json.loads(example["output"]))
+        print(f"{example['description'][:60]:60}  max residual {report['max_residual']:.4f}  "
+              f"snapped {len(report['snapped'])}  invalid {len(report['invalid'])}")